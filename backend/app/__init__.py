@@ -3,39 +3,78 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager, get_jwt_identity
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from typing import Optional
 
 from config import config
 from app.utils.errors import BaseAPIError
 from app.utils.response import APIResponse
+from app.utils.cache import ResponseCache
+from app.utils.user_cache import UserCache
+from app.utils.hashing import PasswordHasher
+from app.utils.db_routing import ReplicaRouter, RoutingSession
+from app.utils.json_provider import init_json
+from app.utils.query_stats import QueryAccounting
+from app.utils.metrics import Metrics
+from app.utils.slow_queries import SlowQueryLog
+from app.utils.rate_limit import RateLimiter
+from app.utils.admission import AdmissionController
 from app.utils.logger import setup_logger, log_error
 import logging
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 migrate = Migrate()
 jwt = JWTManager()
+cache = ResponseCache()
+user_cache = UserCache()
+password_hasher = PasswordHasher()
+replica_router = ReplicaRouter()
+query_accounting = QueryAccounting()
+metrics = Metrics()
+slow_queries = SlowQueryLog()
+rate_limiter = RateLimiter()
+admission = AdmissionController()
 logger: Optional[logging.Logger] = None  # Will be initialized after app creation
 
 
 def create_app(config_name: str = "default") -> Flask:
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    if app.config.get("TRUSTED_PROXIES"):
+        proxies = app.config["TRUSTED_PROXIES"]
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies, x_host=proxies)
+    init_json(app)
     
     global logger
     logger = setup_logger(
         app_name='quiply',
-        log_level=app.config.get('LOG_LEVEL', 'INFO')
+        log_level=app.config.get('LOG_LEVEL', 'INFO'),
+        log_file=app.config.get('LOG_FILE'),
+        log_dir=app.config.get('LOG_DIR', 'logs'),
+        async_mode=app.config.get('LOG_ASYNC', False),
+        sample_rate=app.config.get('LOG_INFO_SAMPLE_RATE', 1.0),
+        sample_rates=app.config.get('LOG_SAMPLE_RATES')
     )
     
     db.init_app(app)
+    query_accounting.init_app(app)
+    metrics.init_app(app)
+    slow_queries.init_app(app)
+    admission.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
+    cache.init_app(app)
+    user_cache.init_app(app)
+    password_hasher.init_app(app)
+    rate_limiter.init_app(app)
+    replica_router.init_app(app)
     CORS(app, supports_credentials=True)
     
     @app.errorhandler(BaseAPIError)
     def handle_api_error(error):
         if logger:
             log_error(logger, error)
+        metrics.count_error(error.error_code, error.status_code)
         return APIResponse.error(
             message=error.message,
             status_code=error.status_code,
@@ -45,6 +84,7 @@ def create_app(config_name: str = "default") -> Flask:
     
     @app.errorhandler(404)
     def handle_not_found(error):
+        metrics.count_error("NOT_FOUND", 404)
         return APIResponse.error(
             message="Resource not found",
             status_code=404,
@@ -55,6 +95,7 @@ def create_app(config_name: str = "default") -> Flask:
     def handle_internal_error(error):
         if logger:
             log_error(logger, error, {"original_error": str(error)})
+        metrics.count_error("INTERNAL_SERVER_ERROR", 500)
         return APIResponse.error(
             message="Internal server error",
             status_code=500,
@@ -65,18 +106,24 @@ def create_app(config_name: str = "default") -> Flask:
     def handle_unexpected_error(error):
         if logger:
             log_error(logger, error, {"unexpected": True})
+        metrics.count_error("UNEXPECTED_ERROR", 500)
         return APIResponse.error(
             message="An unexpected error occurred",
             status_code=500,
             error_code="UNEXPECTED_ERROR"
         )
     
-    from app.routes import auth, quips, comments, users, health
+    from app.routes import auth, quips, comments, users, timeline, health, admin
     
     app.register_blueprint(health.bp, url_prefix="/api/v1")
     app.register_blueprint(auth.bp, url_prefix="/api/v1/auth")
     app.register_blueprint(quips.bp, url_prefix="/api/v1/quips")
     app.register_blueprint(comments.bp, url_prefix="/api/v1/quips")
     app.register_blueprint(users.bp, url_prefix="/api/v1/users")
+    app.register_blueprint(timeline.bp, url_prefix="/api/v1/timeline")
+    app.register_blueprint(admin.bp, url_prefix="/api/v1/admin")
+    
+    from app.commands import register_commands
+    register_commands(app)
     
     return app
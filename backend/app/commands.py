@@ -0,0 +1,54 @@
+import click
+from flask import Flask
+from flask.cli import AppGroup
+
+counters_cli = AppGroup("counters", help="Maintain denormalized engagement counters.")
+feed_cli = AppGroup("feed", help="Maintain feed ranking scores.")
+votes_cli = AppGroup("votes", help="Manage the buffered upvote queue.")
+timeline_cli = AppGroup("timeline", help="Maintain materialized home timelines.")
+
+
+@counters_cli.command("reconcile")
+@click.option("--batch-size", default=1000, show_default=True, help="Rows checked per batch.")
+@click.option("--dry-run", is_flag=True, help="Only report drift, do not repair it.")
+def reconcile_counters(batch_size: int, dry_run: bool):
+    from app.services.counter_service import CounterService
+
+    report = CounterService.reconcile(batch_size=batch_size, dry_run=dry_run)
+    for table, stats in report.items():
+        click.echo(f"{table}: checked={stats['checked']} drifted={stats['drifted']}")
+
+
+@feed_cli.command("rescore")
+@click.option("--batch-size", default=1000, show_default=True, help="Rows rescored per batch.")
+def rescore_feed(batch_size: int):
+    from app.services.ranking_service import RankingService
+
+    rescored = RankingService.rescore(batch_size=batch_size)
+    click.echo(f"quips: rescored={rescored}")
+
+
+@votes_cli.command("flush")
+@click.option("--batch-size", default=1000, show_default=True, help="Intents applied per batch.")
+def flush_votes(batch_size: int):
+    from app.services.vote_buffer_service import VoteBufferService
+
+    flushed = VoteBufferService.drain(batch_size=batch_size)
+    click.echo(f"vote_intents: flushed={flushed}")
+
+
+@timeline_cli.command("trim")
+@click.option("--max-entries", default=None, type=int, help="Entries kept per user (default: TIMELINE_MAX_ENTRIES).")
+@click.option("--batch-size", default=1000, show_default=True, help="Users trimmed per batch.")
+def trim_timelines(max_entries: int, batch_size: int):
+    from app.services.timeline_service import TimelineService
+
+    trimmed = TimelineService.trim(max_entries=max_entries, batch_size=batch_size)
+    click.echo(f"timeline_entries: deleted={trimmed}")
+
+
+def register_commands(app: Flask) -> None:
+    app.cli.add_command(counters_cli)
+    app.cli.add_command(feed_cli)
+    app.cli.add_command(votes_cli)
+    app.cli.add_command(timeline_cli)
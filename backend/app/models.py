@@ -1,4 +1,5 @@
 from datetime import datetime
+from sqlalchemy import DDL, event
 from app import db
 
 
@@ -11,6 +12,12 @@ class User(db.Model):
     password_hash = db.Column(db.String(255), nullable=False)
     bio = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    quips_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    quip_ups_received_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    reposts_received_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    followers_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    following_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
     quips = db.relationship("Quip", back_populates="author", cascade="all, delete-orphan")
     comments = db.relationship("Comment", back_populates="author", cascade="all, delete-orphan")
@@ -21,6 +28,10 @@ class User(db.Model):
 
 class Quip(db.Model):
     __tablename__ = "quips"
+    __table_args__ = (
+        db.Index("idx_quips_user_ups", "user_id", "quip_ups_count"),
+        db.Index("idx_quips_created_ups", "created_at", "quip_ups_count", "id"),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
@@ -28,6 +39,11 @@ class Quip(db.Model):
     usage_examples = db.Column(db.Text, nullable=True)
     definition = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    quip_ups_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    comments_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    reposts_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    hot_score = db.Column(db.Float, default=0.0, server_default="0", nullable=False, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
     author = db.relationship("User", back_populates="quips")
     comments = db.relationship("Comment", back_populates="quip", cascade="all, delete-orphan")
@@ -44,6 +60,8 @@ class Comment(db.Model):
     parent_comment_id = db.Column(db.Integer, db.ForeignKey("comments.id"), nullable=True)
     content = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    comment_ups_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
     author = db.relationship("User", back_populates="comments")
     quip = db.relationship("Quip", back_populates="comments")
@@ -82,3 +100,81 @@ class Repost(db.Model):
     
     user = db.relationship("User", back_populates="reposts")
     quip = db.relationship("Quip", back_populates="reposts")
+
+
+class Follow(db.Model):
+    __tablename__ = "follows"
+    __table_args__ = (
+        db.Index("idx_follows_followee_follower", "followee_id", "follower_id"),
+    )
+    
+    follower_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    followee_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+
+class TimelineEntry(db.Model):
+    """One quip in a user's materialized home timeline, written by TimelineService.fan_out.
+
+    ``actor_id`` posted or (``reposted``) reposted the quip; ``created_at`` is the time of
+    that event, which orders the timeline.
+    """
+    __tablename__ = "timeline_entries"
+    __table_args__ = (
+        db.Index("idx_timeline_user_created_quip", "user_id", "created_at", "quip_id"),
+        db.Index("idx_timeline_quip", "quip_id"),
+    )
+    
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    quip_id = db.Column(db.Integer, db.ForeignKey("quips.id", ondelete="CASCADE"), primary_key=True)
+    actor_id = db.Column(db.Integer, nullable=False)
+    reposted = db.Column(db.Boolean, default=False, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+
+
+class VoteIntent(db.Model):
+    """Buffered upvote/un-upvote, applied in batches by VoteBufferService.flush."""
+    __tablename__ = "vote_intents"
+    __table_args__ = (
+        db.Index("idx_vote_intents_user_quip", "user_id", "quip_id"),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    quip_id = db.Column(db.Integer, nullable=False)
+    upvoted = db.Column(db.Boolean, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+
+# Full-text search over quips lives outside the ORM mapping: a generated tsvector with a
+# GIN index on Postgres, an external-content FTS5 table kept in sync by triggers on SQLite.
+# Migration 9a4f6b2c8e13 issues the same statements for existing databases.
+QUIP_SEARCH_DDL = {
+    "postgresql": [
+        "ALTER TABLE quips ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('simple', coalesce(content, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(definition, '')), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(usage_examples, '')), 'C')) STORED",
+        "CREATE INDEX idx_quips_search_vector ON quips USING gin (search_vector)",
+    ],
+    "sqlite": [
+        "CREATE VIRTUAL TABLE quips_fts USING fts5(content, definition, usage_examples, "
+        "content='quips', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        "CREATE TRIGGER quips_fts_ai AFTER INSERT ON quips BEGIN "
+        "INSERT INTO quips_fts (rowid, content, definition, usage_examples) "
+        "VALUES (new.id, new.content, new.definition, new.usage_examples); END",
+        "CREATE TRIGGER quips_fts_ad AFTER DELETE ON quips BEGIN "
+        "INSERT INTO quips_fts (quips_fts, rowid, content, definition, usage_examples) "
+        "VALUES ('delete', old.id, old.content, old.definition, old.usage_examples); END",
+        "CREATE TRIGGER quips_fts_au AFTER UPDATE OF content, definition, usage_examples ON quips BEGIN "
+        "INSERT INTO quips_fts (quips_fts, rowid, content, definition, usage_examples) "
+        "VALUES ('delete', old.id, old.content, old.definition, old.usage_examples); "
+        "INSERT INTO quips_fts (rowid, content, definition, usage_examples) "
+        "VALUES (new.id, new.content, new.definition, new.usage_examples); END",
+    ],
+}
+
+for _dialect, _statements in QUIP_SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(Quip.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+event.listen(Quip.__table__, "before_drop", DDL("DROP TABLE IF EXISTS quips_fts").execute_if(dialect="sqlite"))
@@ -0,0 +1,51 @@
+from functools import wraps
+from typing import Callable
+from flask import Blueprint, current_app, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app import db, slow_queries
+from app.models import User
+from app.utils.response import APIResponse
+from app.utils.errors import AuthorizationError, NotFoundError, ValidationError
+
+bp = Blueprint("admin", __name__)
+
+MAX_REPORT_LIMIT = 500
+
+
+def admin_required(fn: Callable) -> Callable:
+    """Only users listed in ``ADMIN_USERNAMES`` may call the endpoint."""
+    @wraps(fn)
+    @jwt_required()
+    def wrapper(*args, **kwargs):
+        username = db.session.query(User.username).filter(User.id == int(get_jwt_identity())).scalar()
+        if username is None or username not in current_app.config.get("ADMIN_USERNAMES", []):
+            raise AuthorizationError()
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+@bp.route("/slow-queries", methods=["GET"])
+@admin_required
+def get_slow_queries():
+    if not slow_queries.enabled:
+        raise NotFoundError("Slow query log is disabled")
+    try:
+        limit = int(request.args.get("limit", 50))
+    except ValueError:
+        raise ValidationError("Limit must be a valid integer")
+    if not 1 <= limit <= MAX_REPORT_LIMIT:
+        raise ValidationError(f"Limit must be between 1 and {MAX_REPORT_LIMIT}")
+
+    return APIResponse.success(data=slow_queries.report(limit), meta={
+        "threshold_ms": round(slow_queries.threshold * 1000, 1),
+        "explain_sample_rate": slow_queries.explain_rate
+    })
+
+
+@bp.route("/slow-queries", methods=["DELETE"])
+@admin_required
+def reset_slow_queries():
+    if not slow_queries.enabled:
+        raise NotFoundError("Slow query log is disabled")
+    slow_queries.reset()
+    return APIResponse.success(message="Slow query log cleared")
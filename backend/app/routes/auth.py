@@ -64,20 +64,12 @@ def login():
 @jwt_required()
 def get_current_user():
     user_id = int(get_jwt_identity())
-    user = AuthService.get_user_by_id(user_id)
+    user = AuthService.get_profile(user_id)
     
     if not user:
         raise NotFoundError("User not found")
     
-    return APIResponse.success(
-        data={
-            "id": user.id,
-            "username": user.username,
-            "email": user.email,
-            "bio": user.bio,
-            "created_at": user.created_at.isoformat()
-        }
-    )
+    return APIResponse.success(data=user)
 
 
 @bp.route("/me", methods=["PUT"])
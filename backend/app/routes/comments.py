@@ -1,31 +1,87 @@
+from typing import Optional
 from flask import Blueprint, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.services.comment_service import CommentService
+from app.services.viewer_service import ViewerService
 from app.schemas import CommentCreateSchema
-from app.utils.response import APIResponse
+from app.serializers import CommentSerializer
+from app.utils.response import APIResponse, make_etag
+from app.utils.cache import cached_response, tag_response
+from app.utils.viewer import viewer_state_requested
 from app.utils.errors import ValidationError, NotFoundError, ConflictError
 from pydantic import ValidationError as PydanticValidationError
 
 bp = Blueprint("comments", __name__)
 
 
+MAX_COMMENTS_LIMIT = 100
+MAX_THREAD_DEPTH = 10
+
+
+def _parse_thread_args() -> tuple[int, int, Optional[str]]:
+    try:
+        limit = int(request.args.get("limit", 20))
+        max_depth = int(request.args.get("max_depth", 3))
+    except ValueError:
+        raise ValidationError("Limit and max_depth must be valid integers")
+    
+    if not 1 <= limit <= MAX_COMMENTS_LIMIT:
+        raise ValidationError(f"Limit must be between 1 and {MAX_COMMENTS_LIMIT}")
+    if not 0 <= max_depth <= MAX_THREAD_DEPTH:
+        raise ValidationError(f"max_depth must be between 0 and {MAX_THREAD_DEPTH}")
+    
+    return limit, max_depth, request.args.get("cursor")
+
+
+def _thread_response(rows: list, root_ids: list[int], max_depth: int, next_cursor: Optional[str]):
+    viewer_id = viewer_state_requested()
+    viewer_state = ViewerService.comment_state(viewer_id, [row.id for row in rows]) if viewer_id else None
+    etag = make_etag([(row.id, row.updated_at, bool(row.has_replies)) for row in rows], root_ids,
+                     next_cursor, viewer_state)
+    not_modified = APIResponse.not_modified(etag, private=bool(viewer_id))
+    if not_modified:
+        return not_modified
+    
+    return APIResponse.success(
+        data=CommentSerializer.serialize_tree(rows, root_ids, max_depth, viewer_state),
+        meta={"next_cursor": next_cursor},
+        etag=etag,
+        private=bool(viewer_id)
+    )
+
+
 @bp.route("/<int:quip_id>/comments", methods=["GET"])
+@cached_response(unless=viewer_state_requested)
 def get_comments(quip_id: int):
-    comments = CommentService.get_quip_comments(quip_id)
+    limit, max_depth, cursor = _parse_thread_args()
+    
+    try:
+        rows, root_ids, next_cursor = CommentService.get_quip_comments(
+            quip_id, limit=limit, cursor=cursor, max_depth=max_depth
+        )
+    except ValueError as e:
+        raise ValidationError(str(e))
+    
+    tag_response(f"comments:{quip_id}", *[f"comment:{row.id}" for row in rows])
+    return _thread_response(rows, root_ids, max_depth, next_cursor)
+
+
+@bp.route("/comments/<int:comment_id>/replies", methods=["GET"])
+@cached_response(unless=viewer_state_requested)
+def get_comment_replies(comment_id: int):
+    limit, max_depth, cursor = _parse_thread_args()
     
-    def serialize_comment(comment):
-        return {
-            "id": comment.id,
-            "user_id": comment.user_id,
-            "username": comment.author.username,
-            "content": comment.content,
-            "created_at": comment.created_at.isoformat(),
-            "comment_ups_count": len(comment.comment_ups or []),  # type: ignore
-            "replies": [serialize_comment(reply) for reply in comment.replies or []]
-        }
+    try:
+        rows, reply_ids, next_cursor = CommentService.get_replies(
+            comment_id, limit=limit, cursor=cursor, max_depth=max_depth
+        )
+    except ValueError as e:
+        if "not found" in str(e):
+            raise NotFoundError(str(e))
+        raise ValidationError(str(e))
     
-    comments_data = [serialize_comment(comment) for comment in comments]
-    return APIResponse.success(data=comments_data)
+    tag_response(f"comment:{comment_id}", *[f"comment:{row.id}" for row in rows])
+    return _thread_response(rows, reply_ids, max_depth, next_cursor)
 
 
 @bp.route("/<int:quip_id>/comments", methods=["POST"])
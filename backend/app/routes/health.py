@@ -1,6 +1,8 @@
-from flask import Blueprint, jsonify
+import hmac
+from flask import Blueprint, Response, current_app, jsonify, request
 from datetime import datetime
-from app import db
+from app import db, metrics
+from app.utils.errors import AuthenticationError, NotFoundError
 
 bp = Blueprint("health", __name__)
 
@@ -20,22 +22,35 @@ def api_info():
             },
             "quips": {
                 "list": "GET /api/v1/quips",
+                "search": "GET /api/v1/quips/search?q=<query>",
                 "create": "POST /api/v1/quips",
                 "get": "GET /api/v1/quips/<id>",
                 "upvote": "POST /api/v1/quips/<id>/up",
                 "remove_upvote": "DELETE /api/v1/quips/<id>/up",
-                "repost": "POST /api/v1/quips/<id>/repost"
+                "repost": "POST /api/v1/quips/<id>/repost",
+                "viewer_state": "POST /api/v1/quips/viewer-state"
             },
             "comments": {
                 "list": "GET /api/v1/quips/<id>/comments",
                 "create": "POST /api/v1/quips/<id>/comments",
+                "replies": "GET /api/v1/quips/comments/<id>/replies",
                 "upvote": "POST /api/v1/quips/comments/<id>/up",
                 "remove_upvote": "DELETE /api/v1/quips/comments/<id>/up"
             },
             "users": {
                 "profile": "GET /api/v1/users/<username>",
                 "quips": "GET /api/v1/users/<username>/quips",
-                "reposts": "GET /api/v1/users/<username>/reposts"
+                "reposts": "GET /api/v1/users/<username>/reposts",
+                "follow": "POST /api/v1/users/<username>/follow",
+                "unfollow": "DELETE /api/v1/users/<username>/follow"
+            },
+            "timeline": {
+                "home": "GET /api/v1/timeline"
+            },
+            "metrics": "GET /api/v1/metrics",
+            "admin": {
+                "slow_queries": "GET /api/v1/admin/slow-queries",
+                "reset_slow_queries": "DELETE /api/v1/admin/slow-queries"
             }
         },
         "documentation": "https://github.com/CSSSensei/quiply"
@@ -50,8 +65,20 @@ def health_check():
     except Exception as e:
         db_status = f"unhealthy: {str(e)}"
     
+    # Public liveness probe: cache and admission internals are published only via /metrics.
     return jsonify({
         "status": "ok" if db_status == "healthy" else "error",
         "database": db_status,
         "timestamp": datetime.utcnow().isoformat()
     }), 200 if db_status == "healthy" else 503
+
+
+@bp.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    if not metrics.enabled:
+        raise NotFoundError("Metrics are disabled")
+    token = current_app.config.get("METRICS_TOKEN")
+    if token and not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        raise AuthenticationError("Metrics require the scrape token")
+    body, content_type = metrics.render()
+    return Response(body, content_type=content_type)
@@ -1,15 +1,25 @@
 from flask import Blueprint, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.services.quip_service import QuipService
-from app.schemas import QuipCreateSchema
-from app.utils.response import APIResponse
+from app.services.search_service import SearchService
+from app.services.viewer_service import ViewerService
+from app.services.vote_buffer_service import VoteBufferService
+from app.schemas import QuipCreateSchema, ViewerStateSchema
+from app.serializers import QuipSerializer
+from app.utils.response import APIResponse, list_etag, make_etag
+from app.utils.cache import cached_response, tag_response
+from app.utils.viewer import viewer_state_requested
 from app.utils.errors import ValidationError, NotFoundError, AuthorizationError, ConflictError
 from pydantic import ValidationError as PydanticValidationError
 
 bp = Blueprint("quips", __name__)
 
 
+MAX_SEARCH_QUERY_LENGTH = 200
+
+
 @bp.route("", methods=["GET"])
+@cached_response(unless=viewer_state_requested)
 def get_feed():
     sort = request.args.get("sort", "smart")
     try:
@@ -17,22 +27,79 @@ def get_feed():
     except ValueError:
         raise ValidationError("Page must be a valid integer")
     
-    quips = QuipService.get_feed(sort=sort, page=page)
+    window = request.args.get("window", "24h")
+    cursor = request.args.get("cursor")
+    
+    try:
+        quips, next_cursor = QuipService.get_feed(sort=sort, page=page, window=window, cursor=cursor)
+    except ValueError as e:
+        raise ValidationError(str(e))
     
-    quips_data = [{
-        "id": quip.id,
-        "user_id": quip.user_id,
-        "username": quip.author.username,
-        "content": quip.content,
-        "definition": quip.definition,
-        "usage_examples": quip.usage_examples,
-        "created_at": quip.created_at.isoformat(),
-        "quip_ups_count": len(quip.quip_ups or []),  # type: ignore
-        "comments_count": len(quip.comments or []),  # type: ignore
-        "reposts_count": len(quip.reposts or [])  # type: ignore
-    } for quip in quips]
+    tag_response("feed", *[f"quip:{quip.id}" for quip in quips])
+    viewer_id = viewer_state_requested()
+    viewer_state = ViewerService.quip_state(viewer_id, [quip.id for quip in quips]) if viewer_id else None
+    etag = list_etag(quips, next_cursor, viewer_state)
+    not_modified = APIResponse.not_modified(etag, private=bool(viewer_id))
+    if not_modified:
+        return not_modified
     
-    return APIResponse.success(data=quips_data)
+    return APIResponse.success(
+        data=QuipSerializer.serialize_many(quips, viewer_state),
+        meta={"next_cursor": next_cursor},
+        etag=etag,
+        private=bool(viewer_id)
+    )
+
+
+@bp.route("/search", methods=["GET"])
+@cached_response(unless=viewer_state_requested)
+def search_quips():
+    q = request.args.get("q", "").strip()
+    if not q:
+        raise ValidationError("Query parameter 'q' is required")
+    if len(q) > MAX_SEARCH_QUERY_LENGTH:
+        raise ValidationError(f"Query must be at most {MAX_SEARCH_QUERY_LENGTH} characters")
+    
+    try:
+        quips, snippets, next_cursor = SearchService.search(q, cursor=request.args.get("cursor"))
+    except ValueError as e:
+        raise ValidationError(str(e))
+    
+    tag_response("feed", *[f"quip:{quip.id}" for quip in quips])
+    viewer_id = viewer_state_requested()
+    viewer_state = ViewerService.quip_state(viewer_id, [quip.id for quip in quips]) if viewer_id else None
+    etag = list_etag(quips, next_cursor, viewer_state)
+    not_modified = APIResponse.not_modified(etag, private=bool(viewer_id))
+    if not_modified:
+        return not_modified
+    
+    return APIResponse.success(
+        data=QuipSerializer.serialize_many(
+            quips, viewer_state, extra={quip.id: {"snippet": snippets.get(quip.id, "")} for quip in quips}
+        ),
+        meta={"next_cursor": next_cursor},
+        etag=etag,
+        private=bool(viewer_id)
+    )
+
+
+@bp.route("/viewer-state", methods=["POST"])
+@jwt_required()
+def get_viewer_state():
+    user_id = int(get_jwt_identity())
+    data = request.get_json()
+    
+    try:
+        validated_data = ViewerStateSchema(**data)
+    except PydanticValidationError as e:
+        raise ValidationError("Validation failed", details={"validation_errors": e.errors()})
+    
+    quip_state = ViewerService.quip_state(user_id, validated_data.quip_ids)
+    comment_state = ViewerService.comment_state(user_id, validated_data.comment_ids)
+    return APIResponse.success(data={
+        "quips": {str(quip_id): state for quip_id, state in quip_state.items()},
+        "comments": {str(comment_id): state for comment_id, state in comment_state.items()}
+    })
 
 
 @bp.route("", methods=["POST"])
@@ -52,15 +119,7 @@ def create_quip():
     try:
         quip = QuipService.create(user_id, content, definition, usage_examples)
         return APIResponse.success(
-            data={
-                "id": quip.id,
-                "user_id": quip.user_id,
-                "username": quip.author.username,
-                "content": quip.content,
-                "definition": quip.definition,
-                "usage_examples": quip.usage_examples,
-                "created_at": quip.created_at.isoformat()
-            },
+            data=QuipSerializer.serialize(quip),
             message="Quip created successfully",
             status_code=201
         )
@@ -69,26 +128,20 @@ def create_quip():
 
 
 @bp.route("/<int:quip_id>", methods=["GET"])
+@cached_response()
 def get_quip(quip_id: int):
     quip = QuipService.get_by_id(quip_id)
     
     if not quip:
         raise NotFoundError("Quip not found")
     
-    return APIResponse.success(
-        data={
-            "id": quip.id,
-            "user_id": quip.user_id,
-            "username": quip.author.username,
-            "content": quip.content,
-            "definition": quip.definition,
-            "usage_examples": quip.usage_examples,
-            "created_at": quip.created_at.isoformat(),
-            "quip_ups_count": len(quip.quip_ups or []),  # type: ignore
-            "comments_count": len(quip.comments or []),  # type: ignore
-            "reposts_count": len(quip.reposts or [])  # type: ignore
-        }
-    )
+    tag_response(f"quip:{quip_id}")
+    etag = make_etag(quip.id, quip.updated_at)
+    not_modified = APIResponse.not_modified(etag, quip.updated_at)
+    if not_modified:
+        return not_modified
+    
+    return APIResponse.success(data=QuipSerializer.serialize(quip), etag=etag, last_modified=quip.updated_at)
 
 
 @bp.route("/<int:quip_id>", methods=["DELETE"])
@@ -113,6 +166,9 @@ def add_quip_up(quip_id: int):
     user_id = int(get_jwt_identity())
     
     try:
+        if VoteBufferService.enabled():
+            VoteBufferService.append(user_id, quip_id, True)
+            return APIResponse.success(message="Upvote accepted", status_code=202)
         QuipService.add_up(user_id, quip_id)
         return APIResponse.success(message="Upvoted successfully", status_code=201)
     except ValueError as e:
@@ -129,6 +185,9 @@ def remove_quip_up(quip_id: int):
     user_id = int(get_jwt_identity())
     
     try:
+        if VoteBufferService.enabled():
+            VoteBufferService.append(user_id, quip_id, False)
+            return APIResponse.success(message="Upvote removal accepted", status_code=202)
         QuipService.remove_up(user_id, quip_id)
         return APIResponse.success(message="Upvote removed successfully")
     except ValueError as e:
@@ -0,0 +1,32 @@
+from flask import Blueprint, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app import user_cache
+from app.services.timeline_service import TimelineService
+from app.serializers import QuipSerializer
+from app.utils.response import APIResponse
+from app.utils.errors import ValidationError
+
+bp = Blueprint("timeline", __name__)
+
+
+@bp.route("", methods=["GET"])
+@jwt_required()
+def get_home_timeline():
+    user_id = int(get_jwt_identity())
+    
+    try:
+        items, next_cursor = TimelineService.get_home_timeline(user_id, cursor=request.args.get("cursor"))
+    except ValueError as e:
+        raise ValidationError(str(e))
+    
+    reposter_ids = {actor_id for _, _, actor_id, reposted in items if reposted}
+    reposters = user_cache.usernames(reposter_ids) if reposter_ids else {}
+    
+    data = QuipSerializer.serialize_many([quip_id for _, quip_id, _, _ in items], extra={
+        quip_id: {
+            "timeline_at": created_at.isoformat(),
+            "reposted_by": {"id": actor_id, "username": reposters.get(actor_id)} if reposted else None
+        } for created_at, quip_id, actor_id, reposted in items
+    })
+    
+    return APIResponse.success(data=data, meta={"next_cursor": next_cursor})
@@ -1,23 +1,35 @@
 from flask import Blueprint, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.services.quip_service import QuipService
+from app.services.timeline_service import TimelineService
+from app.services.viewer_service import ViewerService
+from app import user_cache
 from app.models import User
-from app.utils.response import APIResponse
-from app.utils.errors import ValidationError, NotFoundError
+from app.serializers import QuipSerializer
+from app.utils.response import APIResponse, make_etag, list_etag
+from app.utils.cache import cached_response, tag_response
+from app.utils.viewer import viewer_state_requested
+from app.utils.errors import ValidationError, NotFoundError, ConflictError
 
 bp = Blueprint("users", __name__)
 
 
 @bp.route("/<string:username>", methods=["GET"])
+@cached_response()
 def get_user_profile(username: str):
-    user = User.query.filter_by(username=username).first()
+    # Unknown names are answered from the cache; the row itself is needed for the live counters.
+    user_id = user_cache.id_for(username)
+    user = User.query.get(user_id) if user_id is not None else None
     
     if not user:
         raise NotFoundError("User not found")
     
-    total_quip_ups = sum(len(quip.quip_ups or []) for quip in user.quips or [])  # type: ignore
-    total_reposts = sum(len(quip.reposts or []) for quip in user.quips or [])  # type: ignore
-    
-    top_quips = sorted(user.quips or [], key=lambda q: len(q.quip_ups or []), reverse=True)[:3]  # type: ignore
+    top_quips = QuipService.get_top_quips(user.id, limit=3)
+    tag_response(f"author:{user.id}", *[f"quip:{quip.id}" for quip in top_quips])
+    etag = make_etag(user.id, user.updated_at, [tuple(quip) for quip in top_quips])
+    not_modified = APIResponse.not_modified(etag)
+    if not_modified:
+        return not_modified
     
     return APIResponse.success(
         data={
@@ -26,41 +38,48 @@ def get_user_profile(username: str):
             "bio": user.bio,
             "created_at": user.created_at.isoformat(),
             "stats": {
-                "total_quips": len(user.quips or []),  # type: ignore
-                "total_quip_ups": total_quip_ups,
-                "total_reposts": total_reposts
+                "total_quips": user.quips_count,
+                "total_quip_ups": user.quip_ups_received_count,
+                "total_reposts": user.reposts_received_count,
+                "followers": user.followers_count,
+                "following": user.following_count
             },
             "top_quips": [{
                 "id": quip.id,
                 "content": quip.content,
-                "quip_ups_count": len(quip.quip_ups or [])  # type: ignore
+                "quip_ups_count": quip.quip_ups_count
             } for quip in top_quips]
-        }
+        },
+        etag=etag
     )
 
 
 @bp.route("/<string:username>/quips", methods=["GET"])
+@cached_response(unless=viewer_state_requested)
 def get_user_quips(username: str):
     try:
         page = int(request.args.get("page", 1))
     except ValueError:
         raise ValidationError("Page must be a valid integer")
     
+    cursor = request.args.get("cursor")
+    
     try:
-        quips = QuipService.get_user_quips(username, page=page)
-        quips_data = [{
-            "id": quip.id,
-            "user_id": quip.user_id,
-            "username": quip.author.username,
-            "content": quip.content,
-            "definition": quip.definition,
-            "usage_examples": quip.usage_examples,
-            "created_at": quip.created_at.isoformat(),
-            "quip_ups_count": len(quip.quip_ups or []),  # type: ignore
-            "comments_count": len(quip.comments or []),  # type: ignore
-            "reposts_count": len(quip.reposts or [])  # type: ignore
-        } for quip in quips]
-        return APIResponse.success(data=quips_data)
+        quips, next_cursor = QuipService.get_user_quips(username, page=page, cursor=cursor)
+        tag_response(*[f"quip:{quip.id}" for quip in quips])
+        viewer_id = viewer_state_requested()
+        viewer_state = ViewerService.quip_state(viewer_id, [quip.id for quip in quips]) if viewer_id else None
+        etag = list_etag(quips, next_cursor, viewer_state)
+        not_modified = APIResponse.not_modified(etag, private=bool(viewer_id))
+        if not_modified:
+            return not_modified
+        
+        return APIResponse.success(
+            data=QuipSerializer.serialize_many(quips, viewer_state),
+            meta={"next_cursor": next_cursor},
+            etag=etag,
+            private=bool(viewer_id)
+        )
     except ValueError as e:
         if "not found" in str(e):
             raise NotFoundError(str(e))
@@ -68,28 +87,64 @@ def get_user_quips(username: str):
 
 
 @bp.route("/<string:username>/reposts", methods=["GET"])
+@cached_response(unless=viewer_state_requested)
 def get_user_reposts(username: str):
     try:
         page = int(request.args.get("page", 1))
     except ValueError:
         raise ValidationError("Page must be a valid integer")
     
+    cursor = request.args.get("cursor")
+    
     try:
-        quips = QuipService.get_user_reposts(username, page=page)
-        quips_data = [{
-            "id": quip.id,
-            "user_id": quip.user_id,
-            "username": quip.author.username,
-            "content": quip.content,
-            "definition": quip.definition,
-            "usage_examples": quip.usage_examples,
-            "created_at": quip.created_at.isoformat(),
-            "quip_ups_count": len(quip.quip_ups or []),  # type: ignore
-            "comments_count": len(quip.comments or []),  # type: ignore
-            "reposts_count": len(quip.reposts or [])  # type: ignore
-        } for quip in quips]
-        return APIResponse.success(data=quips_data)
+        quips, next_cursor = QuipService.get_user_reposts(username, page=page, cursor=cursor)
+        tag_response(*[f"quip:{quip.id}" for quip in quips])
+        viewer_id = viewer_state_requested()
+        viewer_state = ViewerService.quip_state(viewer_id, [quip.id for quip in quips]) if viewer_id else None
+        etag = list_etag(quips, next_cursor, viewer_state)
+        not_modified = APIResponse.not_modified(etag, private=bool(viewer_id))
+        if not_modified:
+            return not_modified
+        
+        return APIResponse.success(
+            data=QuipSerializer.serialize_many(quips, viewer_state),
+            meta={"next_cursor": next_cursor},
+            etag=etag,
+            private=bool(viewer_id)
+        )
     except ValueError as e:
         if "not found" in str(e):
             raise NotFoundError(str(e))
         raise ValidationError(str(e))
+
+
+@bp.route("/<string:username>/follow", methods=["POST"])
+@jwt_required()
+def follow_user(username: str):
+    user_id = int(get_jwt_identity())
+    
+    try:
+        TimelineService.follow(user_id, username)
+        return APIResponse.success(message="Followed successfully", status_code=201)
+    except ValueError as e:
+        if "Already following" in str(e):
+            raise ConflictError(str(e))
+        elif "not found" in str(e):
+            raise NotFoundError(str(e))
+        raise ValidationError(str(e))
+
+
+@bp.route("/<string:username>/follow", methods=["DELETE"])
+@jwt_required()
+def unfollow_user(username: str):
+    user_id = int(get_jwt_identity())
+    
+    try:
+        TimelineService.unfollow(user_id, username)
+        return APIResponse.success(message="Unfollowed successfully")
+    except ValueError as e:
+        if "Not following" in str(e):
+            raise ConflictError(str(e))
+        elif "not found" in str(e):
+            raise NotFoundError(str(e))
+        raise ValidationError(str(e))
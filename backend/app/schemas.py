@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr, Field, validator
 import re
-from typing import Optional
+from typing import List, Optional
 
 
 class UserRegistrationSchema(BaseModel):
@@ -36,6 +36,11 @@ class QuipUpdateSchema(BaseModel):
     usage_examples: Optional[str] = Field(None, max_length=1000, description="Usage examples must be less than 1000 characters")
 
 
+class ViewerStateSchema(BaseModel):
+    quip_ids: List[int] = Field(default_factory=list, max_length=100, description="Up to 100 quip IDs")
+    comment_ids: List[int] = Field(default_factory=list, max_length=200, description="Up to 200 comment IDs")
+
+
 class CommentCreateSchema(BaseModel):
     content: str = Field(..., min_length=1, max_length=1000, description="Comment must be 1-1000 characters")
     parent_id: Optional[int] = Field(None, description="Parent comment ID for replies")
@@ -0,0 +1,127 @@
+from typing import Any, Iterable, Optional, Union
+from flask import current_app
+from app import user_cache
+from app.models import Quip
+from app.utils.json_provider import encode_fragment, encode_members
+from app.utils.query_stats import timed_function
+
+QUIP_COUNTERS = ("quip_ups_count", "comments_count", "reposts_count")
+
+
+class QuipSerializer:
+    @staticmethod
+    def serialize(quip: Quip) -> Any:
+        return QuipSerializer.serialize_many([quip])[0]
+
+    @staticmethod
+    @timed_function("serialize")
+    def serialize_many(quips: Iterable[Union[Quip, int]],
+                       viewer_state: Optional[dict[int, dict[str, bool]]] = None,
+                       extra: Optional[dict[int, dict[str, Any]]] = None) -> list[Any]:
+        """Quips as JSON-ready items; ``extra`` adds per-quip fields (e.g. a search snippet).
+
+        With the orjson provider the items are pre-encoded fragments and must not
+        be modified: pass additional fields through ``extra``.
+        """
+        quips = list(quips)
+        if not quips:
+            return []
+
+        if isinstance(quips[0], int):
+            quips = QuipSerializer._load(quips)  # type: ignore
+
+        fragments = current_app.extensions.get("quip_fragments")
+        if fragments is not None:
+            return QuipSerializer._encode_many(quips, fragments, viewer_state, extra)  # type: ignore
+
+        usernames = user_cache.usernames(quip.user_id for quip in quips)  # type: ignore
+
+        serialized = [{
+            "id": quip.id,
+            "user_id": quip.user_id,
+            "username": usernames.get(quip.user_id),
+            "content": quip.content,
+            "definition": quip.definition,
+            "usage_examples": quip.usage_examples,
+            "created_at": quip.created_at.isoformat(),
+            "quip_ups_count": quip.quip_ups_count,
+            "comments_count": quip.comments_count,
+            "reposts_count": quip.reposts_count
+        } for quip in quips]  # type: ignore
+        if viewer_state is not None:
+            for item in serialized:
+                item["viewer_state"] = viewer_state.get(item["id"], {"upvoted": False, "reposted": False})
+        if extra is not None:
+            for item in serialized:
+                item.update(extra.get(item["id"], {}))
+        return serialized
+
+    @staticmethod
+    def _encode_many(quips: list[Quip], fragments: Any,
+                     viewer_state: Optional[dict[int, dict[str, bool]]],
+                     extra: Optional[dict[int, dict[str, Any]]]) -> list[Any]:
+        # id, author, text and created_at never change, so their encoding is cached
+        # per quip; live counters and per-request fields are appended to it.
+        # created_at is part of the key because SQLite may reuse a deleted quip's id.
+        static = {quip.id: fragments.get((quip.id, quip.created_at)) for quip in quips}
+        missing = [quip for quip in quips if static[quip.id] is None]
+        if missing:
+            usernames = user_cache.usernames(quip.user_id for quip in missing)
+            for quip in missing:
+                static[quip.id] = b"{" + encode_members({
+                    "id": quip.id,
+                    "user_id": quip.user_id,
+                    "username": usernames.get(quip.user_id),
+                    "content": quip.content,
+                    "definition": quip.definition,
+                    "usage_examples": quip.usage_examples,
+                    "created_at": quip.created_at.isoformat()
+                })
+                fragments.set((quip.id, quip.created_at), static[quip.id])
+
+        items = []
+        for quip in quips:
+            parts = [static[quip.id], b',"quip_ups_count":%d,"comments_count":%d,"reposts_count":%d' % (
+                quip.quip_ups_count, quip.comments_count, quip.reposts_count
+            )]
+            if viewer_state is not None:
+                parts.append(b"," + encode_members({
+                    "viewer_state": viewer_state.get(quip.id, {"upvoted": False, "reposted": False})
+                }))
+            if extra is not None and extra.get(quip.id):
+                parts.append(b"," + encode_members(extra[quip.id]))
+            parts.append(b"}")
+            items.append(encode_fragment(parts))
+        return items
+
+    @staticmethod
+    def _load(quip_ids: list[int]) -> list[Quip]:
+        by_id = {quip.id: quip for quip in Quip.query.filter(Quip.id.in_(quip_ids)).all()}
+        return [by_id[quip_id] for quip_id in quip_ids if quip_id in by_id]
+
+
+class CommentSerializer:
+    @staticmethod
+    @timed_function("serialize")
+    def serialize_tree(rows: list[Any], root_ids: list[int], max_depth: int,
+                       viewer_state: Optional[dict[int, dict[str, bool]]] = None) -> list[dict[str, Any]]:
+        nodes: dict[int, dict[str, Any]] = {}
+        for row in rows:
+            node = {
+                "id": row.id,
+                "user_id": row.user_id,
+                "username": row.username,
+                "parent_comment_id": row.parent_comment_id,
+                "content": row.content,
+                "created_at": row.created_at.isoformat(),
+                "comment_ups_count": row.comment_ups_count,
+                "replies": [],
+                "has_more_replies": bool(row.has_replies) and row.depth >= max_depth
+            }
+            if viewer_state is not None:
+                node["viewer_state"] = viewer_state.get(row.id, {"upvoted": False})
+            nodes[row.id] = node
+            if row.depth > 0 and row.parent_comment_id in nodes:
+                nodes[row.parent_comment_id]["replies"].append(node)
+
+        return [nodes[root_id] for root_id in root_ids if root_id in nodes]
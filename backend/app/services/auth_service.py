@@ -1,33 +1,33 @@
-from typing import Optional
-import bcrypt
+from typing import Any, Optional
 from flask_jwt_extended import create_access_token
-from app import db
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from app import db, cache, password_hasher, user_cache
 from app.models import User
-from app.utils.logger import setup_logger, log_info, log_error, log_warning
+from app.utils.sql import violated_column
+from app.utils.logger import get_logger, log_info, log_error, log_warning
 
-logger = setup_logger()
+logger = get_logger("auth")
 
 
 class AuthService:
     @staticmethod
     def hash_password(password: str) -> str:
-        return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+        return password_hasher.hash(password)
     
     @staticmethod
     def verify_password(password: str, password_hash: str) -> bool:
-        return bcrypt.checkpw(password.encode("utf-8"), password_hash.encode("utf-8"))
+        return password_hasher.verify(password, password_hash)
     
     @staticmethod
     def register(username: str, email: str, password: str) -> User:
-        log_info(logger, "User registration attempt", {"username": username, "email": email})
+        log_info(logger, "User registration attempt", lambda: {"username": username, "email": email})
         
-        if User.query.filter_by(username=username).first():
-            log_warning(logger, "Registration failed - username already exists", {"username": username})
-            raise ValueError("Username already exists")
-        
-        if User.query.filter_by(email=email).first():
-            log_warning(logger, "Registration failed - email already exists", {"email": email})
-            raise ValueError("Email already exists")
+        # Cheap probe first, so repeated sign-ups with a taken name do not each cost a bcrypt.
+        taken = db.session.query(User.username).filter(or_(User.username == username, User.email == email)).first()
+        db.session.rollback()  # do not hold a pooled connection while bcrypt runs
+        if taken is not None:
+            AuthService._reject_duplicate("username" if taken.username == username else "email", username, email)
         
         password_hash = AuthService.hash_password(password)
         user = User()
@@ -35,43 +35,80 @@ class AuthService:
         user.email = email
         user.password_hash = password_hash
         
+        # The unique indexes still decide races between concurrent sign-ups.
         try:
             db.session.add(user)
             db.session.commit()
-            log_info(logger, "User registered successfully", {"user_id": user.id, "username": username})
+            user_cache.invalidate(username=username)
+            log_info(logger, "User registered successfully", lambda: {"user_id": user.id, "username": username})
             return user
+        except IntegrityError as e:
+            db.session.rollback()
+            column = violated_column(e, "username", "email")
+            if column is None:
+                log_error(logger, e, {"operation": "user_registration", "username": username})
+                raise ValueError("Registration failed")
+            AuthService._reject_duplicate(column, username, email)
         except Exception as e:
             db.session.rollback()
             log_error(logger, e, {"operation": "user_registration", "username": username})
             raise ValueError("Registration failed")
     
+    @staticmethod
+    def _reject_duplicate(column: str, username: str, email: str) -> None:
+        log_warning(logger, f"Registration failed - {column} already exists", {column: username if column == "username" else email})
+        raise ValueError(f"{column.capitalize()} already exists")
+    
     @staticmethod
     def login(username: str, password: str) -> str:
-        log_info(logger, "Login attempt", {"username": username})
+        log_info(logger, "Login attempt", lambda: {"username": username})
         
-        user = User.query.filter_by(username=username).first()
+        user = db.session.query(User.id, User.password_hash).filter(User.username == username).first()
+        db.session.rollback()  # do not hold a pooled connection while bcrypt runs
         
         if not user or not AuthService.verify_password(password, user.password_hash):
             log_warning(logger, "Login failed - invalid credentials", {"username": username})
             raise ValueError("Invalid credentials")
         
+        if password_hasher.needs_rehash(user.password_hash):
+            AuthService._rehash(user.id, password)
+        
         token = create_access_token(identity=str(user.id))
-        log_info(logger, "Login successful", {"user_id": user.id, "username": username})
+        log_info(logger, "Login successful", lambda: {"user_id": user.id, "username": username})
         return token
     
+    @staticmethod
+    def _rehash(user_id: int, password: str) -> None:
+        try:
+            password_hash = AuthService.hash_password(password)
+            User.query.filter(User.id == user_id).update({User.password_hash: password_hash}, synchronize_session=False)
+            db.session.commit()
+            log_info(logger, "Password rehashed with current cost", lambda: {"user_id": user_id})
+        except Exception as e:
+            db.session.rollback()
+            log_error(logger, e, {"operation": "password_rehash", "user_id": user_id})
+    
     @staticmethod
     def get_user_by_id(user_id: int) -> Optional[User]:
-        log_info(logger, "Fetching user by ID", {"user_id": user_id})
+        log_info(logger, "Fetching user by ID", lambda: {"user_id": user_id})
         user = User.query.get(user_id)
         if user:
-            log_info(logger, "User found", {"user_id": user_id, "username": user.username})
+            log_info(logger, "User found", lambda: {"user_id": user_id, "username": user.username})
         else:
             log_warning(logger, "User not found", {"user_id": user_id})
         return user
     
+    @staticmethod
+    def get_profile(user_id: int) -> Optional[dict[str, Any]]:
+        """id, username, email, bio and created_at, served from the user cache."""
+        profile = user_cache.get(user_id)
+        if profile is None:
+            log_warning(logger, "User not found", {"user_id": user_id})
+        return profile
+    
     @staticmethod
     def update_user(user_id: int, bio: Optional[str] = None) -> User:
-        log_info(logger, "Updating user", {"user_id": user_id, "has_bio": bio is not None})
+        log_info(logger, "Updating user", lambda: {"user_id": user_id, "has_bio": bio is not None})
         
         user = User.query.get(user_id)
         
@@ -84,7 +121,9 @@ class AuthService:
         
         try:
             db.session.commit()
-            log_info(logger, "User updated successfully", {"user_id": user_id})
+            cache.invalidate(f"author:{user_id}")
+            user_cache.invalidate(user_id, user.username)
+            log_info(logger, "User updated successfully", lambda: {"user_id": user_id})
             return user
         except Exception as e:
             db.session.rollback()
@@ -1,101 +1,195 @@
-from typing import Optional
-from sqlalchemy import desc
-from app import db
-from app.models import Comment, CommentUp, Quip
-from app.utils.logger import setup_logger, log_info, log_error, log_warning
+from datetime import datetime
+from typing import Any, Optional
+from sqlalchemy import Integer, delete, exists, insert, literal, select
+from sqlalchemy.orm import aliased
+from app import db, cache
+from app.models import Comment, CommentUp, Quip, User
+from app.services.ranking_service import RankingService
+from app.utils.pagination import decode_cursor, keyset_page
+from app.utils.sql import insert_ignoring_conflicts
+from app.utils.logger import get_logger, log_info, log_error, log_warning
 
-logger = setup_logger()
+logger = get_logger("comments")
 
 
 class CommentService:
     @staticmethod
     def create(user_id: int, quip_id: int, content: str,
                parent_id: Optional[int] = None) -> Comment:
-        log_info(logger, "Creating comment", {"user_id": user_id, "quip_id": quip_id, "parent_id": parent_id})
+        log_info(logger, "Creating comment", lambda: {"user_id": user_id, "quip_id": quip_id, "parent_id": parent_id})
         
         if not content or not content.strip():
             log_warning(logger, "Comment creation failed - empty content", {"user_id": user_id, "quip_id": quip_id})
             raise ValueError("Content cannot be empty")
         
-        quip = Quip.query.get(quip_id)
-        if not quip:
-            log_warning(logger, "Comment creation failed - quip not found", {"quip_id": quip_id})
-            raise ValueError("Quip not found")
-        
-        if parent_id:
-            parent = Comment.query.get(parent_id)
-            if not parent or parent.quip_id != quip_id:
-                log_warning(logger, "Comment creation failed - invalid parent", {"parent_id": parent_id, "quip_id": quip_id})
-                raise ValueError("Invalid parent comment")
-        
         comment = Comment()
         comment.user_id = user_id
         comment.quip_id = quip_id
         comment.parent_comment_id = parent_id
         comment.content = content.strip()
+        comment.created_at = comment.updated_at = datetime.utcnow()
+        
+        # One INSERT ... SELECT validates the quip (and the parent, if any) and inserts.
+        source = select(
+            literal(user_id), Quip.id, literal(parent_id, Integer), literal(comment.content),
+            literal(comment.created_at), literal(comment.updated_at)
+        ).where(Quip.id == quip_id)
+        if parent_id:
+            source = source.where(exists().where(Comment.id == parent_id, Comment.quip_id == quip_id))
         
         try:
-            db.session.add(comment)
+            comment.id = db.session.execute(
+                insert(Comment).from_select(
+                    ["user_id", "quip_id", "parent_comment_id", "content", "created_at", "updated_at"], source
+                ).returning(Comment.id)
+            ).scalar()
+            if comment.id is not None:
+                RankingService.bump(quip_id, Quip.comments_count, 1)
             db.session.commit()
-            log_info(logger, "Comment created successfully", {"comment_id": comment.id, "user_id": user_id, "quip_id": quip_id})
-            return comment
         except Exception as e:
             db.session.rollback()
             log_error(logger, e, {"operation": "comment_creation", "user_id": user_id, "quip_id": quip_id})
             raise ValueError("Failed to create comment")
+        
+        if comment.id is None:
+            if db.session.query(Quip.id).filter(Quip.id == quip_id).first() is None:
+                log_warning(logger, "Comment creation failed - quip not found", {"quip_id": quip_id})
+                raise ValueError("Quip not found")
+            log_warning(logger, "Comment creation failed - invalid parent", {"parent_id": parent_id, "quip_id": quip_id})
+            raise ValueError("Invalid parent comment")
+        
+        cache.invalidate(f"quip:{quip_id}", f"comment:{parent_id}" if parent_id else f"comments:{quip_id}")
+        log_info(logger, "Comment created successfully", lambda: {"comment_id": comment.id, "user_id": user_id, "quip_id": quip_id})
+        return comment
     
     @staticmethod
-    def get_quip_comments(quip_id: int) -> list[Comment]:
-        log_info(logger, "Fetching quip comments", {"quip_id": quip_id})
+    def get_quip_comments(quip_id: int, limit: int = 20, cursor: Optional[str] = None,
+                          max_depth: int = 3) -> tuple[list[Any], list[int], Optional[str]]:
+        log_info(logger, "Fetching quip comments", lambda: {"quip_id": quip_id, "limit": limit,
+                                                    "max_depth": max_depth, "has_cursor": bool(cursor)})
+        
+        after = decode_cursor(cursor, datetime, int) if cursor else None
         
         try:
-            comments = Comment.query.filter_by(
-                quip_id=quip_id,
-                parent_comment_id=None
-            ).order_by(desc(Comment.created_at)).all()
-            log_info(logger, "Quip comments fetched successfully", {"quip_id": quip_id, "count": len(comments)})
-            return comments
+            root_ids, next_cursor = keyset_page(
+                db.session.query(Comment.id).filter(
+                    Comment.quip_id == quip_id, Comment.parent_comment_id.is_(None)
+                ),
+                Comment.created_at, Comment.id, limit, after=after
+            )
+            rows = CommentService._load_threads(root_ids, max_depth)
+            log_info(logger, "Quip comments fetched successfully", lambda: {"quip_id": quip_id, "count": len(rows)})
+            return rows, root_ids, next_cursor
         except Exception as e:
             log_error(logger, e, {"operation": "quip_comments_fetch", "quip_id": quip_id})
-            return []
+            return [], [], None
     
     @staticmethod
-    def add_up(user_id: int, comment_id: int) -> CommentUp:
-        log_info(logger, "Adding comment upvote", {"user_id": user_id, "comment_id": comment_id})
+    def get_replies(comment_id: int, limit: int = 20, cursor: Optional[str] = None,
+                    max_depth: int = 3) -> tuple[list[Any], list[int], Optional[str]]:
+        log_info(logger, "Fetching comment replies", lambda: {"comment_id": comment_id, "limit": limit,
+                                                      "max_depth": max_depth, "has_cursor": bool(cursor)})
         
-        existing = CommentUp.query.filter_by(user_id=user_id, comment_id=comment_id).first()
-        if existing:
-            log_warning(logger, "Comment upvote failed - already upvoted", {"user_id": user_id, "comment_id": comment_id})
-            raise ValueError("Already upvoted")
+        if not db.session.query(Comment.id).filter(Comment.id == comment_id).first():
+            log_warning(logger, "Replies fetch failed - comment not found", {"comment_id": comment_id})
+            raise ValueError("Comment not found")
         
-        comment_up = CommentUp()
-        comment_up.user_id = user_id
-        comment_up.comment_id = comment_id
+        after = decode_cursor(cursor, datetime, int) if cursor else None
         
         try:
-            db.session.add(comment_up)
+            reply_ids, next_cursor = keyset_page(
+                db.session.query(Comment.id).filter(Comment.parent_comment_id == comment_id),
+                Comment.created_at, Comment.id, limit, after=after, descending=False
+            )
+            rows = CommentService._load_threads(reply_ids, max_depth)
+            log_info(logger, "Comment replies fetched successfully", lambda: {"comment_id": comment_id, "count": len(rows)})
+            return rows, reply_ids, next_cursor
+        except Exception as e:
+            log_error(logger, e, {"operation": "comment_replies_fetch", "comment_id": comment_id})
+            return [], [], None
+    
+    @staticmethod
+    def _load_threads(root_ids: list[int], max_depth: int) -> list[Any]:
+        if not root_ids:
+            return []
+        
+        child = aliased(Comment)
+        thread = db.session.query(
+            Comment.id.label("id"), literal(0).label("depth")
+        ).filter(Comment.id.in_(root_ids)).cte("thread", recursive=True)
+        thread = thread.union_all(
+            db.session.query(child.id, thread.c.depth + 1).filter(
+                child.parent_comment_id == thread.c.id, thread.c.depth < max_depth
+            )
+        )
+        
+        reply = aliased(Comment)
+        has_replies = exists().where(reply.parent_comment_id == Comment.id)
+        
+        return db.session.query(
+            Comment.id, Comment.user_id, User.username, Comment.parent_comment_id,
+            Comment.content, Comment.created_at, Comment.updated_at, Comment.comment_ups_count,
+            thread.c.depth, has_replies.label("has_replies")
+        ).join(thread, thread.c.id == Comment.id).join(
+            User, User.id == Comment.user_id
+        ).order_by(Comment.created_at, Comment.id).all()
+    
+    @staticmethod
+    def add_up(user_id: int, comment_id: int) -> None:
+        log_info(logger, "Adding comment upvote", lambda: {"user_id": user_id, "comment_id": comment_id})
+        
+        try:
+            inserted = db.session.execute(
+                insert_ignoring_conflicts(CommentUp).from_select(
+                    ["user_id", "comment_id", "created_at"],
+                    select(literal(user_id), Comment.id, literal(datetime.utcnow())).where(Comment.id == comment_id)
+                ).returning(CommentUp.comment_id)
+            ).first()
+            if inserted is not None:
+                CommentService._bump_ups(comment_id, 1)
             db.session.commit()
-            log_info(logger, "Comment upvoted successfully", {"user_id": user_id, "comment_id": comment_id})
-            return comment_up
         except Exception as e:
             db.session.rollback()
             log_error(logger, e, {"operation": "comment_upvote", "user_id": user_id, "comment_id": comment_id})
             raise ValueError("Failed to upvote comment")
+        
+        if inserted is None:
+            CommentService._reject(user_id, comment_id, "Already upvoted")
+        cache.invalidate(f"comment:{comment_id}")
+        log_info(logger, "Comment upvoted successfully", lambda: {"user_id": user_id, "comment_id": comment_id})
     
     @staticmethod
     def remove_up(user_id: int, comment_id: int) -> None:
-        log_info(logger, "Removing comment upvote", {"user_id": user_id, "comment_id": comment_id})
-        
-        comment_up = CommentUp.query.filter_by(user_id=user_id, comment_id=comment_id).first()
-        if not comment_up:
-            log_warning(logger, "Remove comment upvote failed - not upvoted", {"user_id": user_id, "comment_id": comment_id})
-            raise ValueError("Not upvoted")
+        log_info(logger, "Removing comment upvote", lambda: {"user_id": user_id, "comment_id": comment_id})
         
         try:
-            db.session.delete(comment_up)
+            deleted = db.session.execute(
+                delete(CommentUp).where(CommentUp.user_id == user_id, CommentUp.comment_id == comment_id)
+                .returning(CommentUp.comment_id).execution_options(synchronize_session=False)
+            ).first()
+            if deleted is not None:
+                CommentService._bump_ups(comment_id, -1)
             db.session.commit()
-            log_info(logger, "Comment upvote removed successfully", {"user_id": user_id, "comment_id": comment_id})
         except Exception as e:
             db.session.rollback()
             log_error(logger, e, {"operation": "comment_upvote_removal", "user_id": user_id, "comment_id": comment_id})
             raise ValueError("Failed to remove upvote")
+        
+        if deleted is None:
+            CommentService._reject(user_id, comment_id, "Not upvoted")
+        cache.invalidate(f"comment:{comment_id}")
+        log_info(logger, "Comment upvote removed successfully", lambda: {"user_id": user_id, "comment_id": comment_id})
+    
+    @staticmethod
+    def _bump_ups(comment_id: int, delta: int) -> None:
+        Comment.query.filter_by(id=comment_id).update(
+            {Comment.comment_ups_count: Comment.comment_ups_count + delta}, synchronize_session=False
+        )
+    
+    @staticmethod
+    def _reject(user_id: int, comment_id: int, conflict: str) -> None:
+        if db.session.query(Comment.id).filter(Comment.id == comment_id).first() is None:
+            log_warning(logger, "Comment upvote failed - comment not found", {"user_id": user_id, "comment_id": comment_id})
+            raise ValueError("Comment not found")
+        log_warning(logger, f"Comment upvote failed - {conflict.lower()}", {"user_id": user_id, "comment_id": comment_id})
+        raise ValueError(conflict)
@@ -0,0 +1,92 @@
+from typing import Any
+from sqlalchemy import func, update
+from app import db
+from app.models import Follow, Quip, QuipUp, Comment, CommentUp, Repost, User
+from app.utils.logger import get_logger, log_info, log_error, log_warning
+
+logger = get_logger("counters")
+
+
+def _count_by(fk: Any):
+    return lambda ids: db.session.query(fk, func.count()).filter(fk.in_(ids)).group_by(fk)
+
+
+def _count_received(model: Any):
+    return lambda ids: db.session.query(Quip.user_id, func.count()).join(
+        model, model.quip_id == Quip.id
+    ).filter(Quip.user_id.in_(ids)).group_by(Quip.user_id)
+
+
+QUIP_COUNTERS = {
+    "quip_ups_count": _count_by(QuipUp.quip_id),
+    "comments_count": _count_by(Comment.quip_id),
+    "reposts_count": _count_by(Repost.quip_id),
+}
+
+COMMENT_COUNTERS = {
+    "comment_ups_count": _count_by(CommentUp.comment_id),
+}
+
+USER_COUNTERS = {
+    "quips_count": _count_by(Quip.user_id),
+    "quip_ups_received_count": _count_received(QuipUp),
+    "reposts_received_count": _count_received(Repost),
+    "followers_count": _count_by(Follow.followee_id),
+    "following_count": _count_by(Follow.follower_id),
+}
+
+
+class CounterService:
+    @staticmethod
+    def reconcile(batch_size: int = 1000, dry_run: bool = False) -> dict[str, dict[str, int]]:
+        log_info(logger, "Reconciling engagement counters", lambda: {"batch_size": batch_size, "dry_run": dry_run})
+
+        report = {
+            "quips": CounterService._reconcile_model(Quip, QUIP_COUNTERS, batch_size, dry_run),
+            "comments": CounterService._reconcile_model(Comment, COMMENT_COUNTERS, batch_size, dry_run),
+            "users": CounterService._reconcile_model(User, USER_COUNTERS, batch_size, dry_run),
+        }
+        log_info(logger, "Engagement counters reconciled", report)
+        return report
+
+    @staticmethod
+    def _reconcile_model(model: Any, counters: dict[str, Any], batch_size: int,
+                         dry_run: bool) -> dict[str, int]:
+        checked = 0
+        drifted = 0
+        last_id = 0
+
+        while True:
+            rows = db.session.query(
+                model.id, *[getattr(model, name) for name in counters]
+            ).filter(model.id > last_id).order_by(model.id).limit(batch_size).all()
+            if not rows:
+                break
+
+            ids = [row[0] for row in rows]
+            actual = {name: dict(count(ids).all()) for name, count in counters.items()}
+
+            fixes = []
+            for row in rows:
+                expected = {name: actual[name].get(row[0], 0) for name in counters}
+                stored = dict(zip(counters, row[1:]))
+                if stored != expected:
+                    log_warning(logger, "Counter drift detected", {
+                        "table": model.__tablename__, "id": row[0], "stored": stored, "expected": expected
+                    })
+                    fixes.append({"id": row[0], **expected})
+
+            if fixes and not dry_run:
+                try:
+                    db.session.execute(update(model), fixes)
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    log_error(logger, e, {"operation": "counter_reconcile", "table": model.__tablename__})
+                    raise
+
+            checked += len(rows)
+            drifted += len(fixes)
+            last_id = ids[-1]
+
+        return {"checked": checked, "drifted": drifted}
@@ -1,18 +1,23 @@
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import func, desc
-from app import db
+from sqlalchemy import delete, desc, func, literal, select
+from app import db, cache, user_cache
 from app.models import Quip, QuipUp, Comment, Repost, User
-from app.utils.logger import setup_logger, log_info, log_error, log_warning
+from app.services.ranking_service import RankingService, TOP_WINDOWS
+from app.services.timeline_service import TimelineService
+from app.utils.cache import tag_response
+from app.utils.pagination import decode_cursor, keyset_page
+from app.utils.sql import insert_ignoring_conflicts
+from app.utils.logger import get_logger, log_info, log_error, log_warning
 
-logger = setup_logger()
+logger = get_logger("quips")
 
 
 class QuipService:
     @staticmethod
     def create(user_id: int, content: str, definition: Optional[str] = None,
                usage_examples: Optional[str] = None) -> Quip:
-        log_info(logger, "Creating quip", {"user_id": user_id, "has_content": bool(content)})
+        log_info(logger, "Creating quip", lambda: {"user_id": user_id, "has_content": bool(content)})
         
         if not content or not content.strip():
             log_warning(logger, "Quip creation failed - empty content", {"user_id": user_id})
@@ -23,30 +28,38 @@ class QuipService:
         quip.content = content.strip()
         quip.definition = definition.strip() if definition else None
         quip.usage_examples = usage_examples.strip() if usage_examples else None
+        quip.created_at = datetime.utcnow()
+        quip.hot_score = RankingService.score(0, 0, 0, quip.created_at)
         
         try:
             db.session.add(quip)
+            User.query.filter_by(id=user_id).update(
+                {User.quips_count: User.quips_count + 1}, synchronize_session=False
+            )
             db.session.commit()
-            log_info(logger, "Quip created successfully", {"quip_id": quip.id, "user_id": user_id})
-            return quip
+            cache.invalidate("feed", f"author:{user_id}")
+            log_info(logger, "Quip created successfully", lambda: {"quip_id": quip.id, "user_id": user_id})
         except Exception as e:
             db.session.rollback()
             log_error(logger, e, {"operation": "quip_creation", "user_id": user_id})
             raise ValueError("Failed to create quip")
+        
+        TimelineService.fan_out(user_id, quip.id, quip.created_at)
+        return quip
     
     @staticmethod
     def get_by_id(quip_id: int) -> Optional[Quip]:
-        log_info(logger, "Fetching quip by ID", {"quip_id": quip_id})
+        log_info(logger, "Fetching quip by ID", lambda: {"quip_id": quip_id})
         quip = Quip.query.get(quip_id)
         if quip:
-            log_info(logger, "Quip found", {"quip_id": quip_id, "user_id": quip.user_id})
+            log_info(logger, "Quip found", lambda: {"quip_id": quip_id, "user_id": quip.user_id})
         else:
             log_warning(logger, "Quip not found", {"quip_id": quip_id})
         return quip
     
     @staticmethod
     def delete(user_id: int, quip_id: int) -> None:
-        log_info(logger, "Deleting quip", {"user_id": user_id, "quip_id": quip_id})
+        log_info(logger, "Deleting quip", lambda: {"user_id": user_id, "quip_id": quip_id})
         
         quip = Quip.query.get(quip_id)
         if not quip:
@@ -57,146 +70,213 @@ class QuipService:
             raise ValueError("Not authorized to delete this quip")
         
         try:
+            User.query.filter_by(id=user_id).update({
+                User.quips_count: User.quips_count - 1,
+                User.quip_ups_received_count: User.quip_ups_received_count - quip.quip_ups_count,
+                User.reposts_received_count: User.reposts_received_count - quip.reposts_count
+            }, synchronize_session=False)
             db.session.delete(quip)
             db.session.commit()
-            log_info(logger, "Quip deleted successfully", {"quip_id": quip_id, "user_id": user_id})
+            cache.invalidate("feed", f"quip:{quip_id}", f"comments:{quip_id}", f"author:{user_id}")
+            log_info(logger, "Quip deleted successfully", lambda: {"quip_id": quip_id, "user_id": user_id})
         except Exception as e:
             db.session.rollback()
             log_error(logger, e, {"operation": "quip_deletion", "quip_id": quip_id, "user_id": user_id})
             raise ValueError("Failed to delete quip")
-    
-    @staticmethod
-    def get_feed(sort: str = "smart", page: int = 1, per_page: int = 20) -> list[Quip]:
-        log_info(logger, "Fetching quip feed", {"sort": sort, "page": page, "per_page": per_page})
         
-        try:
-            quips = Quip.query.order_by(desc(Quip.created_at)).paginate(
-                page=page, per_page=per_page, error_out=False
-            ).items
-            log_info(logger, "Feed fetched successfully", {"count": len(quips), "page": page})
-            return quips
-        except Exception as e:
-            log_error(logger, e, {"operation": "feed_fetch", "sort": sort, "page": page})
-            return []
+        TimelineService.retract(quip_id)
     
     @staticmethod
-    def add_up(user_id: int, quip_id: int) -> QuipUp:
-        log_info(logger, "Adding quip upvote", {"user_id": user_id, "quip_id": quip_id})
+    def get_feed(sort: str = "smart", page: int = 1, per_page: int = 20, window: str = "24h",
+                 cursor: Optional[str] = None) -> tuple[list[Quip], Optional[str]]:
+        log_info(logger, "Fetching quip feed", lambda: {"sort": sort, "window": window, "page": page,
+                                                "per_page": per_page, "has_cursor": bool(cursor)})
         
-        existing = QuipUp.query.filter_by(user_id=user_id, quip_id=quip_id).first()
-        if existing:
-            log_warning(logger, "Upvote failed - already upvoted", {"user_id": user_id, "quip_id": quip_id})
-            raise ValueError("Already upvoted")
+        query = Quip.query
+        if sort == "smart":
+            sort_column, sort_type = Quip.hot_score, float
+        elif sort == "new":
+            sort_column, sort_type = Quip.created_at, datetime
+        elif sort == "top":
+            if window not in TOP_WINDOWS:
+                raise ValueError("Invalid window")
+            query = query.filter(Quip.created_at >= datetime.utcnow() - TOP_WINDOWS[window])
+            sort_column, sort_type = Quip.quip_ups_count, int
+        else:
+            raise ValueError("Invalid sort")
         
-        quip_up = QuipUp()
-        quip_up.user_id = user_id
-        quip_up.quip_id = quip_id
+        after = decode_cursor(cursor, sort_type, int) if cursor else None
         
         try:
-            db.session.add(quip_up)
-            db.session.commit()
-            log_info(logger, "Quip upvoted successfully", {"user_id": user_id, "quip_id": quip_id})
-            return quip_up
+            quips, next_cursor = keyset_page(
+                query, sort_column, Quip.id, per_page,
+                after=after, offset=0 if after else max(page - 1, 0) * per_page
+            )
+            log_info(logger, "Feed fetched successfully", lambda: {"count": len(quips), "page": page})
+            return quips, next_cursor
         except Exception as e:
-            db.session.rollback()
-            log_error(logger, e, {"operation": "quip_upvote", "user_id": user_id, "quip_id": quip_id})
-            raise ValueError("Failed to upvote quip")
+            log_error(logger, e, {"operation": "feed_fetch", "sort": sort, "page": page})
+            return [], None
+    
+    @staticmethod
+    def add_up(user_id: int, quip_id: int) -> None:
+        log_info(logger, "Adding quip upvote", lambda: {"user_id": user_id, "quip_id": quip_id})
+        author_id = QuipService._engage(
+            QuipUp, user_id, quip_id, Quip.quip_ups_count, User.quip_ups_received_count,
+            "Already upvoted", "quip_upvote", "Failed to upvote quip"
+        )
+        cache.invalidate(f"quip:{quip_id}", f"author:{author_id}")
+        log_info(logger, "Quip upvoted successfully", lambda: {"user_id": user_id, "quip_id": quip_id})
     
     @staticmethod
     def remove_up(user_id: int, quip_id: int) -> None:
-        log_info(logger, "Removing quip upvote", {"user_id": user_id, "quip_id": quip_id})
-        
-        quip_up = QuipUp.query.filter_by(user_id=user_id, quip_id=quip_id).first()
-        if not quip_up:
-            log_warning(logger, "Remove upvote failed - not upvoted", {"user_id": user_id, "quip_id": quip_id})
-            raise ValueError("Not upvoted")
-        
-        try:
-            db.session.delete(quip_up)
-            db.session.commit()
-            log_info(logger, "Quip upvote removed successfully", {"user_id": user_id, "quip_id": quip_id})
-        except Exception as e:
-            db.session.rollback()
-            log_error(logger, e, {"operation": "quip_upvote_removal", "user_id": user_id, "quip_id": quip_id})
-            raise ValueError("Failed to remove upvote")
+        log_info(logger, "Removing quip upvote", lambda: {"user_id": user_id, "quip_id": quip_id})
+        author_id = QuipService._disengage(
+            QuipUp, user_id, quip_id, Quip.quip_ups_count, User.quip_ups_received_count,
+            "Not upvoted", "quip_upvote_removal", "Failed to remove upvote"
+        )
+        cache.invalidate(f"quip:{quip_id}", f"author:{author_id}")
+        log_info(logger, "Quip upvote removed successfully", lambda: {"user_id": user_id, "quip_id": quip_id})
     
     @staticmethod
-    def add_repost(user_id: int, quip_id: int) -> Repost:
-        log_info(logger, "Adding repost", {"user_id": user_id, "quip_id": quip_id})
-        
-        existing = Repost.query.filter_by(user_id=user_id, quip_id=quip_id).first()
-        if existing:
-            log_warning(logger, "Repost failed - already reposted", {"user_id": user_id, "quip_id": quip_id})
-            raise ValueError("Already reposted")
-        
-        repost = Repost()
-        repost.user_id = user_id
-        repost.quip_id = quip_id
-        
+    def add_repost(user_id: int, quip_id: int) -> None:
+        log_info(logger, "Adding repost", lambda: {"user_id": user_id, "quip_id": quip_id})
+        author_id = QuipService._engage(
+            Repost, user_id, quip_id, Quip.reposts_count, User.reposts_received_count,
+            "Already reposted", "repost_addition", "Failed to repost"
+        )
+        cache.invalidate(f"quip:{quip_id}", f"author:{author_id}", f"reposts:{user_id}")
+        TimelineService.fan_out(user_id, quip_id, datetime.utcnow(), reposted=True)
+        log_info(logger, "Repost added successfully", lambda: {"user_id": user_id, "quip_id": quip_id})
+    
+    @staticmethod
+    def remove_repost(user_id: int, quip_id: int) -> None:
+        log_info(logger, "Removing repost", lambda: {"user_id": user_id, "quip_id": quip_id})
+        author_id = QuipService._disengage(
+            Repost, user_id, quip_id, Quip.reposts_count, User.reposts_received_count,
+            "Not reposted", "repost_removal", "Failed to remove repost"
+        )
+        cache.invalidate(f"quip:{quip_id}", f"author:{author_id}", f"reposts:{user_id}")
+        TimelineService.retract(quip_id, actor_id=user_id)
+        log_info(logger, "Repost removed successfully", lambda: {"user_id": user_id, "quip_id": quip_id})
+    
+    @staticmethod
+    def _engage(model, user_id: int, quip_id: int, counter, author_counter,
+                conflict: str, operation: str, failure: str) -> int:
+        """Insert an upvote/repost row and bump the counters it feeds.
+
+        The row is inserted from ``SELECT ... FROM quips`` with ``ON CONFLICT DO
+        NOTHING``, so a missing quip and a duplicate both come back empty instead
+        of raising; only then is a lookup spent telling the two apart.
+        """
         try:
-            db.session.add(repost)
+            inserted = db.session.execute(
+                insert_ignoring_conflicts(model).from_select(
+                    ["user_id", "quip_id", "created_at"],
+                    select(literal(user_id), Quip.id, literal(datetime.utcnow())).where(Quip.id == quip_id)
+                ).returning(model.quip_id)
+            ).first()
+            author_id = None
+            if inserted is not None:
+                author_id = RankingService.bump(quip_id, counter, 1)
+                QuipService._bump_author(author_id, author_counter, 1)
             db.session.commit()
-            log_info(logger, "Repost added successfully", {"user_id": user_id, "quip_id": quip_id})
-            return repost
         except Exception as e:
             db.session.rollback()
-            log_error(logger, e, {"operation": "repost_addition", "user_id": user_id, "quip_id": quip_id})
-            raise ValueError("Failed to repost")
+            log_error(logger, e, {"operation": operation, "user_id": user_id, "quip_id": quip_id})
+            raise ValueError(failure)
+        
+        if inserted is None:
+            QuipService._reject(user_id, quip_id, conflict)
+        return author_id  # type: ignore
     
     @staticmethod
-    def remove_repost(user_id: int, quip_id: int) -> None:
-        log_info(logger, "Removing repost", {"user_id": user_id, "quip_id": quip_id})
-        
-        repost = Repost.query.filter_by(user_id=user_id, quip_id=quip_id).first()
-        if not repost:
-            log_warning(logger, "Remove repost failed - not reposted", {"user_id": user_id, "quip_id": quip_id})
-            raise ValueError("Not reposted")
-        
+    def _disengage(model, user_id: int, quip_id: int, counter, author_counter,
+                   conflict: str, operation: str, failure: str) -> int:
         try:
-            db.session.delete(repost)
+            deleted = db.session.execute(
+                delete(model).where(model.user_id == user_id, model.quip_id == quip_id)
+                .returning(model.quip_id).execution_options(synchronize_session=False)
+            ).first()
+            author_id = None
+            if deleted is not None:
+                author_id = RankingService.bump(quip_id, counter, -1)
+                QuipService._bump_author(author_id, author_counter, -1)
             db.session.commit()
-            log_info(logger, "Repost removed successfully", {"user_id": user_id, "quip_id": quip_id})
         except Exception as e:
             db.session.rollback()
-            log_error(logger, e, {"operation": "repost_removal", "user_id": user_id, "quip_id": quip_id})
-            raise ValueError("Failed to remove repost")
+            log_error(logger, e, {"operation": operation, "user_id": user_id, "quip_id": quip_id})
+            raise ValueError(failure)
+        
+        if deleted is None:
+            QuipService._reject(user_id, quip_id, conflict)
+        return author_id  # type: ignore
+    
+    @staticmethod
+    def _reject(user_id: int, quip_id: int, conflict: str) -> None:
+        if db.session.query(Quip.id).filter(Quip.id == quip_id).first() is None:
+            log_warning(logger, "Quip action failed - quip not found", {"user_id": user_id, "quip_id": quip_id})
+            raise ValueError("Quip not found")
+        log_warning(logger, f"Quip action failed - {conflict.lower()}", {"user_id": user_id, "quip_id": quip_id})
+        raise ValueError(conflict)
+    
+    @staticmethod
+    def get_top_quips(user_id: int, limit: int = 3) -> list:
+        return db.session.query(Quip.id, Quip.content, Quip.quip_ups_count).filter(
+            Quip.user_id == user_id
+        ).order_by(desc(Quip.quip_ups_count), desc(Quip.id)).limit(limit).all()
+    
+    @staticmethod
+    def _bump_author(author_id: Optional[int], column, delta: int) -> None:
+        User.query.filter(User.id == author_id).update(
+            {column: column + delta}, synchronize_session=False
+        )
     
     @staticmethod
-    def get_user_quips(username: str, page: int = 1, per_page: int = 20) -> list[Quip]:
-        log_info(logger, "Fetching user quips", {"username": username, "page": page})
+    def get_user_quips(username: str, page: int = 1, per_page: int = 20,
+                       cursor: Optional[str] = None) -> tuple[list[Quip], Optional[str]]:
+        log_info(logger, "Fetching user quips", lambda: {"username": username, "page": page, "has_cursor": bool(cursor)})
         
-        user = User.query.filter_by(username=username).first()
-        if not user:
+        user_id = user_cache.id_for(username)
+        if user_id is None:
             log_warning(logger, "User quips fetch failed - user not found", {"username": username})
             raise ValueError("User not found")
         
+        after = decode_cursor(cursor, datetime, int) if cursor else None
+        tag_response(f"author:{user_id}")
+        
         try:
-            quips = Quip.query.filter_by(user_id=user.id).order_by(
-                desc(Quip.created_at)
-            ).paginate(page=page, per_page=per_page, error_out=False).items
-            log_info(logger, "User quips fetched successfully", {"username": username, "count": len(quips)})
-            return quips
+            quips, next_cursor = keyset_page(
+                Quip.query.filter_by(user_id=user_id), Quip.created_at, Quip.id, per_page,
+                after=after, offset=0 if after else max(page - 1, 0) * per_page
+            )
+            log_info(logger, "User quips fetched successfully", lambda: {"username": username, "count": len(quips)})
+            return quips, next_cursor
         except Exception as e:
             log_error(logger, e, {"operation": "user_quips_fetch", "username": username, "page": page})
-            return []
+            return [], None
     
     @staticmethod
-    def get_user_reposts(username: str, page: int = 1, per_page: int = 20) -> list[Quip]:
-        log_info(logger, "Fetching user reposts", {"username": username, "page": page})
+    def get_user_reposts(username: str, page: int = 1, per_page: int = 20,
+                         cursor: Optional[str] = None) -> tuple[list[Quip], Optional[str]]:
+        log_info(logger, "Fetching user reposts", lambda: {"username": username, "page": page, "has_cursor": bool(cursor)})
         
-        user = User.query.filter_by(username=username).first()
-        if not user:
+        user_id = user_cache.id_for(username)
+        if user_id is None:
             log_warning(logger, "User reposts fetch failed - user not found", {"username": username})
             raise ValueError("User not found")
         
+        after = decode_cursor(cursor, datetime, int) if cursor else None
+        tag_response(f"reposts:{user_id}")
+        
         try:
-            reposts = Repost.query.filter_by(user_id=user.id).order_by(
-                desc(Repost.created_at)
-            ).paginate(page=page, per_page=per_page, error_out=False).items
-            
-            quips = [repost.quip for repost in reposts]
-            log_info(logger, "User reposts fetched successfully", {"username": username, "count": len(quips)})
-            return quips
+            quips, next_cursor = keyset_page(
+                Quip.query.join(Repost, Repost.quip_id == Quip.id).filter(Repost.user_id == user_id),
+                Repost.created_at, Repost.quip_id, per_page,
+                after=after, offset=0 if after else max(page - 1, 0) * per_page
+            )
+            log_info(logger, "User reposts fetched successfully", lambda: {"username": username, "count": len(quips)})
+            return quips, next_cursor
         except Exception as e:
             log_error(logger, e, {"operation": "user_reposts_fetch", "username": username, "page": page})
-            return []
+            return [], None
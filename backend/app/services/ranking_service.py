@@ -0,0 +1,83 @@
+import math
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from sqlalchemy import update
+from app import db
+from app.models import Quip
+from app.utils.logger import get_logger, log_info, log_error
+
+logger = get_logger("ranking")
+
+
+SCORE_EPOCH = datetime(2026, 1, 1)
+# Seconds of freshness worth one order of magnitude of engagement.
+SCORE_DECAY_SECONDS = 45000
+
+UP_WEIGHT = 1.0
+COMMENT_WEIGHT = 1.5
+REPOST_WEIGHT = 2.0
+
+TOP_WINDOWS = {
+    "24h": timedelta(hours=24),
+    "7d": timedelta(days=7),
+}
+
+
+class RankingService:
+    @staticmethod
+    def score(quip_ups_count: int, comments_count: int, reposts_count: int,
+              created_at: datetime) -> float:
+        engagement = (quip_ups_count * UP_WEIGHT + comments_count * COMMENT_WEIGHT
+                      + reposts_count * REPOST_WEIGHT)
+        order = math.log10(max(engagement, 1.0))
+        age = (created_at - SCORE_EPOCH).total_seconds()
+        return round(order + age / SCORE_DECAY_SECONDS, 7)
+
+    @staticmethod
+    def bump(quip_id: int, counter: Any, delta: int) -> Optional[int]:
+        """Shift one engagement counter and re-rank the quip; returns the author id.
+
+        The counter update returns everything the score needs, so this costs two
+        UPDATEs and no SELECT. ``None`` means the quip does not exist.
+        """
+        row = db.session.execute(
+            update(Quip).where(Quip.id == quip_id).values({counter: counter + delta}).returning(
+                Quip.user_id, Quip.quip_ups_count, Quip.comments_count, Quip.reposts_count, Quip.created_at
+            ).execution_options(synchronize_session=False)
+        ).first()
+        if row is None:
+            return None
+        db.session.execute(
+            update(Quip).where(Quip.id == quip_id).values(hot_score=RankingService.score(*row[1:]))
+            .execution_options(synchronize_session=False)
+        )
+        return row[0]
+
+    @staticmethod
+    def rescore(batch_size: int = 1000) -> int:
+        log_info(logger, "Rescoring quips", lambda: {"batch_size": batch_size})
+
+        rescored = 0
+        last_id = 0
+        while True:
+            rows = db.session.query(
+                Quip.id, Quip.quip_ups_count, Quip.comments_count, Quip.reposts_count, Quip.created_at
+            ).filter(Quip.id > last_id).order_by(Quip.id).limit(batch_size).all()
+            if not rows:
+                break
+
+            try:
+                db.session.execute(update(Quip), [
+                    {"id": row[0], "hot_score": RankingService.score(*row[1:])} for row in rows
+                ])
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                log_error(logger, e, {"operation": "quip_rescore", "last_id": last_id})
+                raise
+
+            rescored += len(rows)
+            last_id = rows[-1][0]
+
+        log_info(logger, "Quips rescored", lambda: {"count": rescored})
+        return rescored
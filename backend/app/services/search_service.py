@@ -0,0 +1,101 @@
+import html
+from typing import Any, Optional
+from sqlalchemy import Float, bindparam, cast, func, literal_column, select, text
+from app import db
+from app.models import Quip
+from app.utils.pagination import decode_cursor, keyset_page
+from app.utils.sql import dialect_name
+from app.utils.logger import get_logger, log_info, log_error
+
+logger = get_logger("search")
+
+
+# Private-use markers survive ts_headline/snippet untouched, so the text can be
+# HTML-escaped before they are turned into <mark> tags.
+MARK_START = "\ue000"
+MARK_END = "\ue001"
+
+
+class SearchService:
+    @staticmethod
+    def search(q: str, per_page: int = 20,
+               cursor: Optional[str] = None) -> tuple[list[Quip], dict[int, str], Optional[str]]:
+        """Ranked full-text search over content, definition and usage_examples.
+
+        Returns the page of quips, a highlighted snippet per quip id and the
+        cursor of the next page. Ranking is ``ts_rank_cd`` over the weighted
+        ``search_vector`` on Postgres and ``bm25`` over ``quips_fts`` on SQLite.
+        """
+        log_info(logger, "Searching quips", lambda: {"query_length": len(q), "has_cursor": bool(cursor)})
+
+        q = q.strip()
+        if not q:
+            raise ValueError("Search query cannot be empty")
+        after = decode_cursor(cursor, float, int) if cursor else None
+
+        try:
+            if dialect_name() == "postgresql":
+                hits, snippets = SearchService._postgres_hits(q), SearchService._postgres_snippets
+            else:
+                hits, snippets = SearchService._sqlite_hits(q), SearchService._sqlite_snippets
+
+            quips, next_cursor = keyset_page(
+                Quip.query.join(hits, hits.c.id == Quip.id), hits.c.rank, Quip.id, per_page, after=after
+            )
+            highlighted = snippets(q, [quip.id for quip in quips]) if quips else {}
+            log_info(logger, "Quips search finished", lambda: {"count": len(quips)})
+            return quips, highlighted, next_cursor
+        except Exception as e:
+            db.session.rollback()
+            log_error(logger, e, {"operation": "quip_search"})
+            return [], {}, None
+
+    @staticmethod
+    def _postgres_hits(q: str) -> Any:
+        query = func.websearch_to_tsquery(literal_column("'simple'"), q)
+        vector = literal_column("quips.search_vector")
+        # ts_rank_cd returns real; as double precision the rank survives the
+        # round trip through the cursor exactly, so ties with it are not skipped.
+        return select(
+            Quip.id.label("id"), cast(func.ts_rank_cd(vector, query), Float(53)).label("rank")
+        ).where(vector.op("@@")(query)).subquery("hits")
+
+    @staticmethod
+    def _postgres_snippets(q: str, quip_ids: list[int]) -> dict[int, str]:
+        # ts_headline re-parses the document, so it only runs for the page being returned.
+        rows = db.session.execute(text(
+            "SELECT id, ts_headline('simple', concat_ws(' … ', content, definition, usage_examples), "
+            "websearch_to_tsquery('simple', :q), :options) FROM quips WHERE id IN :ids"
+        ).bindparams(bindparam("ids", expanding=True)), {
+            "q": q, "ids": quip_ids,
+            "options": f"StartSel={MARK_START}, StopSel={MARK_END}, MaxWords=25, MinWords=8, MaxFragments=2"
+        })
+        return {quip_id: SearchService._mark(snippet) for quip_id, snippet in rows}
+
+    @staticmethod
+    def _sqlite_hits(q: str) -> Any:
+        # bm25() is lower-is-better; negate it so both backends page by descending rank.
+        return select(
+            literal_column("rowid").label("id"), (-literal_column("bm25(quips_fts, 10.0, 5.0, 1.0)")).label("rank")
+        ).select_from(text("quips_fts")).where(
+            text("quips_fts MATCH :match").bindparams(match=SearchService._fts5_query(q))
+        ).subquery("hits")
+
+    @staticmethod
+    def _sqlite_snippets(q: str, quip_ids: list[int]) -> dict[int, str]:
+        rows = db.session.execute(text(
+            "SELECT rowid, snippet(quips_fts, -1, :start, :end, '…', 16) FROM quips_fts "
+            "WHERE quips_fts MATCH :match AND rowid IN :ids"
+        ).bindparams(bindparam("ids", expanding=True)), {
+            "match": SearchService._fts5_query(q), "ids": quip_ids, "start": MARK_START, "end": MARK_END
+        })
+        return {quip_id: SearchService._mark(snippet) for quip_id, snippet in rows}
+
+    @staticmethod
+    def _fts5_query(q: str) -> str:
+        # Quote every term so user input is never parsed as FTS5 syntax; terms are ANDed.
+        return " ".join('"' + term.replace('"', '""') + '"' for term in q.split())
+
+    @staticmethod
+    def _mark(snippet: Optional[str]) -> str:
+        return html.escape(snippet or "").replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
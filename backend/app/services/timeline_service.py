@@ -0,0 +1,293 @@
+from datetime import datetime
+from typing import Any, Optional
+from flask import current_app
+from sqlalchemy import delete, func, literal, select, tuple_, union_all
+from app import db, cache
+from app.models import Follow, Quip, Repost, TimelineEntry, User
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_page
+from app.utils.sql import insert_ignoring_conflicts
+from app.utils.logger import get_logger, log_info, log_error, log_warning
+
+logger = get_logger("timeline")
+
+
+TIMELINE_COLUMNS = ["user_id", "quip_id", "actor_id", "reposted", "created_at"]
+
+
+class TimelineService:
+    """Home timelines materialized on write.
+
+    A new quip or repost is copied into ``timeline_entries`` of the actor and every
+    follower with one ``INSERT ... SELECT FROM follows``. Accounts above
+    ``TIMELINE_FANOUT_MAX_FOLLOWERS`` are not fanned out; their followers pull
+    them at read time instead. Timelines are trimmed to ``TIMELINE_MAX_ENTRIES``
+    by ``flask timeline trim``.
+
+    An entry is keyed by ``(user_id, quip_id)``, so only the first post or repost
+    of a quip is stored. When a retracted repost or an unfollow removes it, the
+    quip is re-materialized from whoever else in the timeline still carries it.
+    """
+
+    @staticmethod
+    def follow(follower_id: int, username: str) -> int:
+        log_info(logger, "Following user", lambda: {"follower_id": follower_id, "username": username})
+
+        try:
+            followee_id = db.session.execute(
+                insert_ignoring_conflicts(Follow).from_select(
+                    ["follower_id", "followee_id", "created_at"],
+                    select(literal(follower_id), User.id, literal(datetime.utcnow())).where(
+                        User.username == username, User.id != follower_id
+                    )
+                ).returning(Follow.followee_id)
+            ).scalar()
+            if followee_id is not None:
+                TimelineService._bump_follow_counts(follower_id, followee_id, 1)
+                TimelineService._backfill(follower_id, followee_id)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            log_error(logger, e, {"operation": "follow", "follower_id": follower_id, "username": username})
+            raise ValueError("Failed to follow user")
+
+        if followee_id is None:
+            TimelineService._reject(follower_id, username, "Already following")
+        cache.invalidate(f"author:{follower_id}", f"author:{followee_id}")
+        log_info(logger, "User followed successfully", lambda: {"follower_id": follower_id, "followee_id": followee_id})
+        return followee_id  # type: ignore
+
+    @staticmethod
+    def unfollow(follower_id: int, username: str) -> int:
+        log_info(logger, "Unfollowing user", lambda: {"follower_id": follower_id, "username": username})
+
+        try:
+            followee_id = db.session.execute(
+                delete(Follow).where(
+                    Follow.follower_id == follower_id,
+                    Follow.followee_id == select(User.id).where(User.username == username).scalar_subquery()
+                ).returning(Follow.followee_id).execution_options(synchronize_session=False)
+            ).scalar()
+            if followee_id is not None:
+                TimelineService._bump_follow_counts(follower_id, followee_id, -1)
+                quip_ids = db.session.execute(
+                    delete(TimelineEntry).where(
+                        TimelineEntry.user_id == follower_id, TimelineEntry.actor_id == followee_id
+                    ).returning(TimelineEntry.quip_id).execution_options(synchronize_session=False)
+                ).scalars().all()
+                TimelineService._rematerialize([follower_id], quip_ids)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            log_error(logger, e, {"operation": "unfollow", "follower_id": follower_id, "username": username})
+            raise ValueError("Failed to unfollow user")
+
+        if followee_id is None:
+            TimelineService._reject(follower_id, username, "Not following")
+        cache.invalidate(f"author:{follower_id}", f"author:{followee_id}")
+        log_info(logger, "User unfollowed successfully", lambda: {"follower_id": follower_id, "followee_id": followee_id})
+        return followee_id  # type: ignore
+
+    @staticmethod
+    def fan_out(actor_id: int, quip_id: int, created_at: datetime, reposted: bool = False) -> None:
+        """Copy a quip into the timelines of its actor and the actor's followers.
+
+        Runs after the quip/repost is committed: timelines are derived data, so a
+        failure is logged and leaves the write itself intact.
+        """
+        max_followers = current_app.config.get("TIMELINE_FANOUT_MAX_FOLLOWERS", 10000)
+        values = (literal(quip_id), literal(actor_id), literal(reposted), literal(created_at))
+        audience = union_all(
+            select(literal(actor_id), *values),
+            select(Follow.follower_id, *values).where(
+                Follow.followee_id == actor_id,
+                select(User.followers_count).where(User.id == actor_id).scalar_subquery() <= max_followers
+            )
+        )
+        try:
+            db.session.execute(
+                insert_ignoring_conflicts(TimelineEntry).from_select(TIMELINE_COLUMNS, audience)
+            )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            log_error(logger, e, {"operation": "timeline_fan_out", "actor_id": actor_id, "quip_id": quip_id})
+
+    @staticmethod
+    def retract(quip_id: int, actor_id: Optional[int] = None) -> None:
+        """Remove a quip from timelines; with ``actor_id`` only that actor's repost of it.
+
+        Timelines where another followed account still reposts the quip (or follows
+        its author) get it back from that account.
+        """
+        query = delete(TimelineEntry).where(TimelineEntry.quip_id == quip_id)
+        if actor_id is not None:
+            query = query.where(TimelineEntry.actor_id == actor_id, TimelineEntry.reposted.is_(True))
+        try:
+            if actor_id is None:
+                db.session.execute(query.execution_options(synchronize_session=False))
+            else:
+                user_ids = db.session.execute(
+                    query.returning(TimelineEntry.user_id).execution_options(synchronize_session=False)
+                ).scalars().all()
+                TimelineService._rematerialize(user_ids, [quip_id])
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            log_error(logger, e, {"operation": "timeline_retract", "quip_id": quip_id, "actor_id": actor_id})
+
+    @staticmethod
+    def get_home_timeline(user_id: int, per_page: int = 20,
+                          cursor: Optional[str] = None) -> tuple[list[Any], Optional[str]]:
+        """Page of ``(created_at, quip_id, actor_id, reposted)`` items, newest first."""
+        log_info(logger, "Fetching home timeline", lambda: {"user_id": user_id, "has_cursor": bool(cursor)})
+
+        after = decode_cursor(cursor, datetime, int) if cursor else None
+
+        try:
+            entries, next_cursor = keyset_page(
+                db.session.query(TimelineEntry).filter(TimelineEntry.user_id == user_id),
+                TimelineEntry.created_at, TimelineEntry.quip_id, per_page, after=after
+            )
+            items = [(e.created_at, e.quip_id, e.actor_id, e.reposted) for e in entries]
+
+            pulled = TimelineService._pull_unfanned(user_id, per_page, after)
+            if pulled:
+                seen: set[int] = set()
+                merged = []
+                for item in sorted(items + pulled, key=lambda item: (item[0], item[1]), reverse=True):
+                    if item[1] not in seen:
+                        seen.add(item[1])
+                        merged.append(item)
+                more = next_cursor is not None or len(merged) > per_page
+                items = merged[:per_page]
+                next_cursor = encode_cursor(items[-1][0], items[-1][1]) if more else None
+
+            log_info(logger, "Home timeline fetched successfully", lambda: {"user_id": user_id, "count": len(items)})
+            return items, next_cursor
+        except Exception as e:
+            log_error(logger, e, {"operation": "home_timeline_fetch", "user_id": user_id})
+            return [], None
+
+    @staticmethod
+    def trim(max_entries: Optional[int] = None, batch_size: int = 1000) -> int:
+        """Drop entries beyond the newest ``max_entries`` of every timeline."""
+        max_entries = max_entries or current_app.config.get("TIMELINE_MAX_ENTRIES", 800)
+        log_info(logger, "Trimming home timelines", lambda: {"max_entries": max_entries})
+
+        trimmed = 0
+        last_user_id = 0
+        while True:
+            user_ids = [row[0] for row in db.session.query(TimelineEntry.user_id).filter(
+                TimelineEntry.user_id > last_user_id
+            ).group_by(TimelineEntry.user_id).having(func.count() > max_entries).order_by(
+                TimelineEntry.user_id
+            ).limit(batch_size)]
+            if not user_ids:
+                break
+
+            try:
+                for user_id in user_ids:
+                    cutoff = db.session.query(TimelineEntry.created_at, TimelineEntry.quip_id).filter(
+                        TimelineEntry.user_id == user_id
+                    ).order_by(TimelineEntry.created_at.desc(), TimelineEntry.quip_id.desc()).offset(
+                        max_entries - 1
+                    ).first()
+                    trimmed += db.session.query(TimelineEntry).filter(
+                        TimelineEntry.user_id == user_id,
+                        tuple_(TimelineEntry.created_at, TimelineEntry.quip_id) < tuple_(*cutoff)
+                    ).delete(synchronize_session=False)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                log_error(logger, e, {"operation": "timeline_trim", "last_user_id": last_user_id})
+                raise
+
+            last_user_id = user_ids[-1]
+
+        log_info(logger, "Home timelines trimmed", lambda: {"deleted": trimmed})
+        return trimmed
+
+    @staticmethod
+    def _pull_unfanned(user_id: int, per_page: int, after: Optional[tuple]) -> list[Any]:
+        """Fan-out-on-read for followed accounts too large to fan out on write."""
+        max_followers = current_app.config.get("TIMELINE_FANOUT_MAX_FOLLOWERS", 10000)
+        celebrity_ids = [row[0] for row in db.session.query(Follow.followee_id).join(
+            User, User.id == Follow.followee_id
+        ).filter(Follow.follower_id == user_id, User.followers_count > max_followers)]
+        if not celebrity_ids:
+            return []
+
+        quips, _ = keyset_page(
+            Quip.query.filter(Quip.user_id.in_(celebrity_ids)), Quip.created_at, Quip.id, per_page, after=after
+        )
+        reposts, _ = keyset_page(
+            Repost.query.filter(Repost.user_id.in_(celebrity_ids)), Repost.created_at, Repost.quip_id,
+            per_page, after=after
+        )
+        return ([(q.created_at, q.id, q.user_id, False) for q in quips]
+                + [(r.created_at, r.quip_id, r.user_id, True) for r in reposts])
+
+    @staticmethod
+    def _backfill(follower_id: int, followee_id: int) -> None:
+        limit = current_app.config.get("TIMELINE_BACKFILL", 50)
+        max_followers = current_app.config.get("TIMELINE_FANOUT_MAX_FOLLOWERS", 10000)
+        recent = select(
+            literal(follower_id), Quip.id, Quip.user_id, literal(False), Quip.created_at
+        ).where(
+            Quip.user_id == followee_id,
+            select(User.followers_count).where(User.id == followee_id).scalar_subquery() <= max_followers
+        ).order_by(Quip.created_at.desc()).limit(limit)
+        db.session.execute(insert_ignoring_conflicts(TimelineEntry).from_select(TIMELINE_COLUMNS, recent))
+
+    @staticmethod
+    def _rematerialize(user_ids: list[int], quip_ids: list[int]) -> None:
+        """Re-add ``quip_ids`` to the timelines of ``user_ids`` from any remaining source.
+
+        A source is the quip itself or a repost of it, by the user or by a followed
+        account small enough to fan out; the earliest one wins, as on write.
+        """
+        if not user_ids or not quip_ids:
+            return
+        max_followers = current_app.config.get("TIMELINE_FANOUT_MAX_FOLLOWERS", 10000)
+        sources = union_all(
+            select(Quip.id.label("quip_id"), Quip.user_id.label("actor_id"), literal(False).label("reposted"),
+                   Quip.created_at.label("created_at")).where(Quip.id.in_(quip_ids)),
+            select(Repost.quip_id, Repost.user_id, literal(True), Repost.created_at).where(
+                Repost.quip_id.in_(quip_ids)
+            )
+        ).subquery()
+        source_columns = (sources.c.quip_id, sources.c.actor_id, sources.c.reposted, sources.c.created_at)
+        audience = union_all(
+            select(sources.c.actor_id.label("user_id"), *source_columns).where(sources.c.actor_id.in_(user_ids)),
+            select(Follow.follower_id, *source_columns).join(
+                Follow, Follow.followee_id == sources.c.actor_id
+            ).join(User, User.id == sources.c.actor_id).where(
+                Follow.follower_id.in_(user_ids), User.followers_count <= max_followers
+            )
+        ).subquery()
+        db.session.execute(insert_ignoring_conflicts(TimelineEntry).from_select(
+            TIMELINE_COLUMNS,
+            select(audience.c.user_id, *[audience.c[name] for name in TIMELINE_COLUMNS[1:]]).order_by(
+                audience.c.created_at
+            )
+        ))
+
+    @staticmethod
+    def _reject(follower_id: int, username: str, conflict: str) -> None:
+        followee_id = db.session.query(User.id).filter(User.username == username).scalar()
+        if followee_id is None:
+            log_warning(logger, "Follow change failed - user not found", {"username": username})
+            raise ValueError("User not found")
+        if followee_id == follower_id:
+            raise ValueError("Cannot follow yourself")
+        log_warning(logger, f"Follow change failed - {conflict.lower()}", {"follower_id": follower_id, "followee_id": followee_id})
+        raise ValueError(conflict)
+
+    @staticmethod
+    def _bump_follow_counts(follower_id: int, followee_id: int, delta: int) -> None:
+        User.query.filter(User.id == follower_id).update(
+            {User.following_count: User.following_count + delta}, synchronize_session=False
+        )
+        User.query.filter(User.id == followee_id).update(
+            {User.followers_count: User.followers_count + delta}, synchronize_session=False
+        )
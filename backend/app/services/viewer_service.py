@@ -0,0 +1,50 @@
+from typing import Iterable
+from flask import current_app
+from app import db
+from app.models import CommentUp, QuipUp, Repost
+from app.services.vote_buffer_service import VoteBufferService
+from app.utils.logger import get_logger, log_info
+
+logger = get_logger("viewer")
+
+
+class ViewerService:
+    """Per-viewer flags for a page of items: one indexed IN-query per kind."""
+
+    @staticmethod
+    def quip_state(user_id: int, quip_ids: Iterable[int]) -> dict[int, dict[str, bool]]:
+        quip_ids = list(dict.fromkeys(quip_ids))
+        log_info(logger, "Fetching quip viewer state", lambda: {"user_id": user_id, "count": len(quip_ids)})
+        if not quip_ids:
+            return {}
+
+        # Served by idx_quip_ups_user_quip / idx_reposts_user_quip.
+        upvoted = {quip_id for quip_id, in db.session.query(QuipUp.quip_id).filter(
+            QuipUp.user_id == user_id, QuipUp.quip_id.in_(quip_ids)
+        )}
+        reposted = {quip_id for quip_id, in db.session.query(Repost.quip_id).filter(
+            Repost.user_id == user_id, Repost.quip_id.in_(quip_ids)
+        )}
+        if current_app.config.get("VOTE_BUFFER_ENABLED"):
+            for quip_id, intent in VoteBufferService.pending(user_id, quip_ids).items():
+                if intent:
+                    upvoted.add(quip_id)
+                else:
+                    upvoted.discard(quip_id)
+        return {
+            quip_id: {"upvoted": quip_id in upvoted, "reposted": quip_id in reposted}
+            for quip_id in quip_ids
+        }
+
+    @staticmethod
+    def comment_state(user_id: int, comment_ids: Iterable[int]) -> dict[int, dict[str, bool]]:
+        comment_ids = list(dict.fromkeys(comment_ids))
+        log_info(logger, "Fetching comment viewer state", lambda: {"user_id": user_id, "count": len(comment_ids)})
+        if not comment_ids:
+            return {}
+
+        # Served by idx_comment_ups_user_comment.
+        upvoted = {comment_id for comment_id, in db.session.query(CommentUp.comment_id).filter(
+            CommentUp.user_id == user_id, CommentUp.comment_id.in_(comment_ids)
+        )}
+        return {comment_id: {"upvoted": comment_id in upvoted} for comment_id in comment_ids}
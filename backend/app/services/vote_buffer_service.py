@@ -0,0 +1,185 @@
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+from flask import Flask, current_app
+from sqlalchemy import delete, func, insert, literal, select, tuple_
+from app import db, cache
+from app.models import Quip, QuipUp, User, VoteIntent
+from app.services.ranking_service import RankingService
+from app.utils.sql import dialect_name, insert_ignoring_conflicts
+from app.utils.logger import get_logger, log_info, log_error, log_warning
+
+logger = get_logger("votes")
+
+# pg_advisory lock key held for the duration of a flush transaction.
+FLUSH_LOCK_KEY = 0x71756970
+MAX_FLUSH_BACKOFF = 60.0
+
+_flusher: Optional[threading.Thread] = None
+_flusher_lock = threading.Lock()
+
+
+class VoteBufferService:
+    """Buffered upvotes for hot quips.
+
+    With ``VOTE_BUFFER_ENABLED`` an upvote or un-upvote is one INSERT into the
+    append-only ``vote_intents`` table. A background flusher in each worker drains
+    it every ``VOTE_BUFFER_FLUSH_INTERVAL`` seconds: intents are deduplicated per
+    (user, quip), applied with bulk statements and counted once per quip per batch.
+    Only one flush runs at a time (a transaction-level advisory lock on PostgreSQL,
+    the database write lock on SQLite), so batches are applied in intent order; the
+    other flushers skip that round. Intents younger than ``VOTE_BUFFER_GRACE``
+    seconds are left for a later round: an append that commits after a newer id
+    was flushed would otherwise be applied last and override it.
+    """
+
+    @staticmethod
+    def enabled() -> bool:
+        return bool(current_app.config.get("VOTE_BUFFER_ENABLED", False))
+
+    @staticmethod
+    def append(user_id: int, quip_id: int, upvoted: bool) -> None:
+        log_info(logger, "Buffering vote intent", lambda: {"user_id": user_id, "quip_id": quip_id, "upvoted": upvoted})
+
+        try:
+            appended = db.session.execute(
+                insert(VoteIntent).from_select(
+                    ["user_id", "quip_id", "upvoted", "created_at"],
+                    select(literal(user_id), Quip.id, literal(upvoted), literal(datetime.utcnow()))
+                    .where(Quip.id == quip_id)
+                ).returning(VoteIntent.id)
+            ).first()
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            log_error(logger, e, {"operation": "vote_intent_append", "user_id": user_id, "quip_id": quip_id})
+            raise ValueError("Failed to record vote")
+
+        if appended is None:
+            raise ValueError("Quip not found")
+        VoteBufferService.ensure_flusher()
+
+    @staticmethod
+    def pending(user_id: int, quip_ids: Iterable[int]) -> dict[int, bool]:
+        """Latest not-yet-flushed intent of ``user_id`` per quip, for read-your-writes."""
+        rows = db.session.query(VoteIntent.quip_id, VoteIntent.upvoted).filter(
+            VoteIntent.user_id == user_id, VoteIntent.quip_id.in_(list(quip_ids))
+        ).order_by(VoteIntent.id).all()
+        return {quip_id: upvoted for quip_id, upvoted in rows}
+
+    @staticmethod
+    def flush(batch_size: int = 1000) -> int:
+        """Apply the oldest ``batch_size`` settled intents; ``0`` if another flush holds the lock."""
+        settled = datetime.utcnow() - timedelta(seconds=current_app.config.get("VOTE_BUFFER_GRACE", 2.0))
+        claim = select(VoteIntent.id).where(VoteIntent.created_at < settled).order_by(
+            VoteIntent.id
+        ).limit(batch_size)
+
+        try:
+            if dialect_name() == "postgresql" and not db.session.scalar(
+                select(func.pg_try_advisory_xact_lock(FLUSH_LOCK_KEY))
+            ):
+                db.session.rollback()
+                return 0
+            intents = db.session.execute(
+                delete(VoteIntent).where(VoteIntent.id.in_(claim)).returning(
+                    VoteIntent.id, VoteIntent.user_id, VoteIntent.quip_id, VoteIntent.upvoted
+                ).execution_options(synchronize_session=False)
+            ).all()
+            if not intents:
+                db.session.rollback()
+                return 0
+
+            desired: dict[tuple[int, int], bool] = {}
+            for _, user_id, quip_id, upvoted in sorted(intents):
+                desired[(user_id, quip_id)] = upvoted
+
+            live = set(db.session.scalars(select(Quip.id).where(Quip.id.in_({q for _, q in desired}))))
+            now = datetime.utcnow()
+            ups = [{"user_id": u, "quip_id": q, "created_at": now}
+                   for (u, q), upvoted in sorted(desired.items()) if upvoted and q in live]
+            downs = sorted(pair for pair, upvoted in desired.items() if not upvoted)
+
+            # RETURNING counts the rows that actually changed, so counters stay exact
+            # even when an intent repeats the current state.
+            deltas: Counter = Counter()
+            if ups:
+                for quip_id in db.session.scalars(
+                    insert_ignoring_conflicts(QuipUp).values(ups).returning(QuipUp.quip_id)
+                ):
+                    deltas[quip_id] += 1
+            if downs:
+                for quip_id in db.session.scalars(
+                    delete(QuipUp).where(tuple_(QuipUp.user_id, QuipUp.quip_id).in_(downs))
+                    .returning(QuipUp.quip_id).execution_options(synchronize_session=False)
+                ):
+                    deltas[quip_id] -= 1
+
+            # Quips, then authors, each locked in id order, so concurrent writers cannot deadlock.
+            authors: Counter = Counter()
+            for quip_id, delta in sorted(deltas.items()):
+                if delta:
+                    author_id = RankingService.bump(quip_id, Quip.quip_ups_count, delta)
+                    if author_id is not None:
+                        authors[author_id] += delta
+            for author_id, delta in sorted(authors.items()):
+                if delta:
+                    User.query.filter(User.id == author_id).update(
+                        {User.quip_ups_received_count: User.quip_ups_received_count + delta},
+                        synchronize_session=False
+                    )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            log_error(logger, e, {"operation": "vote_buffer_flush", "batch_size": batch_size})
+            raise
+
+        changed = [quip_id for quip_id, delta in deltas.items() if delta]
+        if changed:
+            cache.invalidate(*[f"quip:{quip_id}" for quip_id in changed],
+                             *[f"author:{author_id}" for author_id in authors])
+        log_info(logger, "Vote buffer flushed", lambda: {"intents": len(intents), "pairs": len(desired),
+                                                 "quips_changed": len(changed)})
+        return len(intents)
+
+    @staticmethod
+    def drain(batch_size: int = 1000) -> int:
+        flushed = 0
+        while True:
+            count = VoteBufferService.flush(batch_size)
+            flushed += count
+            if count < batch_size:
+                return flushed
+
+    @staticmethod
+    def ensure_flusher() -> None:
+        # Started on first buffered vote so it runs in the serving process, after fork.
+        global _flusher
+        if _flusher is not None and _flusher.is_alive():
+            return
+        with _flusher_lock:
+            if _flusher is None or not _flusher.is_alive():
+                _flusher = threading.Thread(
+                    target=VoteBufferService._run_flusher, args=(current_app._get_current_object(),),
+                    name="vote-flusher", daemon=True
+                )
+                _flusher.start()
+
+    @staticmethod
+    def _run_flusher(app: Flask) -> None:
+        interval = app.config.get("VOTE_BUFFER_FLUSH_INTERVAL", 1.0)
+        batch_size = app.config.get("VOTE_BUFFER_BATCH_SIZE", 1000)
+        delay = interval
+        while True:
+            time.sleep(delay)
+            with app.app_context():
+                try:
+                    VoteBufferService.drain(batch_size)
+                    delay = interval
+                except Exception as e:
+                    # The intents stay queued; retry less often while the database is unhappy.
+                    delay = min(max(delay, interval) * 2, MAX_FLUSH_BACKOFF)
+                    log_warning(logger, "Vote flush failed, backing off",
+                                {"error": str(e), "retry_in_seconds": delay})
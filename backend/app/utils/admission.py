@@ -0,0 +1,169 @@
+import threading
+import time
+from functools import wraps
+from typing import Any, Optional
+from flask import Flask, Response, current_app, g, request
+from app.utils.errors import OverloadedError
+
+PRIORITIES = ("critical", "cheap", "normal", "expensive")
+
+
+def request_start(header: Optional[str]) -> Optional[float]:
+    """Epoch seconds from ``X-Request-Start`` (``t=<seconds|ms|µs>``, as set by nginx or a load balancer)."""
+    if not header:
+        return None
+    try:
+        value = float(header.strip().removeprefix("t="))
+    except ValueError:
+        return None
+    if value > 1e14:
+        return value / 1e6
+    if value > 1e11:
+        return value / 1e3
+    return value
+
+
+class QueueDelay:
+    """CoDel-style estimate: the smallest queueing delay seen over the last full interval.
+
+    The minimum ignores one-off stragglers; it only stays above the target when
+    every request in the interval waited, i.e. a standing queue has formed.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.estimate = 0.0
+        self._window_start = time.monotonic()
+        self._window_min: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def observe(self, delay: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._window_start >= self.interval:
+                # A window that ended long ago says nothing about the queue now.
+                fresh = now - self._window_start < 2 * self.interval
+                self.estimate = self._window_min if fresh and self._window_min is not None else 0.0
+                self._window_start = now
+                self._window_min = None
+            if self._window_min is None or delay < self._window_min:
+                self._window_min = delay
+            return self.estimate
+
+    def current(self) -> float:
+        """The estimate, or ``0`` once nothing has been observed for a full extra interval."""
+        with self._lock:
+            if time.monotonic() - self._window_start >= 2 * self.interval:
+                return 0.0
+            return self.estimate
+
+
+class AdmissionController:
+    """Sheds low-priority requests with ``503`` while the server is overloaded.
+
+    Overload is measured as the queueing delay before the app sees a request
+    (from ``X-Request-Start``) relative to ``ADMISSION_TARGET_MS``, and as the
+    time spent acquiring a connection from the primary pool. The pool is sized
+    to the serving threads, so the share checked out says little; a standing
+    wait of ``ADMISSION_POOL_WAIT_MS`` on every checkout does. Each route has a priority from
+    ``ADMISSION_PRIORITIES`` (endpoint or blueprint; cached GETs default to
+    ``cheap``, the rest to ``normal``), and ``ADMISSION_SHED_AT`` gives the
+    delay/target ratio at which that priority starts to be shed. A saturated
+    pool sheds ``normal`` and ``expensive`` routes. ``critical`` is never shed.
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.enabled = False
+        self.target = 0.1
+        self.priorities: dict[str, str] = {}
+        self.shed_at: dict[str, float] = {}
+        self.pool_wait_target = 0.05
+        self.queue_delay = QueueDelay(0.5)
+        self.pool_wait = QueueDelay(0.5)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        app.extensions["admission"] = self
+        self.enabled = app.config.get("ADMISSION_CONTROL_ENABLED", True)
+        if not self.enabled:
+            return
+        self.target = app.config.get("ADMISSION_TARGET_MS", 100) / 1000
+        self.queue_delay = QueueDelay(app.config.get("ADMISSION_INTERVAL_MS", 500) / 1000)
+        self.pool_wait = QueueDelay(app.config.get("ADMISSION_INTERVAL_MS", 500) / 1000)
+        self.priorities = dict(app.config.get("ADMISSION_PRIORITIES", {}))
+        self.shed_at = dict(app.config.get("ADMISSION_SHED_AT", {"expensive": 1.0, "normal": 2.0, "cheap": 4.0}))
+        self.pool_wait_target = app.config.get("ADMISSION_POOL_WAIT_MS", 50) / 1000
+        unknown = set(self.priorities.values()) - set(PRIORITIES)
+        if unknown:
+            raise ValueError(f"Unknown admission priorities: {sorted(unknown)}")
+        from app import db
+        with app.app_context():
+            self._time_checkouts(db.engine)
+        app.before_request(self._admit)
+        app.after_request(self._set_headers)
+
+    def priority(self) -> str:
+        for scope in (request.endpoint, request.blueprint):
+            if scope and scope in self.priorities:
+                return self.priorities[scope]
+        view = current_app.view_functions.get(request.endpoint or "")
+        if request.method == "GET" and getattr(view, "cached_response", False):
+            return "cheap"
+        return "normal"
+
+    def pool_saturated(self) -> bool:
+        return self.pool_wait.current() >= self.pool_wait_target
+
+    def _admit(self) -> None:
+        metrics = current_app.extensions.get("metrics")
+        # Requests that bypass the proxy (health checks, internal calls) carry no
+        # start time and leave the estimate alone.
+        started = request_start(request.headers.get("X-Request-Start"))
+        if started is not None:
+            delay = max(time.time() - started, 0.0)
+            estimate = self.queue_delay.observe(delay)
+            if metrics is not None:
+                metrics.observe_queue_delay(delay)
+        else:
+            estimate = self.queue_delay.current()
+        priority = self.priority()
+        if priority == "critical":
+            return
+
+        reason = None
+        if estimate / self.target >= self.shed_at.get(priority, float("inf")):
+            reason = "queue_delay"
+        elif priority in ("normal", "expensive") and self.pool_saturated():
+            reason = "db_pool"
+        if reason is None:
+            return
+
+        if metrics is not None:
+            metrics.count_shed(priority, reason)
+        g.shed = True
+        raise OverloadedError(retry_after=self.retry_after, details={"priority": priority, "reason": reason})
+
+    def _time_checkouts(self, engine: Any) -> None:
+        # Same hook as the pool-wait histogram in metrics: every Connection gets its
+        # DBAPI connection through raw_connection().
+        raw_connection = engine.raw_connection
+
+        @wraps(raw_connection)
+        def timed_raw_connection() -> Any:
+            start = time.perf_counter()
+            try:
+                return raw_connection()
+            finally:
+                self.pool_wait.observe(time.perf_counter() - start)
+
+        engine.raw_connection = timed_raw_connection
+
+    @property
+    def retry_after(self) -> int:
+        return max(1, round(self.queue_delay.interval))
+
+    def _set_headers(self, response: Response) -> Response:
+        if g.pop("shed", False):
+            response.headers["Retry-After"] = str(self.retry_after)
+        return response
@@ -0,0 +1,284 @@
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Iterable, Optional
+from flask import Flask, Response, current_app, g, has_request_context, request
+from app.utils.logger import get_logger, log_warning
+
+try:
+    import redis
+except ImportError:  # optional: CACHE_BACKEND=redis falls back to memory
+    redis = None
+
+logger = get_logger("cache")
+
+
+class MemoryBackend:
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries: "OrderedDict[str, tuple[float, bytes, tuple[str, ...]]]" = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                self._drop(key)
+                self.evictions += 1
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def get_many(self, keys: Iterable[str]) -> list[Optional[bytes]]:
+        return [self.get(key) for key in keys]
+
+    def set(self, key: str, value: bytes, ttl: int, tags: Iterable[str]) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            tags = tuple(tags)
+            self._entries[key] = (time.monotonic() + ttl, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        dropped = 0
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    if key in self._entries:
+                        self._drop(key)
+                        dropped += 1
+        return dropped
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def _drop(self, key: str) -> None:
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class RedisBackend:
+    """Works with any client exposing the redis-py get/mget/set/delete/sadd/smembers/expire API."""
+
+    evictions = 0
+
+    def __init__(self, client: Any, prefix: str = "quiply:cache:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def get_many(self, keys: Iterable[str]) -> list[Optional[bytes]]:
+        keys = [self.prefix + key for key in keys]
+        return self.client.mget(keys) if keys else []
+
+    def set(self, key: str, value: bytes, ttl: int, tags: Iterable[str]) -> None:
+        self.client.set(self.prefix + key, value, ex=ttl)
+        for tag in tags:
+            tag_key = self.prefix + "tag:" + tag
+            self.client.sadd(tag_key, self.prefix + key)
+            self.client.expire(tag_key, ttl)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        dropped = 0
+        for tag in tags:
+            tag_key = self.prefix + "tag:" + tag
+            keys = list(self.client.smembers(tag_key))
+            if keys:
+                dropped += self.client.delete(*keys)
+            self.client.delete(tag_key)
+        return dropped
+
+    def clear(self) -> None:
+        pass
+
+
+class NullBackend:
+    evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    def get_many(self, keys: Iterable[str]) -> list[Optional[bytes]]:
+        return [None for _ in keys]
+
+    def set(self, key: str, value: bytes, ttl: int, tags: Iterable[str]) -> None:
+        pass
+
+    def delete(self, key: str) -> None:
+        pass
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        return 0
+
+    def clear(self) -> None:
+        pass
+
+
+class ResponseCache:
+    """Tagged response cache.
+
+    ``invalidate`` also leaves an ``inv:<tag>`` timestamp behind. A response whose
+    tag was invalidated after its request started (or, when it was read from a
+    replica, up to ``READ_YOUR_WRITES_SECONDS`` before) may predate the write, so
+    ``cached_response`` does not store it. ``memory`` keeps entries and markers
+    per process, so invalidations reach only the worker that made the write;
+    production uses ``redis``.
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.backend: Any = NullBackend()
+        self.default_ttl = 30
+        self.replica_lag = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask, backend: Any = None) -> None:
+        self.default_ttl = app.config.get("CACHE_DEFAULT_TTL", 30)
+        if app.config.get("SQLALCHEMY_REPLICA_URIS"):
+            self.replica_lag = app.config.get("READ_YOUR_WRITES_SECONDS", 5)
+        self.backend = backend or self._create_backend(app)
+        app.extensions["response_cache"] = self
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            value = self.backend.get(key)
+        except Exception:
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: bytes, tags: Iterable[str], ttl: Optional[int] = None) -> None:
+        try:
+            self.backend.set(key, value, ttl or self.default_ttl, tags)
+        except Exception:
+            pass
+
+    def invalidate(self, *tags: str) -> None:
+        try:
+            # Markers before the drop, while cached_response stores before it checks:
+            # a stale entry is either dropped here or removed by its own request.
+            stamp = str(time.time()).encode()
+            ttl = math.ceil(max(self.replica_lag, self.default_ttl))
+            for tag in tags:
+                self.backend.set(f"inv:{tag}", stamp, ttl, ())
+            self.invalidations += self.backend.invalidate(tags)
+        except Exception:
+            pass
+
+    def delete(self, key: str) -> None:
+        try:
+            self.backend.delete(key)
+        except Exception:
+            pass
+
+    def invalidated_since(self, tags: Iterable[str], since: float) -> bool:
+        """Whether any of ``tags`` was invalidated after ``since`` (epoch seconds)."""
+        tags = list(tags)
+        if not tags:
+            return False
+        try:
+            stamps = self.backend.get_many([f"inv:{tag}" for tag in tags])
+        except Exception:
+            return True
+        return any(stamp is not None and float(stamp) > since for stamp in stamps)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    @staticmethod
+    def _create_backend(app: Flask) -> Any:
+        kind = app.config.get("CACHE_BACKEND", "memory")
+        if kind == "redis" and redis is None:
+            log_warning(logger, "redis is not installed, response cache falls back to memory")
+            kind = "memory"
+        if kind == "memory":
+            return MemoryBackend(app.config.get("CACHE_MAX_ENTRIES", 10000))
+        if kind == "redis":
+            return RedisBackend(redis.Redis.from_url(app.config["CACHE_REDIS_URL"]))
+        return NullBackend()
+
+
+CACHED_HEADERS = ("ETag", "Last-Modified", "Cache-Control")
+
+
+def tag_response(*tags: str) -> None:
+    if has_request_context() and hasattr(g, "cache_tags"):
+        g.cache_tags.update(tags)
+
+
+def cached_response(ttl: Optional[int] = None, unless: Optional[Callable[[], Any]] = None) -> Callable:
+    """Cache successful GET responses; ``unless`` returning truthy bypasses the cache.
+
+    Requests pinned to the primary for read-your-writes (``g.read_primary``) bypass it too,
+    and a response whose tags were invalidated while it was being rendered (or shortly
+    before, if it was read from a replica) is served but not stored.
+    """
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache: Optional[ResponseCache] = current_app.extensions.get("response_cache")
+            if (cache is None or request.method != "GET" or g.get("read_primary")
+                    or (unless is not None and unless())):
+                return view(*args, **kwargs)
+
+            key = request.path + "?" + "&".join(
+                f"{k}={v}" for k, v in sorted(request.args.items(multi=True))
+            )
+            entry = cache.get(key)
+            if entry is not None:
+                headers, _, body = entry.partition(b"\n")
+                response = Response(body, status=200, mimetype="application/json")
+                response.headers.update(json.loads(headers))
+                response.headers["X-Cache"] = "HIT"
+                return response.make_conditional(request)
+
+            g.cache_tags = set()
+            started = time.time() - (cache.replica_lag if g.get("read_replica") else 0)
+            result = view(*args, **kwargs)
+            response = current_app.make_response(result)
+            if response.status_code == 200:
+                headers = {h: response.headers[h] for h in CACHED_HEADERS if h in response.headers}
+                entry = json.dumps(headers).encode("utf-8") + b"\n" + response.get_data()
+                cache.set(key, entry, g.cache_tags, ttl)
+                if cache.invalidated_since(g.cache_tags, started):
+                    cache.delete(key)
+            response.headers["X-Cache"] = "MISS"
+            return response
+        wrapper.cached_response = True  # admission control treats these GETs as cheap
+        return wrapper
+    return decorator
@@ -0,0 +1,130 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+from flask import Flask, current_app, g, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import Select
+from app.utils.viewer import optional_identity
+
+REPLICA_BIND_PREFIX = "replica_"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_replica: ContextVar[Optional[Any]] = ContextVar("db_replica", default=None)
+
+
+class RoutingSession(Session):
+    """Sends plain SELECTs to the replica chosen for the current request.
+
+    Writes, flushes and ``SELECT ... FOR UPDATE`` always go to the primary, so a
+    GET handler that happens to write still works.
+    """
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, bind: Any = None, **kwargs: Any) -> Any:
+        replica = _replica.get()
+        if (replica is not None and bind is None and not self._flushing
+                and isinstance(clause, Select) and clause._for_update_arg is None):
+            return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaRouter:
+    """Routes safe requests to a random replica unless the caller wrote recently.
+
+    A successful write by an authenticated user leaves a marker for
+    ``READ_YOUR_WRITES_SECONDS``; while it is set, that user's reads go to the
+    primary and skip the response cache. Markers live in this process and in the
+    response cache backend, so with ``CACHE_BACKEND=redis`` they are shared
+    between workers. Other callers may still read a lagging replica, so
+    ``cached_response`` refuses to store what they read right after an
+    invalidation.
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        self._recent: dict[int, float] = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        app.extensions["replica_router"] = self
+        if not app.config.get("SQLALCHEMY_REPLICA_URIS"):
+            return
+        app.before_request(self._route_request)
+        app.after_request(self._mark_write)
+        app.teardown_request(self._reset)
+
+    @staticmethod
+    def replica_keys() -> list[str]:
+        return [key for key in current_app.config.get("SQLALCHEMY_BINDS") or {}
+                if key.startswith(REPLICA_BIND_PREFIX)]
+
+    @staticmethod
+    def pick_replica() -> Optional[Any]:
+        from app import db
+        keys = ReplicaRouter.replica_keys()
+        return db.engines[random.choice(keys)] if keys else None
+
+    def _route_request(self) -> None:
+        if request.method not in SAFE_METHODS:
+            return
+        user_id = optional_identity()
+        if user_id is not None and self._wrote_recently(user_id):
+            g.read_primary = True
+            return
+        replica = self.pick_replica()
+        _replica.set(replica)
+        g.read_replica = replica is not None
+
+    def _mark_write(self, response: Any) -> Any:
+        if request.method in SAFE_METHODS or response.status_code >= 400:
+            return response
+        user_id = optional_identity()
+        if user_id is None:
+            return response
+
+        ttl = current_app.config.get("READ_YOUR_WRITES_SECONDS", 5)
+        until = time.time() + ttl
+        with self._lock:
+            now = time.time()
+            for stale in [uid for uid, expires in self._recent.items() if expires <= now]:
+                del self._recent[stale]
+            self._recent[user_id] = until
+        try:
+            _marker_store().set(_marker_key(user_id), str(until).encode(), ttl, ())
+        except Exception:
+            pass
+        return response
+
+    def _wrote_recently(self, user_id: int) -> bool:
+        if self._recent.get(user_id, 0) > time.time():
+            return True
+        try:
+            value = _marker_store().get(_marker_key(user_id))
+        except Exception:
+            return True  # Unknown: prefer the primary.
+        return value is not None and float(value) > time.time()
+
+    @staticmethod
+    def _reset(_: Optional[BaseException] = None) -> None:
+        _replica.set(None)
+
+
+@contextmanager
+def read_from_replica() -> Iterator[None]:
+    """Route SELECTs in the block to a replica, e.g. for reporting jobs outside a request."""
+    token = _replica.set(ReplicaRouter.pick_replica())
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+def _marker_store() -> Any:
+    return current_app.extensions["response_cache"].backend
+
+
+def _marker_key(user_id: int) -> str:
+    return f"rw:{user_id}"
@@ -41,11 +41,27 @@ class ConflictError(BaseAPIError):
         super().__init__(message, 409, "CONFLICT_ERROR")
 
 
+class RateLimitError(BaseAPIError):
+    def __init__(self, message: str = "Too many requests", retry_after: int = 1):
+        super().__init__(message, 429, "RATE_LIMITED", {"retry_after": retry_after})
+
+
 class DatabaseError(BaseAPIError):
     def __init__(self, message: str = "Database operation failed"):
         super().__init__(message, 500, "DATABASE_ERROR")
 
 
+class ServiceUnavailableError(BaseAPIError):
+    def __init__(self, message: str = "Service temporarily unavailable"):
+        super().__init__(message, 503, "SERVICE_UNAVAILABLE")
+
+
+class OverloadedError(BaseAPIError):
+    def __init__(self, message: str = "Server is overloaded, please retry shortly", retry_after: int = 1,
+                 details: Optional[Dict[str, Any]] = None):
+        super().__init__(message, 503, "OVERLOADED", {"retry_after": retry_after, **(details or {})})
+
+
 class InternalServerError(BaseAPIError):
     def __init__(self, message: str = "Internal server error"):
         super().__init__(message, 500, "INTERNAL_SERVER_ERROR")
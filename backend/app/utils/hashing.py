@@ -0,0 +1,101 @@
+import atexit
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+import bcrypt
+from flask import Flask
+from app.utils.errors import ServiceUnavailableError
+
+
+def _hashpw(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+
+
+def _checkpw(password: bytes, password_hash: bytes) -> bool:
+    return bcrypt.checkpw(password, password_hash)
+
+
+class PasswordHasher:
+    def __init__(self, app: Optional[Flask] = None):
+        self.rounds = 12
+        self.pool_kind = "inline"
+        self.workers = 2
+        self.queue_timeout = 2.0
+        self.timeout = 5.0
+        self._slots = threading.BoundedSemaphore(8)
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        atexit.register(self.shutdown)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        self.shutdown()
+        self.rounds = app.config.get("BCRYPT_ROUNDS", 12)
+        self.pool_kind = app.config.get("PASSWORD_HASH_POOL", "process")
+        self.workers = app.config.get("PASSWORD_HASH_WORKERS", 2)
+        self.queue_timeout = app.config.get("PASSWORD_HASH_QUEUE_TIMEOUT", 2.0)
+        self.timeout = app.config.get("PASSWORD_HASH_TIMEOUT", 5.0)
+        self._slots = threading.BoundedSemaphore(app.config.get("PASSWORD_HASH_MAX_PENDING", 8))
+
+    def hash(self, password: str) -> str:
+        return self._run(_hashpw, password.encode("utf-8"), self.rounds).decode("utf-8")
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        return self._run(_checkpw, password.encode("utf-8"), password_hash.encode("utf-8"))
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        try:
+            return int(password_hash.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _run(self, fn: Callable, *args: Any) -> Any:
+        # PASSWORD_HASH_TIMEOUT bounds the whole operation, queueing included.
+        deadline = time.monotonic() + self.timeout
+        if not self._slots.acquire(timeout=min(self.queue_timeout, self.timeout)):
+            raise ServiceUnavailableError("Authentication is busy, please retry shortly")
+        try:
+            executor = self._get_executor()
+            if executor is None:
+                try:
+                    return fn(*args)
+                finally:
+                    self._slots.release()
+            future = executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # A running bcrypt cannot be cancelled, so the slot is held until it really ends;
+        # PASSWORD_HASH_MAX_PENDING then bounds the work queued on the pool, not the callers.
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=max(deadline - time.monotonic(), 0.0))
+        except TimeoutError:
+            future.cancel()
+            raise ServiceUnavailableError("Authentication is busy, please retry shortly")
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self.pool_kind == "inline":
+            return None
+        with self._lock:
+            # Created lazily so every gunicorn worker gets its own pool after startup.
+            # Workers already run threads (log listener, gthread), and forking a
+            # threaded process can leave a child stuck on a lock copied mid-use.
+            if self._executor is None:
+                if self.pool_kind == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                         mp_context=multiprocessing.get_context("forkserver"))
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                        thread_name_prefix="password-hash")
+            return self._executor
+
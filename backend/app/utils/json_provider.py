@@ -0,0 +1,86 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+from flask import Flask, Response
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional: JSON_PROVIDER=orjson falls back to Flask's provider
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson.
+
+    Keys keep insertion order instead of being sorted, datetimes are encoded
+    natively as ISO 8601, and values orjson does not know (Decimal, UUID,
+    dataclasses with ``__html__``...) go through Flask's default hook.
+    ``orjson.Fragment`` values are spliced into the output as-is.
+    """
+
+    sort_keys = False
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return self.encode(obj, indent=bool(kwargs.get("indent"))).decode("utf-8")
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(
+            self.encode(obj, indent=indent) + b"\n", mimetype=self.mimetype
+        )
+
+    def encode(self, obj: Any, indent: bool = False) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=self.default, option=option)
+
+
+class FragmentCache:
+    """Bounded LRU of pre-encoded JSON fragments, per process."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: bytes) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def init_json(app: Flask) -> None:
+    """Install the configured JSON provider and, with orjson, the quip fragment cache."""
+    if app.config.get("JSON_PROVIDER", "orjson") != "orjson" or orjson is None:
+        return
+    app.json = OrjsonProvider(app)
+    size = app.config.get("QUIP_FRAGMENT_CACHE_SIZE", 10000)
+    if size > 0:
+        app.extensions["quip_fragments"] = FragmentCache(size)
+
+
+def encode_fragment(parts: list[bytes]) -> Any:
+    return orjson.Fragment(b"".join(parts))
+
+
+def encode_members(obj: dict[str, Any]) -> bytes:
+    """``{"a": 1, "b": 2}`` as ``"a":1,"b":2``, ready to splice into an object."""
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)[1:-1]
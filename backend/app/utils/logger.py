@@ -1,77 +1,219 @@
+import atexit
+import copy
 import logging
+import queue
+import random
 import sys
 import os
 import json
 from datetime import datetime
-from typing import Any, Dict, Optional, Union
-from flask import request, g, current_app
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Dict, Optional, Union
+from flask import request, g, has_request_context, has_app_context
+
+
+RESERVED_ATTRS = {'name', 'msg', 'args', 'levelname', 'levelno',
+                  'pathname', 'filename', 'module', 'lineno',
+                  'funcName', 'created', 'msecs', 'relativeCreated',
+                  'thread', 'threadName', 'processName', 'process',
+                  'getMessage', 'exc_info', 'exc_text', 'stack_info',
+                  'message', 'taskName', 'request_context', 'sample_draw'}
+
+_listeners: Dict[str, QueueListener] = {}
+
+
+def capture_request_context() -> Dict[str, Any]:
+    context: Dict[str, Any] = {}
+    
+    if has_request_context():
+        if request.endpoint:
+            context['endpoint'] = request.endpoint
+        if request.method:
+            context['method'] = request.method
+        if request.path:
+            context['path'] = request.path
+        if request.remote_addr:
+            context['remote_addr'] = request.remote_addr
+    
+    if has_app_context() and hasattr(g, 'user_id'):
+        context['user_id'] = g.user_id
+    
+    return context
 
 
 class CustomJSONFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
         log_record = {
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': datetime.utcfromtimestamp(record.created).isoformat(),
             'level': record.levelname,
             'logger': record.name,
             'message': record.getMessage(),
         }
         
-        if hasattr(request, 'endpoint'):
-            if request.endpoint:
-                log_record['endpoint'] = request.endpoint
-            if request.method:
-                log_record['method'] = request.method
-            if request.path:
-                log_record['path'] = request.path
-            if request.remote_addr:
-                log_record['remote_addr'] = request.remote_addr
-        
-        if hasattr(g, 'user_id'):
-            log_record['user_id'] = g.user_id
+        resolve_context(record)
+        request_context = getattr(record, 'request_context', None)
+        if request_context is None:
+            request_context = capture_request_context()
+        log_record.update(request_context)
         
-        if hasattr(record, '__dict__'):
-            extra_data = {k: v for k, v in record.__dict__.items()
-                         if k not in ['name', 'msg', 'args', 'levelname', 'levelno',
-                                    'pathname', 'filename', 'module', 'lineno',
-                                    'funcName', 'created', 'msecs', 'relativeCreated',
-                                    'thread', 'threadName', 'processName', 'process',
-                                    'getMessage', 'exc_info', 'exc_text', 'stack_info']}
-            log_record.update(extra_data)
+        log_record.update({k: v for k, v in record.__dict__.items() if k not in RESERVED_ATTRS})
         
-        return json.dumps(log_record)
+        return json.dumps(log_record, default=str)
 
 
-def setup_logger(app_name: str = 'quiply', log_level: str = 'INFO') -> logging.Logger:
+class ContextQueueHandler(QueueHandler):
+    """Captures request fields on the calling thread; formatting happens in the listener."""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        resolve_context(record)
+        record.request_context = capture_request_context()
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of INFO-and-below records; warnings and errors always pass.
+    
+    ``rates`` maps a logger name to its rate, which also covers the logger's
+    children (``quiply.votes`` applies to ``quiply.votes.flush``); other loggers
+    use ``rate``. Inside a request one draw is made, so a sampled request keeps
+    all its lines from every logger whose rate is at least that draw.
+    """
+    
+    def __init__(self, rate: float, rates: Optional[Dict[str, float]] = None):
+        super().__init__()
+        self.rate = rate
+        self.rates = dict(rates or {})
+    
+    def rate_for(self, name: str) -> float:
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition('.')[0]
+        return self.rate
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        rate = self.rate_for(record.name)
+        if rate >= 1.0:
+            return True
+        if has_request_context():
+            if not hasattr(g, '_log_draw'):
+                g._log_draw = random.random()
+            return g._log_draw < rate
+        # Every handler carries this filter; they must agree on the record.
+        if not hasattr(record, 'sample_draw'):
+            record.sample_draw = random.random()
+        return record.sample_draw < rate
+
+
+def setup_logger(app_name: str = 'quiply', log_level: Optional[str] = None,
+                 log_file: Optional[str] = None, log_dir: str = 'logs',
+                 async_mode: bool = False, sample_rate: float = 1.0,
+                 sample_rates: Optional[Dict[str, float]] = None,
+                 console: bool = True) -> logging.Logger:
     logger = logging.getLogger(app_name)
-    logger.setLevel(getattr(logging, log_level.upper()))
     
-    if not logger.handlers:
-        formatter = CustomJSONFormatter()
-        
-        try:
-            log_file = current_app.config.get('LOG_FILE')
-            log_dir = current_app.config.get('LOG_DIR', 'logs')
-        except RuntimeError:
-            log_file = None
-            log_dir = 'logs'
-        
+    if logger.handlers and log_level is None:
+        return logger
+    
+    logger.setLevel(getattr(logging, (log_level or 'INFO').upper()))
+    
+    listener = _listeners.pop(app_name, None)
+    if listener:
+        listener.stop()
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    for log_filter in list(logger.filters):
+        logger.removeFilter(log_filter)
+    
+    formatter = CustomJSONFormatter()
+    handlers: list[logging.Handler] = []
+    
+    if console:
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+        handlers.append(console_handler)
+    
+    if log_file:
+        if log_dir and not os.path.exists(log_dir):
+            os.makedirs(log_dir, exist_ok=True)
         
-        if log_file:
-            if log_dir and not os.path.exists(log_dir):
-                os.makedirs(log_dir, exist_ok=True)
-            
-            log_path = os.path.join(log_dir, log_file)
-            file_handler = logging.FileHandler(log_path)
-            file_handler.setFormatter(formatter)
-            logger.addHandler(file_handler)
+        log_path = os.path.join(log_dir, log_file)
+        file_handler = logging.FileHandler(log_path)
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+    
+    if async_mode:
+        listener = QueueListener(queue.SimpleQueue(), *handlers, respect_handler_level=True)
+        listener.start()
+        _listeners[app_name] = listener
+        handlers = [ContextQueueHandler(listener.queue)]
+    
+    # On the handlers rather than the logger, so records from child loggers
+    # (``get_logger``) are sampled too, and before any context is built.
+    if sample_rate < 1.0 or sample_rates:
+        sampler = SamplingFilter(sample_rate, sample_rates)
+        for handler in handlers:
+            handler.addFilter(sampler)
+    for handler in handlers:
+        logger.addHandler(handler)
     
     return logger
 
 
-def log_error(logger: logging.Logger, error: Exception, context: Optional[Dict[str, Any]] = None):
+def get_logger(name: str, app_name: str = 'quiply') -> logging.Logger:
+    """Child of the app logger: shares its handlers, with its own ``LOG_SAMPLE_RATES`` entry."""
+    setup_logger(app_name)
+    return logging.getLogger(f'{app_name}.{name}')
+
+
+def _restart_listeners_in_child() -> None:
+    # Fork copies the listeners but not their threads, and a queue copied while
+    # another thread was using it may be unusable: give each logger a new pair.
+    for app_name, listener in list(_listeners.items()):
+        fresh = QueueListener(queue.SimpleQueue(), *listener.handlers,
+                              respect_handler_level=listener.respect_handler_level)
+        for handler in logging.getLogger(app_name).handlers:
+            if isinstance(handler, QueueHandler) and handler.queue is listener.queue:
+                handler.queue = fresh.queue
+        fresh.start()
+        _listeners[app_name] = fresh
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_listeners_in_child)
+
+
+@atexit.register
+def _stop_listeners() -> None:
+    for listener in _listeners.values():
+        listener.stop()
+    _listeners.clear()
+
+
+ContextFactory = Callable[[], Dict[str, Any]]
+
+
+def resolve_context(record: logging.LogRecord) -> None:
+    """Build a lazily passed context once the record is known to be emitted."""
+    data = getattr(record, 'extra_data', None)
+    if isinstance(data, dict) and callable(data.get('context')):
+        context = data['context']()
+        record.extra_data = {k: v for k, v in data.items() if k != 'context'}
+        if context:
+            record.extra_data['context'] = context
+
+
+def log_error(logger: logging.Logger, error: Exception,
+              context: Union[Dict[str, Any], ContextFactory, None] = None):
     error_data: Dict[str, Union[str, int, Dict[str, Any]]] = {
         'error_type': type(error).__name__,
         'error_message': str(error),
@@ -90,7 +232,11 @@ def log_error(logger: logging.Logger, error: Exception, context: Optional[Dict[s
     logger.error('Error occurred', extra={'extra_data': error_data})
 
 
-def log_info(logger: logging.Logger, message: str, context: Optional[Dict[str, Any]] = None):
+def log_info(logger: logging.Logger, message: str,
+             context: Union[Dict[str, Any], ContextFactory, None] = None):
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    
     log_data: Dict[str, Any] = {}
     if context:
         log_data['context'] = context
@@ -98,7 +244,11 @@ def log_info(logger: logging.Logger, message: str, context: Optional[Dict[str, A
     logger.info(message, extra={'extra_data': log_data})
 
 
-def log_warning(logger: logging.Logger, message: str, context: Optional[Dict[str, Any]] = None):
+def log_warning(logger: logging.Logger, message: str,
+                context: Union[Dict[str, Any], ContextFactory, None] = None):
+    if not logger.isEnabledFor(logging.WARNING):
+        return
+    
     log_data: Dict[str, Any] = {}
     if context:
         log_data['context'] = context
@@ -0,0 +1,187 @@
+import os
+import threading
+import time
+from functools import wraps
+from typing import Any, Optional
+from flask import Flask, current_app, g, request
+from sqlalchemy import event
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:  # optional: /metrics answers 404 without it
+    prometheus_client = None
+
+# Under gunicorn every worker writes its samples to PROMETHEUS_MULTIPROC_DIR
+# (set in gunicorn.conf.py before the app is imported) and a scrape of any
+# worker sums them; gauges use "livesum" so dead workers drop out.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+if prometheus_client is not None:
+    REQUEST_LATENCY = prometheus_client.Histogram(
+        "quiply_http_request_duration_seconds", "Request latency by endpoint and status",
+        ["blueprint", "endpoint", "method", "status"], buckets=LATENCY_BUCKETS
+    )
+    IN_FLIGHT = prometheus_client.Gauge(
+        "quiply_http_requests_in_flight", "Requests being served", multiprocess_mode="livesum"
+    )
+    API_ERRORS = prometheus_client.Counter(
+        "quiply_api_errors_total", "Error responses by error_code", ["error_code", "status"]
+    )
+    POOL_CHECKED_OUT = prometheus_client.Gauge(
+        "quiply_db_pool_checked_out", "Connections checked out of the pool", ["bind"], multiprocess_mode="livesum"
+    )
+    POOL_OVERFLOW = prometheus_client.Gauge(
+        "quiply_db_pool_overflow", "Connections open beyond pool_size", ["bind"], multiprocess_mode="livesum"
+    )
+    POOL_WAIT = prometheus_client.Histogram(
+        "quiply_db_pool_wait_seconds", "Time spent acquiring a connection", ["bind"],
+        buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+    )
+    SHED = prometheus_client.Counter(
+        "quiply_requests_shed_total", "Requests refused by admission control", ["priority", "reason"]
+    )
+    QUEUE_DELAY = prometheus_client.Histogram(
+        "quiply_http_queue_delay_seconds", "Time between X-Request-Start and the app seeing the request",
+        buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+    )
+    CACHE_REQUESTS = prometheus_client.Counter(
+        "quiply_cache_requests_total", "Cache lookups by cache and result", ["cache", "result"]
+    )
+    CACHE_EVICTIONS = prometheus_client.Counter(
+        "quiply_cache_evictions_total", "Entries evicted from in-process LRUs", ["cache"]
+    )
+    CACHE_INVALIDATIONS = prometheus_client.Counter(
+        "quiply_cache_invalidations_total", "Response cache tag invalidations"
+    )
+    ADMISSION_DELAY = prometheus_client.Gauge(
+        "quiply_admission_delay_seconds", "Admission control estimates: queue delay and pool wait", ["signal"],
+        multiprocess_mode="livemax"
+    )
+
+
+class Metrics:
+    """Prometheus metrics for requests, the connection pools and the caches.
+
+    Hit ratios are derived in queries, e.g.
+    ``rate(quiply_cache_requests_total{result="hit"}[5m]) / rate(quiply_cache_requests_total[5m])``.
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.enabled = False
+        self._seen: dict[tuple[Any, tuple[str, ...]], int] = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        app.extensions["metrics"] = self
+        self.enabled = prometheus_client is not None and app.config.get("METRICS_ENABLED", True)
+        if not self.enabled:
+            return
+        from app import db
+        with app.app_context():
+            for key, engine in db.engines.items():
+                _instrument_engine(engine, key or "primary")
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.teardown_request(self._stop)
+
+    def render(self) -> tuple[bytes, str]:
+        if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+            registry = prometheus_client.CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = prometheus_client.REGISTRY
+        return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
+
+    def count_error(self, error_code: Optional[str], status_code: int) -> None:
+        if self.enabled:
+            API_ERRORS.labels(error_code or "UNKNOWN", str(status_code)).inc()
+
+    def count_shed(self, priority: str, reason: str) -> None:
+        if self.enabled:
+            SHED.labels(priority, reason).inc()
+
+    def observe_queue_delay(self, seconds: float) -> None:
+        if self.enabled:
+            QUEUE_DELAY.observe(seconds)
+
+    @staticmethod
+    def _start() -> None:
+        g.metrics_started = time.perf_counter()
+        IN_FLIGHT.inc()
+
+    def _finish(self, response: Any) -> Any:
+        started = g.get("metrics_started")
+        if started is not None and request.endpoint != "health.metrics_endpoint":
+            # Unmatched URLs share one label so scanners cannot blow up cardinality.
+            REQUEST_LATENCY.labels(
+                request.blueprint or "", request.endpoint or "<unmatched>", request.method, str(response.status_code)
+            ).observe(time.perf_counter() - started)
+        self._sync_caches()
+        return response
+
+    @staticmethod
+    def _stop(_: Optional[BaseException] = None) -> None:
+        if g.pop("metrics_started", None) is not None:
+            IN_FLIGHT.dec()
+
+    def _sync_caches(self) -> None:
+        # The caches keep plain per-process counters; publish what changed since the last request.
+        from app import cache, user_cache
+        counts = [
+            (CACHE_REQUESTS, ("response", "hit"), cache.hits),
+            (CACHE_REQUESTS, ("response", "miss"), cache.misses),
+            (CACHE_EVICTIONS, ("response",), cache.backend.evictions),
+            (CACHE_INVALIDATIONS, (), cache.invalidations),
+            (CACHE_REQUESTS, ("user", "hit"), user_cache.hits),
+            (CACHE_REQUESTS, ("user", "miss"), user_cache.misses),
+            (CACHE_EVICTIONS, ("user",), user_cache.backend.evictions),
+        ]
+        fragments = current_app.extensions.get("quip_fragments")
+        if fragments is not None:
+            counts.append((CACHE_REQUESTS, ("quip_fragments", "hit"), fragments.hits))
+            counts.append((CACHE_REQUESTS, ("quip_fragments", "miss"), fragments.misses))
+        with self._lock:
+            for counter, labels, value in counts:
+                key = (counter, labels)
+                delta = value - self._seen.get(key, 0)
+                if delta > 0:
+                    (counter.labels(*labels) if labels else counter).inc(delta)
+                    self._seen[key] = value
+        admission = current_app.extensions.get("admission")
+        if admission is not None and admission.enabled:
+            ADMISSION_DELAY.labels("queue_delay").set(admission.queue_delay.current())
+            ADMISSION_DELAY.labels("pool_wait").set(admission.pool_wait.current())
+
+
+def _instrument_engine(engine: Any, bind: str) -> None:
+    checked_out = POOL_CHECKED_OUT.labels(bind)
+    overflow = POOL_OVERFLOW.labels(bind)
+    wait = POOL_WAIT.labels(bind)
+
+    def update(returning: int) -> None:
+        # engine.pool, not the event's pool: dispose() swaps in a new one after fork.
+        pool = engine.pool
+        if hasattr(pool, "checkedout"):
+            checked_out.set(pool.checkedout() - returning)
+            overflow.set(max(pool.overflow(), 0))
+
+    # "checkin" fires before the connection is back in the pool.
+    event.listen(engine, "checkout", lambda *_: update(0))
+    event.listen(engine, "checkin", lambda *_: update(1))
+
+    # Every Connection acquires its DBAPI connection through raw_connection(),
+    # so timing it covers both waiting on a full pool and opening a new one.
+    raw_connection = engine.raw_connection
+
+    @wraps(raw_connection)
+    def timed_raw_connection() -> Any:
+        start = time.perf_counter()
+        try:
+            return raw_connection()
+        finally:
+            wait.observe(time.perf_counter() - start)
+
+    engine.raw_connection = timed_raw_connection
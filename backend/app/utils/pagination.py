@@ -0,0 +1,65 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Optional
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(*values: Any) -> str:
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise ValueError
+        return tuple(
+            datetime.fromisoformat(v) if t is datetime else t(v)
+            for t, v in zip(types, payload)
+        )
+    except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def keyset_page(query: Any, sort_column: Any, id_column: Any, per_page: int,
+                after: Optional[tuple] = None, offset: int = 0,
+                descending: bool = True) -> tuple[list, Optional[str]]:
+    """Fetch one page ordered by (sort_column, id_column), newest first by default.
+
+    ``after`` is a decoded cursor. ``sort_column`` and ``id_column`` are selected
+    alongside the entity to build ``next_cursor`` from the last row. ``offset``
+    only serves legacy ``page=`` requests; no COUNT query is issued either way.
+    """
+    if after:
+        sort_value, id_value = after
+        if descending:
+            query = query.filter(or_(
+                sort_column < sort_value,
+                and_(sort_column == sort_value, id_column < id_value)
+            ))
+        else:
+            query = query.filter(or_(
+                sort_column > sort_value,
+                and_(sort_column == sort_value, id_column > id_value)
+            ))
+
+    if descending:
+        ordering = (sort_column.desc(), id_column.desc())
+    else:
+        ordering = (sort_column.asc(), id_column.asc())
+
+    rows = query.add_columns(sort_column, id_column).order_by(
+        *ordering
+    ).offset(offset).limit(per_page + 1).all()
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(rows[-1][-2], rows[-1][-1])
+
+    return [row[0] for row in rows], next_cursor
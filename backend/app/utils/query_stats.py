@@ -0,0 +1,188 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Iterator, Optional
+from flask import Flask, current_app, g, request
+from sqlalchemy import event
+from app.utils.logger import get_logger, log_warning
+
+logger = get_logger("query_stats")
+
+_active: ContextVar[tuple["QueryStats", ...]] = ContextVar("query_stats", default=())
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryStats:
+    """SQL statements and timings collected while it is active."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.db_seconds = 0.0
+        self.statements: Counter = Counter()
+        self.timings: Counter = Counter()
+        self.started = time.perf_counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.db_seconds += seconds
+        self.statements[statement] += 1
+
+    def repeated(self, limit: int) -> list[tuple[str, int]]:
+        """Statements run more than ``limit`` times: the signature of an N+1 loop."""
+        return [(statement, count) for statement, count in self.statements.most_common() if count > limit]
+
+
+@contextmanager
+def collect_queries() -> Iterator[QueryStats]:
+    """Count the statements run inside the block (in this thread/context)."""
+    stats = QueryStats()
+    token = _active.set(_active.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active.reset(token)
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """Add the block's wall time to ``name`` in every active collector (e.g. ``serialize``)."""
+    collectors = _active.get()
+    if not collectors:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        for stats in collectors:
+            stats.timings[name] += elapsed
+
+
+def timed_function(name: str) -> Callable:
+    def decorator(fn: Callable) -> Callable:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timed(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def assert_constant_queries(fetch: Callable[[int], Any], sizes: tuple[int, ...] = (1, 10),
+                            setup: Optional[Callable[[int], Any]] = None) -> list[int]:
+    """Fail if the statements run by ``fetch(n)`` grow with ``n``.
+
+    ``fetch`` performs the operation for a result of ``n`` items, e.g. requests a
+    feed page; ``setup(n)``, if given, runs first and is not counted (e.g. seeds
+    ``n`` quips). Returns the count for each size.
+    """
+    counts = []
+    for size in sizes:
+        if setup is not None:
+            setup(size)
+        with collect_queries() as stats:
+            fetch(size)
+        counts.append(stats.count)
+    if len(set(counts)) > 1:
+        raise QueryBudgetExceeded(f"Query count grows with result size: {dict(zip(sizes, counts))}")
+    return counts
+
+
+class QueryAccounting:
+    """Per-request SQL accounting.
+
+    Every statement's count and duration is recorded via engine events. Responses
+    carry a ``Server-Timing`` header (``db``, ``serialize``, ``total``). Requests
+    over ``QUERY_BUDGET`` statements, or repeating one statement more than
+    ``QUERY_REPEAT_LIMIT`` times, are logged; with ``QUERY_STRICT`` they fail
+    with ``QueryBudgetExceeded`` instead.
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        app.extensions["query_accounting"] = self
+        if not app.config.get("QUERY_ACCOUNTING_ENABLED", True):
+            return
+        from app import db
+        with app.app_context():
+            for engine in db.engines.values():
+                event.listen(engine, "before_cursor_execute", _before_execute)
+                event.listen(engine, "after_cursor_execute", _after_execute)
+                event.listen(engine, "handle_error", _on_error)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.teardown_request(self._stop)
+
+    @staticmethod
+    def _start() -> None:
+        stats = QueryStats()
+        g.query_stats = stats
+        g.query_stats_token = _active.set(_active.get() + (stats,))
+
+    @staticmethod
+    def _finish(response: Any) -> Any:
+        # Popped so the error response of a strict-mode failure is not checked again.
+        stats: Optional[QueryStats] = g.pop("query_stats", None)
+        if stats is None:
+            return response
+        config = current_app.config
+        total = time.perf_counter() - stats.started
+
+        if config.get("SERVER_TIMING", True):
+            response.headers["Server-Timing"] = ", ".join([
+                f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.count} queries"',
+                f"serialize;dur={stats.timings['serialize'] * 1000:.1f}",
+                f"total;dur={total * 1000:.1f}"
+            ])
+
+        budget = config.get("QUERY_BUDGET", 15)
+        repeated = stats.repeated(config.get("QUERY_REPEAT_LIMIT", 5))
+        if stats.count > budget or repeated:
+            context = {
+                "endpoint": request.endpoint,
+                "queries": stats.count,
+                "budget": budget,
+                "db_ms": round(stats.db_seconds * 1000, 1),
+                "repeated": [{"statement": statement[:200], "count": count} for statement, count in repeated[:3]]
+            }
+            if config.get("QUERY_STRICT", False):
+                raise QueryBudgetExceeded(f"{request.endpoint} exceeded its query budget: {context}")
+            log_warning(logger, "Query budget exceeded", context)
+        return response
+
+    @staticmethod
+    def _stop(_: Optional[BaseException] = None) -> None:
+        token = g.pop("query_stats_token", None)
+        if token is not None:
+            _active.reset(token)
+
+
+def _before_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    if _active.get():
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    collectors = _active.get()
+    started = conn.info.get("query_started")
+    if not collectors or not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    for stats in collectors:
+        stats.record(statement, elapsed)
+
+
+def _on_error(context: Any) -> None:
+    # A failed statement never reaches after_cursor_execute; drop its start time.
+    started = context.connection.info.get("query_started") if context.connection is not None else None
+    if started:
+        started.pop()
@@ -0,0 +1,189 @@
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+from flask import Flask, Response, g, request
+from app.utils.db_routing import SAFE_METHODS
+from app.utils.errors import RateLimitError
+from app.utils.viewer import optional_identity
+from app.utils.logger import get_logger, log_warning
+
+try:
+    import redis
+except ImportError:  # optional: RATE_LIMIT_BACKEND=redis falls back to memory
+    redis = None
+
+logger = get_logger("rate_limit")
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+UNLIMITED = "unlimited"
+_LIMIT = re.compile(r"^\s*(\d+)\s*/\s*(second|minute|hour|day)s?\s*$")
+
+
+class Limit:
+    """``capacity`` requests per ``period`` seconds: bursts up to capacity, refilled evenly."""
+
+    def __init__(self, capacity: int, period: int):
+        self.capacity = capacity
+        self.period = period
+        self.rate = capacity / period
+
+    @classmethod
+    def parse(cls, spec: str) -> "Limit":
+        match = _LIMIT.match(spec)
+        if match is None:
+            raise ValueError(f"Invalid rate limit {spec!r}; expected e.g. '10/minute'")
+        return cls(int(match.group(1)), PERIODS[match.group(2)])
+
+    def wait(self, tokens: float) -> int:
+        """Whole seconds until a bucket holding ``tokens`` can serve one more request."""
+        return max(1, math.ceil((1 - tokens) / self.rate))
+
+    @property
+    def policy(self) -> str:
+        return f"{self.capacity};w={self.period}"
+
+
+class MemoryBackend:
+    """Buckets in this process only: each gunicorn worker enforces the limit on its own."""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: int, rate: float, cost: int = 1) -> tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                # The least recently seen bucket has refilled the longest.
+                self._buckets.popitem(last=False)
+            return allowed, tokens
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class RedisBackend:
+    """Buckets shared by every worker; the refill-and-take runs atomically in Redis."""
+
+    SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "updated")
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "updated", tostring(now))
+redis.call("EXPIRE", KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+    def __init__(self, client: Any, prefix: str = "quiply:ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(self.SCRIPT)
+
+    def take(self, key: str, capacity: int, rate: float, cost: int = 1) -> tuple[bool, float]:
+        allowed, tokens = self._script(keys=[self.prefix + key], args=[capacity, rate, time.time(), cost])
+        return bool(allowed), float(tokens)
+
+    def clear(self) -> None:
+        pass
+
+
+class RateLimiter:
+    """Token buckets for state-changing requests.
+
+    ``RATE_LIMITS`` maps an endpoint (``"auth.login"``) or a whole blueprint
+    (``"quips"``) to a limit such as ``"10/minute"``; the endpoint entry wins.
+    ``"unlimited"`` exempts an endpoint from its blueprint's limit, e.g. a read
+    that is a POST only to carry a body.
+    Callers are told apart by JWT identity, anonymous ones by remote address.
+    If the backend fails, requests are let through.
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.backend: Any = None
+        self.rules: dict[str, Optional[Limit]] = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask, backend: Any = None) -> None:
+        app.extensions["rate_limiter"] = self
+        self.rules = {
+            scope: None if spec.strip() == UNLIMITED else Limit.parse(spec)
+            for scope, spec in app.config.get("RATE_LIMITS", {}).items()
+        }
+        if not app.config.get("RATE_LIMIT_ENABLED", True) or not any(self.rules.values()):
+            self.backend = None
+            return
+        self.backend = backend or self._create_backend(app)
+        app.before_request(self._check)
+        app.after_request(self._set_headers)
+
+    def rule_for(self, endpoint: Optional[str], blueprint: Optional[str]) -> Optional[tuple[str, Limit]]:
+        for scope in (endpoint, blueprint):
+            if scope and scope in self.rules:
+                limit = self.rules[scope]
+                return (scope, limit) if limit is not None else None
+        return None
+
+    def _check(self) -> None:
+        if request.method in SAFE_METHODS:
+            return
+        rule = self.rule_for(request.endpoint, request.blueprint)
+        if rule is None:
+            return
+        scope, limit = rule
+        user_id = optional_identity()
+        caller = f"user:{user_id}" if user_id is not None else f"ip:{request.remote_addr}"
+        try:
+            allowed, tokens = self.backend.take(f"{scope}:{caller}", limit.capacity, limit.rate)
+        except Exception as e:
+            log_warning(logger, "Rate limit backend unavailable", {"error": str(e)})
+            return
+
+        g.rate_limit = (limit, tokens)
+        if not allowed:
+            raise RateLimitError(retry_after=limit.wait(tokens))
+
+    @staticmethod
+    def _set_headers(response: Response) -> Response:
+        state = g.pop("rate_limit", None)
+        if state is None:
+            return response
+        limit, tokens = state
+        response.headers["RateLimit-Limit"] = str(limit.capacity)
+        response.headers["RateLimit-Remaining"] = str(int(tokens))
+        response.headers["RateLimit-Reset"] = str(math.ceil((limit.capacity - tokens) / limit.rate))
+        response.headers["RateLimit-Policy"] = limit.policy
+        if response.status_code == 429:
+            response.headers["Retry-After"] = str(limit.wait(tokens))
+        return response
+
+    @staticmethod
+    def _create_backend(app: Flask) -> Any:
+        if app.config.get("RATE_LIMIT_BACKEND", "memory") == "redis":
+            if redis is None:
+                log_warning(logger, "redis is not installed, rate limits fall back to per-process buckets")
+                return MemoryBackend(app.config.get("RATE_LIMIT_MAX_KEYS", 100000))
+            return RedisBackend(redis.Redis.from_url(app.config["RATE_LIMIT_REDIS_URL"]))
+        return MemoryBackend(app.config.get("RATE_LIMIT_MAX_KEYS", 100000))
@@ -1,17 +1,48 @@
-from typing import Any, Dict, Optional, Tuple
-from flask import jsonify, Response
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+from flask import current_app, jsonify, request, Response
+from werkzeug.http import is_resource_modified
+from app.utils.query_stats import timed
+
+
+def make_etag(*parts: Any) -> str:
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+
+def list_etag(rows: Iterable[Any], *extra: Any) -> str:
+    """ETag for a page of rows. Lists get no Last-Modified: a row leaving the
+    page does not move the newest ``updated_at``, so If-Modified-Since would 304."""
+    return make_etag([(row.id, row.updated_at) for row in rows], *extra)
 
 
 class APIResponse:
     @staticmethod
-    def success(data: Any = None, message: Optional[str] = None, status_code: int = 200) -> Tuple[Response, int]:
+    def success(data: Any = None, message: Optional[str] = None, status_code: int = 200,
+                meta: Optional[Dict[str, Any]] = None, etag: Optional[str] = None,
+                last_modified: Optional[datetime] = None, private: bool = False) -> Tuple[Response, int]:
         response: Dict[str, Any] = {"success": True}
         if data is not None:
             response["data"] = data
+        if meta is not None:
+            response["meta"] = meta
         if message:
             response["message"] = message
-        return jsonify(response), status_code
-    
+        with timed("serialize"):
+            resp = jsonify(response)
+        if etag is not None:
+            APIResponse._set_validators(resp, etag, last_modified, private)
+        return resp, status_code
+
+    @staticmethod
+    def not_modified(etag: str, last_modified: Optional[datetime] = None,
+                     private: bool = False) -> Optional[Tuple[Response, int]]:
+        if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+            return None
+        resp = Response(status=304)
+        APIResponse._set_validators(resp, etag, last_modified, private)
+        return resp, 304
+
     @staticmethod
     def error(message: str, status_code: int, error_code: Optional[str] = None, details: Optional[Dict] = None) -> Tuple[Response, int]:
         response: Dict[str, Any] = {"success": False, "message": message}
@@ -20,3 +51,16 @@ class APIResponse:
         if details:
             response["details"] = details
         return jsonify(response), status_code
+
+    @staticmethod
+    def _set_validators(resp: Response, etag: str, last_modified: Optional[datetime],
+                        private: bool = False) -> None:
+        resp.set_etag(etag)
+        if last_modified is not None:
+            resp.last_modified = last_modified
+        if private:
+            resp.cache_control.private = True
+        else:
+            resp.cache_control.public = True
+        resp.cache_control.max_age = current_app.config.get("HTTP_CACHE_MAX_AGE", 0)
+        resp.cache_control.must_revalidate = True
@@ -0,0 +1,234 @@
+import hashlib
+import random
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Optional
+from flask import Flask, Response, g, has_request_context, request
+from sqlalchemy import event
+from app.utils.logger import get_logger, log_warning
+
+logger = get_logger("slow_queries")
+
+_WHITESPACE = re.compile(r"\s+")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LISTS = re.compile(r"\(\s*(?:\?|%\(\w+\)s|%s|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|%s|:\w+))*\s*\)")
+_WRITES = re.compile(r"\b(?:INSERT|UPDATE|DELETE|MERGE)\b", re.IGNORECASE)
+
+EXPLAIN_PREFIX = {
+    "postgresql": "EXPLAIN (ANALYZE, BUFFERS, FORMAT TEXT) ",
+    "sqlite": "EXPLAIN QUERY PLAN ",
+}
+
+
+def normalize(statement: str) -> str:
+    """Statement with literals and IN-list lengths erased, so variants group together."""
+    statement = _LITERALS.sub("?", statement)
+    statement = _PLACEHOLDER_LISTS.sub("(...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def is_read_only(normalized: str) -> bool:
+    """SELECTs and ``WITH`` queries without data-modifying CTEs: safe to run again under ANALYZE."""
+    head = normalized[:4].upper()
+    if head == "SELE":
+        return normalized[:6].upper() == "SELECT"
+    return head == "WITH" and _WRITES.search(normalized) is None
+
+
+def fingerprint(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> Any:
+    """Types of the bound parameters, never their values (they may hold credentials)."""
+    if executemany:
+        rows = list(parameters)
+        return {"rows": len(rows), "row": parameter_shape(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+class SlowQuery:
+    def __init__(self, fingerprint: str, statement: str):
+        self.fingerprint = fingerprint
+        self.statement = statement
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.endpoints: Counter = Counter()
+        self.parameters: Any = None
+        self.plan: Optional[str] = None
+        self.plan_ms: Optional[float] = None
+        self.last_seen = 0.0
+        self.last_logged = 0.0
+        self.unlogged = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "fingerprint": self.fingerprint,
+            "statement": self.statement,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 1),
+            "mean_ms": round(self.total_ms / self.count, 1) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 1),
+            "endpoints": dict(self.endpoints.most_common(5)),
+            "parameters": self.parameters,
+            "plan": self.plan,
+            "plan_ms": self.plan_ms,
+            "last_seen": self.last_seen
+        }
+
+
+class SlowQueryLog:
+    """Opt-in log of statements slower than ``SLOW_QUERY_THRESHOLD_MS``.
+
+    Statements are grouped by fingerprint (the statement with literals and
+    IN-list lengths erased). A fingerprint is logged when first seen and then
+    at most once per ``SLOW_QUERY_LOG_INTERVAL`` seconds with the count since.
+    Slow read-only statements (SELECT, WITH without writes) capture their plan
+    the first time and then for a ``SLOW_QUERY_EXPLAIN_SAMPLE_RATE`` share of
+    runs. ANALYZE runs the statement again, so inside a request that happens on
+    a separate connection once the response has been sent. The aggregate is
+    kept per process for ``report()``.
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.enabled = False
+        self.threshold = 0.2
+        self.explain_rate = 0.0
+        self.log_interval = 60.0
+        self.max_entries = 500
+        self._entries: "OrderedDict[str, SlowQuery]" = OrderedDict()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        app.extensions["slow_queries"] = self
+        self.enabled = app.config.get("SLOW_QUERY_LOG_ENABLED", False)
+        if not self.enabled:
+            return
+        self.threshold = app.config.get("SLOW_QUERY_THRESHOLD_MS", 200) / 1000
+        self.explain_rate = app.config.get("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 0.1)
+        self.log_interval = app.config.get("SLOW_QUERY_LOG_INTERVAL", 60)
+        self.max_entries = app.config.get("SLOW_QUERY_MAX_FINGERPRINTS", 500)
+        from app import db
+        with app.app_context():
+            for engine in db.engines.values():
+                event.listen(engine, "before_cursor_execute", _before_execute)
+                event.listen(engine, "after_cursor_execute", self._after_execute)
+                event.listen(engine, "handle_error", _on_error)
+        app.after_request(self._schedule_explains)
+
+    def report(self, limit: int = 50) -> list[dict[str, Any]]:
+        with self._lock:
+            entries = sorted(self._entries.values(), key=lambda entry: entry.total_ms, reverse=True)
+            return [entry.as_dict() for entry in entries[:limit]]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _after_execute(self, conn: Any, cursor: Any, statement: str, parameters: Any,
+                       context: Any, executemany: bool) -> None:
+        started = conn.info.get("slow_query_started")
+        if not started:
+            return
+        elapsed = time.perf_counter() - started.pop()
+        if elapsed < self.threshold:
+            return
+
+        normalized = normalize(statement)
+        key = fingerprint(normalized)
+        endpoint = request.endpoint if has_request_context() else None
+        now = time.time()
+        plan_wanted = False
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = SlowQuery(key, normalized)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            self._entries.move_to_end(key)
+            entry.count += 1
+            entry.total_ms += elapsed * 1000
+            entry.max_ms = max(entry.max_ms, elapsed * 1000)
+            entry.endpoints[endpoint or "<no request>"] += 1
+            entry.parameters = parameter_shape(parameters, executemany)
+            entry.last_seen = now
+            entry.unlogged += 1
+            if not executemany and is_read_only(normalized):
+                plan_wanted = entry.plan is None or random.random() < self.explain_rate
+            should_log = now - entry.last_logged >= self.log_interval
+            if should_log:
+                entry.last_logged = now
+                occurrences, entry.unlogged = entry.unlogged, 0
+
+        if plan_wanted:
+            job = (conn.engine, statement, parameters, entry, round(elapsed * 1000, 1))
+            if has_request_context():
+                g.setdefault("slow_query_explains", []).append(job)
+            else:
+                self._explain_all([job])
+        if should_log:
+            log_warning(logger, "Slow query", {
+                "fingerprint": key,
+                "statement": normalized[:1000],
+                "duration_ms": round(elapsed * 1000, 1),
+                "occurrences": occurrences,
+                "endpoint": endpoint,
+                "parameters": entry.parameters,
+                "plan": entry.plan
+            })
+
+
+    def _schedule_explains(self, response: Response) -> Response:
+        jobs = g.pop("slow_query_explains", None)
+        if jobs:
+            response.call_on_close(lambda: self._explain_all(jobs))
+        return response
+
+    @staticmethod
+    def _explain_all(jobs: list[tuple[Any, str, Any, SlowQuery, float]]) -> None:
+        for engine, statement, parameters, entry, elapsed_ms in jobs:
+            plan = _explain(engine, statement, parameters)
+            if plan is not None:
+                entry.plan, entry.plan_ms = plan, elapsed_ms
+
+
+def _explain(engine: Any, statement: str, parameters: Any) -> Optional[str]:
+    prefix = EXPLAIN_PREFIX.get(engine.dialect.name)
+    if prefix is None:
+        return None
+    # A raw DBAPI connection of its own keeps EXPLAIN out of the event hooks, the
+    # query counts and the caller's transaction; it is always rolled back.
+    try:
+        connection = engine.raw_connection()
+    except Exception as e:
+        return f"EXPLAIN failed: {e}"
+    try:
+        explain = connection.cursor()
+        explain.execute(prefix + statement, parameters)
+        return "\n".join(" ".join(str(column) for column in row) for row in explain.fetchall())
+    except Exception as e:
+        return f"EXPLAIN failed: {e}"
+    finally:
+        try:
+            connection.rollback()
+        finally:
+            connection.close()
+
+
+def _before_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+
+def _on_error(context: Any) -> None:
+    started = context.connection.info.get("slow_query_started") if context.connection is not None else None
+    if started:
+        started.pop()
@@ -0,0 +1,43 @@
+import re
+from typing import Any, Optional
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from app import db
+
+
+def dialect_name() -> str:
+    return db.session.get_bind().dialect.name
+
+
+def insert_ignoring_conflicts(model: Any) -> Any:
+    """``INSERT ... ON CONFLICT DO NOTHING`` for the dialect of the current session.
+
+    Combine with ``.returning(...)``: an empty result means the row already existed
+    (or the ``from_select`` source matched nothing), without a prior SELECT.
+    """
+    insert = postgresql.insert if dialect_name() == "postgresql" else sqlite.insert
+    return insert(model).on_conflict_do_nothing()
+
+
+def violated_column(error: IntegrityError, *columns: str) -> Optional[str]:
+    """Which of ``columns`` a unique violation is about, or ``None``.
+
+    Read from the constraint and the key list only: the message also carries
+    the offending value, which may contain another column's name.
+    """
+    diag = getattr(error.orig, "diag", None)
+    if diag is not None:
+        # psycopg2: constraint "ix_users_email" / "users_email_key", detail "Key (email)=(...)".
+        constraint = diag.constraint_name or ""
+        for column in columns:
+            if constraint.endswith(f"_{column}") or f"_{column}_" in constraint:
+                return column
+        match = re.match(r"Key \(([^)]*)\)=", diag.message_detail or "")
+    else:
+        # sqlite: "UNIQUE constraint failed: users.email"
+        match = re.search(r"constraint failed: ([\w., ]+)$", str(error.orig))
+    named = {name.strip().rpartition(".")[2] for name in match.group(1).split(",")} if match else set()
+    for column in columns:
+        if column in named:
+            return column
+    return None
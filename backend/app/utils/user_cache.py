@@ -0,0 +1,127 @@
+import json
+from typing import Any, Iterable, Optional
+from flask import Flask
+from app.utils.cache import MemoryBackend, NullBackend, RedisBackend, redis
+from app.utils.logger import get_logger, log_warning
+
+logger = get_logger("cache")
+
+
+class UserCache:
+    """User id -> hot profile fields and username -> id.
+
+    Usernames never change, so entries only go stale when a profile is edited or
+    a username that was looked up and not found gets registered;
+    ``AuthService`` calls ``invalidate`` for both. "No such user" is kept for
+    ``USER_CACHE_NEGATIVE_TTL`` only. With the per-worker ``memory`` backend
+    other workers can show an edited bio for up to ``USER_CACHE_TTL`` seconds;
+    ``redis`` shares entries, and invalidations, between workers.
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.backend: Any = NullBackend()
+        self.ttl = 60
+        self.negative_ttl = 5
+        self.hits = 0
+        self.misses = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask, backend: Any = None) -> None:
+        self.ttl = app.config.get("USER_CACHE_TTL", 60)
+        self.negative_ttl = app.config.get("USER_CACHE_NEGATIVE_TTL", 5)
+        self.backend = backend or self._create_backend(app)
+        app.extensions["user_cache"] = self
+
+    def get(self, user_id: int) -> Optional[dict[str, Any]]:
+        cached = self._get(f"id:{user_id}")
+        if cached is not None:
+            return cached
+        rows = self._load([user_id])
+        return rows[0] if rows else None
+
+    def id_for(self, username: str) -> Optional[int]:
+        cached = self._get(f"name:{username}")
+        if cached is not None:
+            return cached["id"]
+        from app import db
+        from app.models import User
+        user_id = db.session.query(User.id).filter(User.username == username).scalar()
+        if user_id is None:
+            self._set(f"name:{username}", {"id": None}, [f"username:{username}"], self.negative_ttl)
+        else:
+            self._set(f"name:{username}", {"id": user_id}, [f"user:{user_id}", f"username:{username}"])
+        return user_id
+
+    def usernames(self, user_ids: Iterable[int]) -> dict[int, str]:
+        found: dict[int, str] = {}
+        missing = []
+        for user_id in set(user_ids):
+            cached = self._get(f"id:{user_id}")
+            if cached is None:
+                missing.append(user_id)
+            else:
+                found[user_id] = cached["username"]
+        for fields in self._load(missing) if missing else []:
+            found[fields["id"]] = fields["username"]
+        return found
+
+    def remember(self, user: Any) -> dict[str, Any]:
+        fields = {
+            "id": user.id,
+            "username": user.username,
+            "email": user.email,
+            "bio": user.bio,
+            "created_at": user.created_at.isoformat()
+        }
+        self._set(f"id:{user.id}", fields, [f"user:{user.id}"])
+        self._set(f"name:{user.username}", {"id": user.id}, [f"user:{user.id}", f"username:{user.username}"])
+        return fields
+
+    def invalidate(self, user_id: Optional[int] = None, username: Optional[str] = None) -> None:
+        tags = ([f"user:{user_id}"] if user_id is not None else []) + ([f"username:{username}"] if username else [])
+        try:
+            self.backend.invalidate(tags)
+        except Exception:
+            pass
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def _load(self, user_ids: list[int]) -> list[dict[str, Any]]:
+        # Only the cached columns: the full row would also drag in the counters and the password hash.
+        from app import db
+        from app.models import User
+        rows = db.session.query(User.id, User.username, User.email, User.bio, User.created_at).filter(
+            User.id.in_(user_ids)
+        ).all()
+        return [self.remember(row) for row in rows]
+
+    def _get(self, key: str) -> Optional[dict[str, Any]]:
+        try:
+            value = self.backend.get(key)
+        except Exception:
+            value = None
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(value)
+
+    def _set(self, key: str, value: dict[str, Any], tags: list[str], ttl: Optional[int] = None) -> None:
+        try:
+            self.backend.set(key, json.dumps(value).encode("utf-8"), ttl or self.ttl, tags)
+        except Exception:
+            pass
+
+    @staticmethod
+    def _create_backend(app: Flask) -> Any:
+        kind = app.config.get("USER_CACHE_BACKEND", "memory")
+        if kind == "redis" and redis is None:
+            log_warning(logger, "redis is not installed, user cache falls back to memory")
+            kind = "memory"
+        if kind == "memory":
+            return MemoryBackend(app.config.get("USER_CACHE_MAX_ENTRIES", 50000))
+        if kind == "redis":
+            return RedisBackend(redis.Redis.from_url(app.config["CACHE_REDIS_URL"]), prefix="quiply:users:")
+        return NullBackend()
@@ -0,0 +1,26 @@
+from typing import Optional
+from flask import request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+
+def viewer_state_requested() -> Optional[int]:
+    """Viewer id when a listing asks for ``include=viewer_state`` with a valid token.
+
+    Anonymous requests get the shared response without flags, so this doubles as
+    the ``unless`` predicate for ``cached_response``.
+    """
+    if "viewer_state" not in request.args.get("include", "").split(","):
+        return None
+    verify_jwt_in_request(optional=True)
+    identity = get_jwt_identity()
+    return int(identity) if identity is not None else None
+
+
+def optional_identity() -> Optional[int]:
+    """Caller's user id from a valid token, else ``None``; bad tokens are treated as anonymous."""
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+    except Exception:
+        return None
+    return int(identity) if identity is not None else None
@@ -0,0 +1,128 @@
+"""Concurrent feed reads: gunicorn ``sync`` workers vs ``gthread`` workers.
+
+Seeds a local database, then serves the app with gunicorn twice, once per
+worker class and with the same number of workers, and fires ``--requests``
+``GET /api/v1/quips`` from ``--concurrency`` client threads. The response cache
+is disabled so every request reaches the database. ``--db-latency-ms`` adds a
+sleep before every statement to stand in for the network round trip to
+Postgres, which a local SQLite file does not have.
+
+    python benchmarks/concurrent_feed.py [--workers 4] [--threads 8] [--concurrency 64]
+        [--requests 2000] [--db-latency-ms 2] [--database-url sqlite:////tmp/feed.db]
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+
+def serve():
+    """gunicorn entry point: the app with the simulated statement latency."""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    from app import create_app
+
+    latency = float(os.getenv("BENCH_DB_LATENCY_MS", 0)) / 1000
+    if latency:
+        event.listen(Engine, "before_cursor_execute", lambda *_: time.sleep(latency))
+    return create_app(os.getenv("FLASK_ENV", "production"))
+
+
+def seed(database_url: str, quips: int) -> None:
+    os.environ["DATABASE_URL"] = database_url  # read by config on import
+    from app import create_app, db
+    from app.models import Quip, User
+
+    app = create_app("production")
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        users = [User(username=f"bench_user_{i}", email=f"bench{i}@example.com", password_hash="x")
+                 for i in range(50)]
+        db.session.add_all(users)
+        db.session.flush()
+        db.session.add_all(Quip(user_id=users[i % len(users)].id, content=f"quip {i}",
+                                definition="benchmark", quip_ups_count=i % 17) for i in range(quips))
+        db.session.commit()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run(worker_class: str, args: argparse.Namespace, env: dict) -> tuple[float, list[float]]:
+    port = free_port()
+    env = dict(env, GUNICORN_BIND=f"127.0.0.1:{port}", GUNICORN_WORKER_CLASS=worker_class,
+               GUNICORN_WORKERS=str(args.workers), GUNICORN_THREADS=str(args.threads))
+    env.pop("DB_POOL_SIZE", None)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py", "benchmarks.concurrent_feed:serve()"],
+        cwd=BACKEND, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base = f"http://127.0.0.1:{port}/api/v1"
+    try:
+        for _ in range(100):
+            try:
+                urllib.request.urlopen(f"{base}/health", timeout=1).read()
+                break
+            except OSError:
+                time.sleep(0.1)
+        else:
+            raise RuntimeError(f"gunicorn ({worker_class}) did not start")
+
+        def fetch(i: int) -> float:
+            start = time.perf_counter()
+            with urllib.request.urlopen(f"{base}/quips?sort=new&page={i % 5 + 1}", timeout=60) as response:
+                response.read()
+            return time.perf_counter() - start
+
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            list(pool.map(fetch, range(args.concurrency)))  # warm-up: connections, imports
+            start = time.perf_counter()
+            latencies = list(pool.map(fetch, range(args.requests)))
+            elapsed = time.perf_counter() - start
+        return elapsed, latencies
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--quips", type=int, default=2000)
+    parser.add_argument("--db-latency-ms", type=float, default=2.0)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    database_url = args.database_url or f"sqlite:///{os.path.join(workdir, 'feed.db')}"
+    seed(database_url, args.quips)
+
+    env = dict(os.environ, DATABASE_URL=database_url, FLASK_ENV="production", CACHE_BACKEND="null",
+               LOG_LEVEL="WARNING", LOG_DIR=workdir, BENCH_DB_LATENCY_MS=str(args.db_latency_ms))
+    print(f"{args.requests} feed reads, {args.concurrency} clients, {args.workers} workers, "
+          f"+{args.db_latency_ms} ms per statement")
+    for label, worker_class in (("sync", "sync"), (f"gthread x{args.threads}", "gthread")):
+        elapsed, latencies = run(worker_class, args, env)
+        quantiles = statistics.quantiles(latencies, n=100)
+        print(f"{label:<12} {args.requests / elapsed:8.1f} req/s   p50 {quantiles[49] * 1000:7.1f} ms   "
+              f"p99 {quantiles[98] * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
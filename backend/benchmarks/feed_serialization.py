@@ -0,0 +1,73 @@
+"""Serialization cost of one feed page: Flask's JSON provider vs orjson vs orjson with
+cached quip fragments.
+
+Loads ``--per-page`` quips once, then times ``QuipSerializer.serialize_many`` plus
+``APIResponse.success`` (author lookup, dict building and JSON encoding) per page
+inside a request context. The fragment cache is warm, as it is for a hot feed.
+
+    python benchmarks/feed_serialization.py [--pages 2000] [--per-page 20]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+
+def run(pages: int, per_page: int, **config) -> float:
+    from app import create_app, db
+    from app.models import Quip, User
+    from app.serializers import QuipSerializer
+    from app.utils.json_provider import init_json
+    from app.utils.response import APIResponse
+
+    app = create_app("production")
+    app.config.update(config)
+    app.extensions.pop("quip_fragments", None)
+    app.json = app.json_provider_class(app)
+    init_json(app)
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        users = [User(username=f"bench_user_{i}", email=f"bench{i}@example.com", password_hash="x")
+                 for i in range(per_page)]
+        db.session.add_all(users)
+        db.session.flush()
+        db.session.add_all(Quip(user_id=user.id, content="a reasonably long quip " * 6,
+                                definition="what it means " * 4, usage_examples="use it like this " * 4)
+                           for user in users)
+        db.session.commit()
+        quips = Quip.query.all()
+
+        with app.test_request_context("/api/v1/quips"):
+            APIResponse.success(data=QuipSerializer.serialize_many(quips))  # warm-up
+            start = time.perf_counter()
+            for _ in range(pages):
+                response, _ = APIResponse.success(data=QuipSerializer.serialize_many(quips),
+                                                  meta={"page": 1, "per_page": per_page})
+                response.get_data()
+            elapsed = time.perf_counter() - start
+    return elapsed / pages * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--per-page", type=int, default=20)
+    args = parser.parse_args()
+
+    results = [
+        ("default", run(args.pages, args.per_page, JSON_PROVIDER="default")),
+        ("orjson", run(args.pages, args.per_page, JSON_PROVIDER="orjson", QUIP_FRAGMENT_CACHE_SIZE=0)),
+        ("orjson+fragments", run(args.pages, args.per_page, JSON_PROVIDER="orjson")),
+    ]
+    baseline = results[0][1]
+    for label, per_page in results:
+        print(f"{label:<18} {per_page:8.1f} us/page  ({baseline / per_page:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
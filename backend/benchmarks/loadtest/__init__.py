@@ -0,0 +1,14 @@
+"""End-to-end load test for the Quiply API.
+
+Run from ``backend/``::
+
+    python -m benchmarks.loadtest seed [--users 100000] [--quips 1000000] [--reset]
+    python -m benchmarks.loadtest run --scenario mixed --duration 60 --concurrency 16 [--url http://127.0.0.1:5000]
+    python -m benchmarks.loadtest compare before.json after.json
+
+``seed`` fills ``DATABASE_URL`` with a synthetic data set (Zipf-distributed
+authorship, engagement and follows, deep comment threads) and writes a manifest
+that ``run`` reads to pick realistic targets. ``run`` drives the app in-process
+through the Flask test client, or a live server with ``--url``, and saves
+per-endpoint throughput and latency percentiles to JSON.
+"""
@@ -0,0 +1,101 @@
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+DEFAULT_MANIFEST = "loadtest-dataset.json"
+
+
+def seed_command(args: argparse.Namespace) -> None:
+    from app import create_app
+    from benchmarks.loadtest.seed import save_manifest, seed
+
+    app = create_app(os.getenv("FLASK_ENV", "production"))
+    with app.app_context():
+        manifest = seed(args.users, args.quips, days=args.days, ups_per_quip=args.ups_per_quip,
+                        comments_per_quip=args.comments_per_quip, reposts_per_quip=args.reposts_per_quip,
+                        follows_per_user=args.follows_per_user, reset=args.reset, rng_seed=args.seed)
+    save_manifest(manifest, args.manifest)
+    print(f"Seeded in {manifest['seconds']}s; manifest written to {args.manifest}")
+
+
+def run_command(args: argparse.Namespace) -> None:
+    from benchmarks.loadtest import runner
+    from benchmarks.loadtest.scenarios import AUTHENTICATED, SCENARIOS
+
+    with open(args.manifest) as f:
+        manifest = json.load(f)
+
+    if args.url:
+        mode = f"http {args.url}"
+        make_client = lambda: runner.HttpClient(args.url)  # noqa: E731
+    else:
+        # Every simulated user shares one address; measure the app, not the limiter.
+        os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+        from app import create_app
+        mode = "in-process"
+        app = create_app(os.getenv("FLASK_ENV", "production"))
+        make_client = lambda: runner.InProcessClient(app)  # noqa: E731
+
+    elapsed, samples = runner.run(SCENARIOS[args.scenario], make_client, manifest, args.duration,
+                                  args.concurrency, args.scenario in AUTHENTICATED, rng_seed=args.seed)
+    result = runner.report(args.scenario, mode, elapsed, samples, manifest, {
+        "duration": args.duration, "concurrency": args.concurrency, "seed": args.seed
+    })
+    runner.print_report(result)
+
+    out = args.out or f"loadtest-{(result['commit'] or 'unknown')[:10]}-{args.scenario}.json"
+    with open(out, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"Results written to {out}")
+
+
+def compare_command(args: argparse.Namespace) -> None:
+    from benchmarks.loadtest.runner import compare
+
+    with open(args.before) as before, open(args.after) as after:
+        compare(json.load(before), json.load(after))
+
+
+def main() -> None:
+    from benchmarks.loadtest.scenarios import SCENARIOS
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadtest")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed = commands.add_parser("seed", help="Fill DATABASE_URL with a synthetic data set")
+    seed.add_argument("--users", type=int, default=100_000)
+    seed.add_argument("--quips", type=int, default=1_000_000)
+    seed.add_argument("--days", type=int, default=30, help="Quips are spread over this many days")
+    seed.add_argument("--ups-per-quip", type=float, default=4.0)
+    seed.add_argument("--comments-per-quip", type=float, default=1.5)
+    seed.add_argument("--reposts-per-quip", type=float, default=0.5)
+    seed.add_argument("--follows-per-user", type=float, default=25.0)
+    seed.add_argument("--seed", type=int, default=42)
+    seed.add_argument("--reset", action="store_true", help="Drop and recreate all tables first")
+    seed.add_argument("--manifest", default=DEFAULT_MANIFEST)
+    seed.set_defaults(handler=seed_command)
+
+    run = commands.add_parser("run", help="Drive a scenario and report per-endpoint latency")
+    run.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    run.add_argument("--duration", type=float, default=30.0, help="Seconds")
+    run.add_argument("--concurrency", type=int, default=8)
+    run.add_argument("--url", default=None, help="Base URL of a running server; in-process if omitted")
+    run.add_argument("--seed", type=int, default=1)
+    run.add_argument("--manifest", default=DEFAULT_MANIFEST)
+    run.add_argument("--out", default=None, help="Defaults to loadtest-<commit>-<scenario>.json")
+    run.set_defaults(handler=run_command)
+
+    diff = commands.add_parser("compare", help="Compare two result files")
+    diff.add_argument("before")
+    diff.add_argument("after")
+    diff.set_defaults(handler=compare_command)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
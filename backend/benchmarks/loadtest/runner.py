@@ -0,0 +1,202 @@
+"""Runs a scenario from N worker threads and aggregates per-route latency."""
+import http.client
+import json
+import os
+import random
+import statistics
+import subprocess
+import threading
+import time
+from datetime import datetime
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+API_PREFIX = "/api/v1"
+
+
+class InProcessClient:
+    """Calls the app through the Flask test client: measures the app without a network."""
+
+    def __init__(self, app: Any):
+        self.client = app.test_client()
+
+    def send(self, method: str, path: str, headers: dict[str, str], body: Optional[bytes]) -> tuple[int, bytes]:
+        response = self.client.open(path, method=method, headers=headers, data=body)
+        return response.status_code, response.get_data()
+
+
+class HttpClient:
+    """One keep-alive connection per worker thread to a running server."""
+
+    def __init__(self, base_url: str):
+        parts = urlsplit(base_url)
+        self.connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=60)
+        self.prefix = parts.path.rstrip("/")
+
+    def send(self, method: str, path: str, headers: dict[str, str], body: Optional[bytes]) -> tuple[int, bytes]:
+        try:
+            self.connection.request(method, self.prefix + path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            return response.status, response.read()
+        except (http.client.HTTPException, OSError):
+            self.connection.close()  # reconnects on the next request
+            raise
+
+
+class Session:
+    """What a scenario sees: timed requests, the manifest and the token pool."""
+
+    def __init__(self, client: Any, manifest: dict[str, Any], tokens: list[str], samples: dict[str, list]):
+        self.client = client
+        self.manifest = manifest
+        self.tokens = tokens
+        self.samples = samples
+
+    def token(self, rng: random.Random) -> str:
+        return rng.choice(self.tokens)
+
+    def request(self, method: str, path: str, label: str, token: Optional[str] = None,
+                json: Any = None) -> Optional[dict[str, Any]]:
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        body = _dumps(json) if json is not None else None
+
+        start = time.perf_counter()
+        try:
+            status, data = self.client.send(method, API_PREFIX + path, headers, body)
+        except Exception:
+            status, data = 0, b""
+        elapsed = time.perf_counter() - start
+
+        self.samples.setdefault(label, []).append((elapsed, status))
+        if status != 200:
+            return None
+        try:
+            return _loads(data)
+        except ValueError:
+            return None
+
+
+def login_pool(client: Any, manifest: dict[str, Any], size: int, rng: random.Random) -> list[str]:
+    tokens = []
+    for user_id in rng.sample(range(1, manifest["users"] + 1), min(size, manifest["users"])):
+        body = _dumps({"username": manifest["username_format"].format(user_id), "password": manifest["password"]})
+        status, data = client.send("POST", f"{API_PREFIX}/auth/login", {"Content-Type": "application/json"}, body)
+        if status == 200:
+            tokens.append(_loads(data)["data"]["token"])
+    if not tokens:
+        raise SystemExit("Could not log in any load-test user; was the database seeded with this manifest?")
+    return tokens
+
+
+def run(scenario: Any, make_client: Any, manifest: dict[str, Any], duration: float, concurrency: int,
+        authenticated: bool, rng_seed: int = 1) -> tuple[float, dict[str, list]]:
+    tokens = login_pool(make_client(), manifest, concurrency * 4, random.Random(rng_seed)) if authenticated else []
+    per_worker: list[dict[str, list]] = [{} for _ in range(concurrency)]
+    deadline = time.perf_counter() + duration
+
+    def work(index: int) -> None:
+        rng = random.Random(rng_seed * 1000 + index)
+        session = Session(make_client(), manifest, tokens, per_worker[index])
+        while time.perf_counter() < deadline:
+            scenario(session, rng)
+
+    threads = [threading.Thread(target=work, args=(i,), daemon=True) for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    samples: dict[str, list] = {}
+    for worker_samples in per_worker:
+        for label, values in worker_samples.items():
+            samples.setdefault(label, []).extend(values)
+    return elapsed, samples
+
+
+def summarize(samples: list[tuple[float, int]], elapsed: float) -> dict[str, Any]:
+    latencies = sorted(latency for latency, _ in samples)
+    statuses: dict[str, int] = {}
+    for _, status in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    if len(latencies) > 1:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = latencies[0]
+    return {
+        "requests": len(latencies),
+        "errors": sum(1 for _, status in samples if status == 0 or status >= 500),
+        "statuses": statuses,
+        "rps": round(len(latencies) / elapsed, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+        "p50_ms": round(p50 * 1000, 2),
+        "p95_ms": round(p95 * 1000, 2),
+        "p99_ms": round(p99 * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2)
+    }
+
+
+def report(scenario: str, mode: str, elapsed: float, samples: dict[str, list],
+           manifest: dict[str, Any], options: dict[str, Any]) -> dict[str, Any]:
+    endpoints = {label: summarize(values, elapsed) for label, values in sorted(samples.items())}
+    everything = [value for values in samples.values() for value in values]
+    return {
+        "scenario": scenario,
+        "mode": mode,
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "started_at": datetime.utcnow().isoformat(),
+        "elapsed_s": round(elapsed, 2),
+        "options": options,
+        "dataset": {key: manifest[key] for key in ("users", "quips", "quip_ups", "comments", "reposts", "follows")},
+        "total": summarize(everything, elapsed) if everything else None,
+        "endpoints": endpoints
+    }
+
+
+def print_report(result: dict[str, Any]) -> None:
+    print(f"{result['scenario']} ({result['mode']}) for {result['elapsed_s']}s at commit {(result['commit'] or '?')[:10]}")
+    print(f"{'endpoint':<44} {'req':>7} {'err':>5} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    rows = list(result["endpoints"].items()) + ([("TOTAL", result["total"])] if result["total"] else [])
+    for label, stats in rows:
+        print(f"{label:<44} {stats['requests']:>7} {stats['errors']:>5} {stats['rps']:>8.1f} "
+              f"{stats['p50_ms']:>7.1f}ms {stats['p95_ms']:>6.1f}ms {stats['p99_ms']:>6.1f}ms")
+
+
+def compare(before: dict[str, Any], after: dict[str, Any]) -> None:
+    print(f"before: {(before['commit'] or '?')[:10]} {before['scenario']}   after: {(after['commit'] or '?')[:10]} {after['scenario']}")
+    print(f"{'endpoint':<44} {'req/s':>18} {'p50':>22} {'p99':>22}")
+    labels = sorted(set(before["endpoints"]) | set(after["endpoints"]))
+    for label in labels + ["TOTAL"]:
+        old = before["total"] if label == "TOTAL" else before["endpoints"].get(label)
+        new = after["total"] if label == "TOTAL" else after["endpoints"].get(label)
+        if not old or not new:
+            print(f"{label:<44} {'only in ' + ('after' if new else 'before'):>18}")
+            continue
+        print(f"{label:<44} {_delta(old['rps'], new['rps']):>18} {_delta(old['p50_ms'], new['p50_ms'], 'ms'):>22} "
+              f"{_delta(old['p99_ms'], new['p99_ms'], 'ms'):>22}")
+
+
+def _delta(old: float, new: float, unit: str = "") -> str:
+    change = f"{(new - old) / old * 100:+.0f}%" if old else "n/a"
+    return f"{old:.1f}->{new:.1f}{unit} {change}"
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(["git", *args], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _dumps(obj: Any) -> bytes:
+    return json.dumps(obj).encode("utf-8")
+
+
+def _loads(data: bytes) -> Any:
+    return json.loads(data)
@@ -0,0 +1,114 @@
+"""Scripted user journeys.
+
+A scenario is a function ``(session, rng) -> None`` that performs one journey
+through ``session.request``; each request is timed and recorded under a route
+label such as ``GET /quips/<id>/comments``. Targets come from the seed manifest,
+skewed towards the hot quips and popular users.
+"""
+import random
+from typing import Any, Callable
+from benchmarks.loadtest.seed import WORDS
+
+
+def pick(rng: random.Random, hot: list[int], total: int, hot_share: float = 0.8) -> int:
+    """Mostly one of the hottest ids, sometimes any id: a long-tail mix."""
+    if hot and rng.random() < hot_share:
+        return hot[min(int(rng.paretovariate(1.2)) - 1, len(hot) - 1)]
+    return rng.randint(1, total)
+
+
+def username(session: Any, user_id: int) -> str:
+    return session.manifest["username_format"].format(user_id)
+
+
+def feed_scroll(session: Any, rng: random.Random) -> None:
+    sort = rng.choice(("smart", "smart", "new", "top"))
+    body = session.request("GET", f"/quips?sort={sort}", label=f"GET /quips?sort={sort}")
+    for _ in range(rng.randint(1, 4)):
+        cursor = ((body or {}).get("meta") or {}).get("next_cursor")
+        if not cursor:
+            return
+        body = session.request("GET", f"/quips?sort={sort}&cursor={cursor}", label=f"GET /quips?sort={sort}&cursor")
+
+
+def profile_view(session: Any, rng: random.Random) -> None:
+    name = username(session, pick(rng, session.manifest["popular_user_ids"], session.manifest["users"]))
+    session.request("GET", f"/users/{name}", label="GET /users/<username>")
+    session.request("GET", f"/users/{name}/quips", label="GET /users/<username>/quips")
+    if rng.random() < 0.3:
+        session.request("GET", f"/users/{name}/reposts", label="GET /users/<username>/reposts")
+
+
+def thread_read(session: Any, rng: random.Random) -> None:
+    quip_id = pick(rng, session.manifest["threaded_quip_ids"], session.manifest["quips"])
+    session.request("GET", f"/quips/{quip_id}", label="GET /quips/<id>")
+    body = session.request("GET", f"/quips/{quip_id}/comments", label="GET /quips/<id>/comments")
+    # Expand one truncated branch, as a reader following a deep reply chain would.
+    stack = list((body or {}).get("data") or [])
+    while stack:
+        node = stack.pop()
+        if node.get("has_more_replies"):
+            session.request("GET", f"/quips/comments/{node['id']}/replies",
+                            label="GET /quips/comments/<id>/replies")
+            return
+        stack.extend(node.get("replies") or [])
+
+
+def upvote_storm(session: Any, rng: random.Random) -> None:
+    # Everyone piles onto the same few quips, as when one goes viral.
+    quip_id = session.manifest["hot_quip_ids"][rng.randint(0, 4)]
+    token = session.token(rng)
+    session.request("POST", f"/quips/{quip_id}/up", label="POST /quips/<id>/up", token=token)
+    session.request("DELETE", f"/quips/{quip_id}/up", label="DELETE /quips/<id>/up", token=token)
+
+
+def login_burst(session: Any, rng: random.Random) -> None:
+    name = username(session, rng.randint(1, session.manifest["users"]))
+    session.request("POST", "/auth/login", label="POST /auth/login",
+                    json={"username": name, "password": session.manifest["password"]})
+
+
+def home_timeline(session: Any, rng: random.Random) -> None:
+    token = session.token(rng)
+    body = session.request("GET", "/timeline", label="GET /timeline", token=token)
+    cursor = ((body or {}).get("meta") or {}).get("next_cursor")
+    if cursor and rng.random() < 0.5:
+        session.request("GET", f"/timeline?cursor={cursor}", label="GET /timeline?cursor", token=token)
+
+
+def search(session: Any, rng: random.Random) -> None:
+    q = " ".join(rng.sample(WORDS, rng.randint(1, 2)))
+    session.request("GET", f"/quips/search?q={q.replace(' ', '+')}", label="GET /quips/search")
+
+
+SCENARIOS: dict[str, Callable[[Any, random.Random], None]] = {
+    "feed_scroll": feed_scroll,
+    "profile_view": profile_view,
+    "thread_read": thread_read,
+    "upvote_storm": upvote_storm,
+    "login_burst": login_burst,
+    "home_timeline": home_timeline,
+    "search": search,
+}
+
+# Rough read/write mix of a browsing session.
+MIXED_WEIGHTS = {
+    "feed_scroll": 35,
+    "profile_view": 15,
+    "thread_read": 20,
+    "home_timeline": 15,
+    "search": 5,
+    "upvote_storm": 8,
+    "login_burst": 2,
+}
+
+
+def mixed(session: Any, rng: random.Random) -> None:
+    name = rng.choices(list(MIXED_WEIGHTS), weights=list(MIXED_WEIGHTS.values()))[0]
+    SCENARIOS[name](session, rng)
+
+
+SCENARIOS["mixed"] = mixed
+
+# Scenarios that act as a signed-in user; the runner logs a token pool in first.
+AUTHENTICATED = {"upvote_storm", "home_timeline", "mixed"}
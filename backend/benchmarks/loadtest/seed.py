@@ -0,0 +1,223 @@
+"""Synthetic data set with heavy-tailed popularity.
+
+Authors, followees and engagement targets are drawn from a Zipf-like law, so a
+few accounts and quips collect most of the activity, as on a real network.
+Rows are written with bulk Core inserts and explicit ids; denormalized counters
+and ``hot_score`` are computed here, so no reconcile pass is needed afterwards.
+"""
+import bisect
+import itertools
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Iterator
+from sqlalchemy import false, insert, select, text, union_all
+
+PASSWORD = "loadtest-password"
+CHUNK = 5000
+
+WORDS = (
+    "rizz", "vibe", "slay", "bussin", "cap", "mid", "sus", "yeet", "lowkey", "highkey", "drip", "stan",
+    "ghost", "flex", "salty", "tea", "woke", "glow", "sheesh", "based", "cringe", "npc", "aura", "delulu",
+    "brainrot", "sigma", "ick", "situationship", "goat", "ratio", "touch", "grass", "main", "character",
+)
+
+
+class Zipf:
+    """Draws 0-based ranks with P(k) proportional to 1 / (k + 1) ** s."""
+
+    def __init__(self, n: int, s: float, rng: random.Random):
+        self.rng = rng
+        self.cumulative = list(itertools.accumulate(1.0 / (k + 1) ** s for k in range(n)))
+
+    def draw(self) -> int:
+        return bisect.bisect(self.cumulative, self.rng.random() * self.cumulative[-1])
+
+
+def heavy_tail(rng: random.Random, mean: float, alpha: float, cap: int) -> int:
+    """Pareto-distributed count with the given mean: most values small, a few huge."""
+    return min(int((rng.paretovariate(alpha) - 1) * mean * (alpha - 1)), cap)
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def chunked(rows: Iterable[dict[str, Any]]) -> Iterator[list[dict[str, Any]]]:
+    iterator = iter(rows)
+    while chunk := list(itertools.islice(iterator, CHUNK)):
+        yield chunk
+
+
+def seed(users: int, quips: int, days: int = 30, ups_per_quip: float = 4.0, comments_per_quip: float = 1.5,
+         reposts_per_quip: float = 0.5, follows_per_user: float = 25.0, timeline_days: int = 3,
+         reset: bool = False, rng_seed: int = 42) -> dict[str, Any]:
+    from flask import current_app
+    from app import db, password_hasher
+    from app.models import Comment, Follow, Quip, QuipUp, Repost, TimelineEntry, User
+    from app.services.ranking_service import RankingService
+    from app.services.timeline_service import TimelineService
+
+    rng = random.Random(rng_seed)
+    started = time.perf_counter()
+    if reset:
+        db.drop_all()
+    db.create_all()
+    if db.session.query(User.id).first() is not None:
+        raise SystemExit("Database is not empty; pass --reset to recreate it")
+
+    now = datetime.utcnow()
+    start = now - timedelta(days=days)
+    span = (now - start).total_seconds()
+    password_hash = password_hasher.hash(PASSWORD)
+
+    def write(model: Any, rows: Iterable[dict[str, Any]]) -> None:
+        for chunk in chunked(rows):
+            db.session.execute(insert(model), chunk)
+        db.session.commit()
+
+    def log(step: str) -> None:
+        print(f"[{time.perf_counter() - started:7.1f}s] {step}", flush=True)
+
+    # Authorship: user rank k writes ~1/k of the quips; ids are shuffled so the
+    # prolific accounts are not simply the lowest ids.
+    user_ids = list(range(1, users + 1))
+    rng.shuffle(user_ids)
+    author_rank = Zipf(users, 1.05, rng)
+    quip_author = [user_ids[author_rank.draw()] for _ in range(quips)]
+    quip_time = sorted(start + timedelta(seconds=rng.random() * span) for _ in range(quips))
+
+    # Engagement per quip is heavy-tailed; engagers are uniform so counts stay exact.
+    ups = [heavy_tail(rng, ups_per_quip, 1.3, users) for _ in range(quips)]
+    comments = [heavy_tail(rng, comments_per_quip, 1.3, 2000) for _ in range(quips)]
+    reposts = [heavy_tail(rng, reposts_per_quip, 1.3, users) for _ in range(quips)]
+
+    followee_rank = Zipf(users, 1.0, rng)
+    following: dict[int, set[int]] = {}
+    for follower in range(1, users + 1):
+        wanted = heavy_tail(rng, follows_per_user, 1.5, 2000)
+        followees = {user_ids[followee_rank.draw()] for _ in range(wanted)}
+        followees.discard(follower)
+        following[follower] = followees
+
+    quips_count = [0] * (users + 1)
+    ups_received = [0] * (users + 1)
+    reposts_received = [0] * (users + 1)
+    followers = [0] * (users + 1)
+    for i, author in enumerate(quip_author):
+        quips_count[author] += 1
+        ups_received[author] += ups[i]
+        reposts_received[author] += reposts[i]
+    for followees in following.values():
+        for followee in followees:
+            followers[followee] += 1
+
+    write(User, ({
+        "id": user_id, "username": f"lt_user_{user_id:07d}", "email": f"lt{user_id}@loadtest.invalid",
+        "password_hash": password_hash, "created_at": start, "updated_at": start,
+        "quips_count": quips_count[user_id], "quip_ups_received_count": ups_received[user_id],
+        "reposts_received_count": reposts_received[user_id], "followers_count": followers[user_id],
+        "following_count": len(following[user_id])
+    } for user_id in range(1, users + 1)))
+    log(f"users: {users}")
+
+    write(Quip, ({
+        "id": i + 1, "user_id": quip_author[i], "content": sentence(rng, rng.randint(1, 4)),
+        "definition": sentence(rng, rng.randint(6, 24)),
+        "usage_examples": sentence(rng, rng.randint(4, 16)) if rng.random() < 0.6 else None,
+        "created_at": quip_time[i], "updated_at": quip_time[i],
+        "quip_ups_count": ups[i], "comments_count": comments[i], "reposts_count": reposts[i],
+        "hot_score": RankingService.score(ups[i], comments[i], reposts[i], quip_time[i])
+    } for i in range(quips)))
+    log(f"quips: {quips}")
+
+    def engagement(counts: list[int]) -> Iterator[dict[str, Any]]:
+        for i, count in enumerate(counts):
+            if count:
+                elapsed = (now - quip_time[i]).total_seconds()
+                for user_id in rng.sample(range(1, users + 1), count):
+                    yield {"user_id": user_id, "quip_id": i + 1,
+                           "created_at": quip_time[i] + timedelta(seconds=rng.random() * elapsed)}
+
+    write(QuipUp, engagement(ups))
+    log(f"quip_ups: {sum(ups)}")
+    write(Repost, engagement(reposts))
+    log(f"reposts: {sum(reposts)}")
+
+    def comment_rows() -> Iterator[dict[str, Any]]:
+        # Threads: a third of the comments are top-level, the rest mostly reply to
+        # the previous comment, which builds long reply chains.
+        comment_id = 0
+        for i, count in enumerate(comments):
+            thread: list[int] = []
+            created = quip_time[i]
+            for _ in range(count):
+                comment_id += 1
+                roll = rng.random()
+                if not thread or roll < 0.35:
+                    parent = None
+                elif roll < 0.75:
+                    parent = thread[-1]
+                else:
+                    parent = rng.choice(thread)
+                created += timedelta(seconds=rng.randint(1, 600))
+                thread.append(comment_id)
+                yield {"id": comment_id, "user_id": rng.randint(1, users), "quip_id": i + 1,
+                       "parent_comment_id": parent, "content": sentence(rng, rng.randint(2, 20)),
+                       "created_at": created, "updated_at": created}
+
+    write(Comment, comment_rows())
+    log(f"comments: {sum(comments)}")
+
+    write(Follow, ({"follower_id": follower, "followee_id": followee, "created_at": start}
+                   for follower, followees in following.items() for followee in followees))
+    log(f"follows: {sum(followers)}")
+
+    # Home timelines hold what fan-out would have written for recent quips.
+    max_followers = current_app.config.get("TIMELINE_FANOUT_MAX_FOLLOWERS", 10000)
+    recent = Quip.created_at >= now - timedelta(days=timeline_days)
+    db.session.execute(insert(TimelineEntry).from_select(
+        ["user_id", "quip_id", "actor_id", "reposted", "created_at"],
+        union_all(
+            select(Quip.user_id, Quip.id, Quip.user_id, false(), Quip.created_at).where(recent),
+            select(Follow.follower_id, Quip.id, Quip.user_id, false(), Quip.created_at)
+            .join(Quip, Quip.user_id == Follow.followee_id)
+            .join(User, User.id == Follow.followee_id)
+            .where(User.followers_count <= max_followers, recent)
+        )
+    ))
+    db.session.commit()
+    TimelineService.trim()
+    log("timelines")
+
+    if db.engine.dialect.name == "postgresql":
+        for table in ("users", "quips", "comments"):
+            db.session.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"
+            ))
+        db.session.commit()
+
+    by_engagement = sorted(range(quips), key=lambda i: ups[i] + comments[i] + reposts[i], reverse=True)
+    by_followers = sorted(range(1, users + 1), key=lambda u: followers[u], reverse=True)
+    return {
+        "created_at": now.isoformat(),
+        "seed": rng_seed,
+        "users": users,
+        "quips": quips,
+        "quip_ups": sum(ups),
+        "comments": sum(comments),
+        "reposts": sum(reposts),
+        "follows": sum(followers),
+        "password": PASSWORD,
+        "username_format": "lt_user_{:07d}",
+        "hot_quip_ids": [i + 1 for i in by_engagement[:200]],
+        "threaded_quip_ids": [i + 1 for i in sorted(range(quips), key=comments.__getitem__, reverse=True)[:200]],
+        "popular_user_ids": by_followers[:200],
+        "seconds": round(time.perf_counter() - started, 1)
+    }
+
+
+def save_manifest(manifest: dict[str, Any], path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=2)
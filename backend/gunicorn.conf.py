@@ -0,0 +1,63 @@
+"""gunicorn settings, overridable through the environment.
+
+``GUNICORN_WORKER_CLASS=gthread`` (the default) serves ``GUNICORN_THREADS``
+requests per worker, so a request waiting on the database no longer blocks the
+whole worker. Each thread holds at most one pooled connection, so ``DB_POOL_SIZE``
+defaults to the thread count; keep ``workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW)``
+below the server's ``max_connections``. ``sync`` is the old one-request-per-worker
+mode.
+
+Workers write Prometheus samples to ``PROMETHEUS_MULTIPROC_DIR`` so ``/metrics``
+reports the whole server whichever worker answers the scrape. An explicitly set
+directory is emptied when this file is loaded, so it must belong to this server
+alone; without one each master gets a fresh temporary directory.
+"""
+import os
+import shutil
+import tempfile
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("GUNICORN_WORKERS", 4))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.getenv("GUNICORN_THREADS", 8)) if worker_class == "gthread" else 1
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 100))
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() in ("1", "true", "yes")
+
+# Config reads these when run:app is imported, which happens after this file.
+os.environ.setdefault("GUNICORN_THREADS", str(threads))
+# prometheus_client reads this on import, and preload_app imports the app right
+# after this file, so the directory is prepared here rather than in on_starting.
+if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+else:
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="quiply-metrics-")
+
+
+def post_fork(server, worker):
+    # With preload_app the app is built in the master: drop any pooled connections
+    # inherited through fork. The log listener restarts itself (os.register_at_fork).
+    from app import db
+
+    app = worker.app.wsgi()
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def on_exit(server):
+    # Only the directory made above; after a reload it is in the environment like an explicit one.
+    if metrics_dir.startswith(os.path.join(tempfile.gettempdir(), "quiply-metrics-")):
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+def child_exit(server, worker):
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
@@ -88,9 +88,18 @@ def run_migrations_online():
                 directives[:] = []
                 logger.info('No changes in schema detected.')
 
+    # full-text search objects are created by raw DDL (app.models.QUIP_SEARCH_DDL)
+    # and are not mapped, so autogenerate must not propose dropping them
+    def include_object(object, name, type_, reflected, compare_to):
+        if reflected and compare_to is None and name:
+            return not (name.startswith('quips_fts') or name in ('search_vector', 'idx_quips_search_vector'))
+        return True
+
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    if conf_args.get("include_object") is None:
+        conf_args["include_object"] = include_object
 
     connectable = get_engine()
 
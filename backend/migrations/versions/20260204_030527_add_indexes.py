@@ -12,7 +12,7 @@ import sqlalchemy as sa
 revision = '59ed8b5a1701'
 down_revision = None
 branch_labels = None
-depends_on = None
+depends_on = '171272663cbe'  # indexes the tables the initial migration creates
 
 
 def upgrade():
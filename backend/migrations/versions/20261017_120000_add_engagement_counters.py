@@ -0,0 +1,46 @@
+"""Add denormalized engagement counters
+
+Revision ID: 3c9a1f2e7b40
+Revises: 171272663cbe, 59ed8b5a1701
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '3c9a1f2e7b40'
+down_revision = ('171272663cbe', '59ed8b5a1701')
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('quips', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('quip_ups_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('comments_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('reposts_count', sa.Integer(), server_default='0', nullable=False))
+
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('comment_ups_count', sa.Integer(), server_default='0', nullable=False))
+
+    op.execute("""
+        UPDATE quips SET
+            quip_ups_count = (SELECT COUNT(*) FROM quip_ups WHERE quip_ups.quip_id = quips.id),
+            comments_count = (SELECT COUNT(*) FROM comments WHERE comments.quip_id = quips.id),
+            reposts_count = (SELECT COUNT(*) FROM reposts WHERE reposts.quip_id = quips.id)
+    """)
+    op.execute("""
+        UPDATE comments SET
+            comment_ups_count = (SELECT COUNT(*) FROM comment_ups WHERE comment_ups.comment_id = comments.id)
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.drop_column('comment_ups_count')
+
+    with op.batch_alter_table('quips', schema=None) as batch_op:
+        batch_op.drop_column('reposts_count')
+        batch_op.drop_column('comments_count')
+        batch_op.drop_column('quip_ups_count')
@@ -0,0 +1,47 @@
+"""Add quip hot score for feed ranking
+
+Revision ID: 8d2e4b6a1c73
+Revises: 3c9a1f2e7b40
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '8d2e4b6a1c73'
+down_revision = '3c9a1f2e7b40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('quips', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('hot_score', sa.Float(), server_default='0', nullable=False))
+        batch_op.create_index(batch_op.f('ix_quips_hot_score'), ['hot_score'], unique=False)
+        # sort=top: range scan on the window, ordering columns read from the index.
+        batch_op.create_index('idx_quips_created_ups', ['created_at', 'quip_ups_count', 'id'], unique=False)
+
+    # Same formula as RankingService.score at the time of writing, as one UPDATE.
+    bind = op.get_bind()
+    quips = sa.table(
+        'quips',
+        sa.column('created_at', sa.DateTime), sa.column('hot_score', sa.Float),
+        sa.column('quip_ups_count', sa.Integer), sa.column('comments_count', sa.Integer),
+        sa.column('reposts_count', sa.Integer),
+    )
+    engagement = quips.c.quip_ups_count * 1.0 + quips.c.comments_count * 1.5 + quips.c.reposts_count * 2.0
+    if bind.dialect.name == 'sqlite':
+        age = (sa.func.julianday(quips.c.created_at) - sa.func.julianday('2026-01-01')) * 86400
+    else:
+        age = sa.extract('epoch', quips.c.created_at - sa.literal(datetime(2026, 1, 1), sa.DateTime))
+    score = sa.func.log10(sa.case((engagement > 1.0, engagement), else_=1.0)) + age / 45000
+    bind.execute(quips.update().values(hot_score=sa.func.round(sa.cast(score, sa.Numeric), 7)))
+
+
+def downgrade():
+    with op.batch_alter_table('quips', schema=None) as batch_op:
+        batch_op.drop_index('idx_quips_created_ups')
+        batch_op.drop_index(batch_op.f('ix_quips_hot_score'))
+        batch_op.drop_column('hot_score')
@@ -0,0 +1,44 @@
+"""Add denormalized user profile stats
+
+Revision ID: b41f7c9e2d85
+Revises: 8d2e4b6a1c73
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'b41f7c9e2d85'
+down_revision = '8d2e4b6a1c73'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('quips_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('quip_ups_received_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('reposts_received_count', sa.Integer(), server_default='0', nullable=False))
+
+    op.create_index('idx_quips_user_ups', 'quips', ['user_id', 'quip_ups_count'], unique=False)
+
+    op.execute("""
+        UPDATE users SET
+            quips_count = (SELECT COUNT(*) FROM quips WHERE quips.user_id = users.id),
+            quip_ups_received_count = (
+                SELECT COALESCE(SUM(quips.quip_ups_count), 0) FROM quips WHERE quips.user_id = users.id
+            ),
+            reposts_received_count = (
+                SELECT COALESCE(SUM(quips.reposts_count), 0) FROM quips WHERE quips.user_id = users.id
+            )
+    """)
+
+
+def downgrade():
+    op.drop_index('idx_quips_user_ups', table_name='quips')
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('reposts_received_count')
+        batch_op.drop_column('quip_ups_received_count')
+        batch_op.drop_column('quips_count')
@@ -0,0 +1,33 @@
+"""Add updated_at to users, quips and comments
+
+Revision ID: e7a3c5d9f012
+Revises: b41f7c9e2d85
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'e7a3c5d9f012'
+down_revision = 'b41f7c9e2d85'
+branch_labels = None
+depends_on = None
+
+
+TABLES = ('users', 'quips', 'comments')
+
+
+def upgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+        op.execute(f"UPDATE {table} SET updated_at = created_at")
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('updated_at')
@@ -0,0 +1,33 @@
+"""Add vote_intents buffer table
+
+Revision ID: 5c8e1d3f7a26
+Revises: e7a3c5d9f012
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '5c8e1d3f7a26'
+down_revision = 'e7a3c5d9f012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'vote_intents',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('quip_id', sa.Integer(), nullable=False),
+        sa.Column('upvoted', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_vote_intents_user_quip', 'vote_intents', ['user_id', 'quip_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('idx_vote_intents_user_quip', table_name='vote_intents')
+    op.drop_table('vote_intents')
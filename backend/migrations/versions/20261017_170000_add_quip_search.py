@@ -0,0 +1,63 @@
+"""Add full-text search over quips
+
+Revision ID: 9a4f6b2c8e13
+Revises: 5c8e1d3f7a26
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from alembic import op
+
+
+revision = '9a4f6b2c8e13'
+down_revision = '5c8e1d3f7a26'
+branch_labels = None
+depends_on = None
+
+
+POSTGRES_UPGRADE = [
+    "ALTER TABLE quips ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(content, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(definition, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(usage_examples, '')), 'C')) STORED",
+    "CREATE INDEX idx_quips_search_vector ON quips USING gin (search_vector)",
+]
+
+SQLITE_UPGRADE = [
+    "CREATE VIRTUAL TABLE quips_fts USING fts5(content, definition, usage_examples, "
+    "content='quips', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER quips_fts_ai AFTER INSERT ON quips BEGIN "
+    "INSERT INTO quips_fts (rowid, content, definition, usage_examples) "
+    "VALUES (new.id, new.content, new.definition, new.usage_examples); END",
+    "CREATE TRIGGER quips_fts_ad AFTER DELETE ON quips BEGIN "
+    "INSERT INTO quips_fts (quips_fts, rowid, content, definition, usage_examples) "
+    "VALUES ('delete', old.id, old.content, old.definition, old.usage_examples); END",
+    "CREATE TRIGGER quips_fts_au AFTER UPDATE OF content, definition, usage_examples ON quips BEGIN "
+    "INSERT INTO quips_fts (quips_fts, rowid, content, definition, usage_examples) "
+    "VALUES ('delete', old.id, old.content, old.definition, old.usage_examples); "
+    "INSERT INTO quips_fts (rowid, content, definition, usage_examples) "
+    "VALUES (new.id, new.content, new.definition, new.usage_examples); END",
+    "INSERT INTO quips_fts (quips_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        statements = POSTGRES_UPGRADE
+    elif dialect == 'sqlite':
+        statements = SQLITE_UPGRADE
+    else:
+        return
+    for statement in statements:
+        op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS idx_quips_search_vector")
+        op.execute("ALTER TABLE quips DROP COLUMN IF EXISTS search_vector")
+    elif dialect == 'sqlite':
+        for trigger in ('quips_fts_ai', 'quips_fts_ad', 'quips_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS quips_fts")
@@ -0,0 +1,59 @@
+"""Add follows, home timelines and follow counters
+
+Revision ID: 2b7d9e4a6c51
+Revises: 9a4f6b2c8e13
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '2b7d9e4a6c51'
+down_revision = '9a4f6b2c8e13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'follows',
+        sa.Column('follower_id', sa.Integer(), nullable=False),
+        sa.Column('followee_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['follower_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['followee_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('follower_id', 'followee_id')
+    )
+    op.create_index('idx_follows_followee_follower', 'follows', ['followee_id', 'follower_id'], unique=False)
+
+    op.create_table(
+        'timeline_entries',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('quip_id', sa.Integer(), nullable=False),
+        sa.Column('actor_id', sa.Integer(), nullable=False),
+        sa.Column('reposted', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['quip_id'], ['quips.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'quip_id')
+    )
+    op.create_index('idx_timeline_user_created_quip', 'timeline_entries', ['user_id', 'created_at', 'quip_id'], unique=False)
+    op.create_index('idx_timeline_quip', 'timeline_entries', ['quip_id'], unique=False)
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('followers_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('following_count', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('following_count')
+        batch_op.drop_column('followers_count')
+
+    op.drop_index('idx_timeline_quip', table_name='timeline_entries')
+    op.drop_index('idx_timeline_user_created_quip', table_name='timeline_entries')
+    op.drop_table('timeline_entries')
+
+    op.drop_index('idx_follows_followee_follower', table_name='follows')
+    op.drop_table('follows')
@@ -0,0 +1,70 @@
+import os
+import tempfile
+
+# Config reads the environment at import time, so this has to run before `app` is imported.
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='quiply-tests-'), 'test.db')}",
+    "DATABASE_REPLICA_URLS": "",
+    "BCRYPT_ROUNDS": "4",
+    "PASSWORD_HASH_POOL": "inline",
+    "CACHE_BACKEND": "null",
+    "USER_CACHE_BACKEND": "null",
+    "RATE_LIMIT_ENABLED": "false",
+    "ADMISSION_CONTROL_ENABLED": "false",
+    "METRICS_ENABLED": "false",
+    "LOG_ASYNC": "false",
+    "LOG_LEVEL": "WARNING",
+})
+
+import pytest  # noqa: E402
+from app import create_app, db  # noqa: E402
+from app.models import Quip, User  # noqa: E402
+from tests.fakes import FakeRedis  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    app = create_app("development")
+    app.config.update(TESTING=True, LOG_LEVEL="WARNING")
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_quips(app):
+    """Seed quips by distinct authors until ``n`` exist; returns their ids."""
+    def make(n: int) -> list[int]:
+        existing = Quip.query.count()
+        for i in range(existing, n):
+            author = User(username=f"author{i}", email=f"author{i}@example.com", password_hash="x")
+            db.session.add(author)
+            db.session.flush()
+            db.session.add(Quip(user_id=author.id, content=f"quip {i}", definition="d", usage_examples="u"))
+        db.session.commit()
+        return [quip_id for (quip_id,) in db.session.query(Quip.id).order_by(Quip.id).limit(n)]
+    return make
+
+
+@pytest.fixture
+def login(client):
+    """Register ``username`` (if needed) and return its Authorization header."""
+    def login_as(username: str) -> dict[str, str]:
+        client.post("/api/v1/auth/register", json={
+            "username": username, "email": f"{username}@example.com", "password": "secret123"
+        })
+        response = client.post("/api/v1/auth/login", json={"username": username, "password": "secret123"})
+        return {"Authorization": f"Bearer {response.get_json()['data']['token']}"}
+    return login_as
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
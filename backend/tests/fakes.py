@@ -0,0 +1,66 @@
+import time
+from typing import Any, Optional
+
+
+class FakeRedis:
+    """In-process stand-in for the parts of the redis-py client the backends use.
+
+    Lua is not interpreted: ``register_script`` returns a Python twin of
+    ``RedisBackend.SCRIPT`` in app.utils.rate_limit, the only script we load.
+    """
+
+    def __init__(self):
+        self.data: dict[Any, Any] = {}
+        self.expires: dict[Any, float] = {}
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._live(key)
+
+    def mget(self, keys: list[str]) -> list[Optional[bytes]]:
+        return [self._live(key) for key in keys]
+
+    def set(self, key: str, value: Any, ex: Optional[int] = None) -> None:
+        self.data[key] = value if isinstance(value, bytes) else str(value).encode()
+        self.expires.pop(key, None)
+        if ex is not None:
+            self.expire(key, ex)
+
+    def delete(self, *keys: Any) -> int:
+        deleted = 0
+        for key in keys:
+            if self._live(key) is not None:
+                deleted += 1
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return deleted
+
+    def sadd(self, key: str, *members: Any) -> None:
+        self.data.setdefault(key, set()).update(members)
+
+    def smembers(self, key: str) -> set:
+        return set(self._live(key) or ())
+
+    def expire(self, key: str, seconds: int) -> None:
+        if key in self.data:
+            self.expires[key] = time.monotonic() + seconds
+
+    def register_script(self, script: str):
+        def token_bucket(keys: list[str], args: list[Any]) -> list[Any]:
+            capacity, rate, now, cost = (float(arg) for arg in args)
+            tokens, updated = self._live(keys[0]) or (capacity, now)
+            tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+            allowed = 0
+            if tokens >= cost:
+                tokens -= cost
+                allowed = 1
+            self.data[keys[0]] = (tokens, now)
+            self.expire(keys[0], int(capacity / rate) + 1)
+            return [allowed, str(tokens).encode()]
+        return token_bucket
+
+    def _live(self, key: Any) -> Any:
+        expires = self.expires.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return self.data.get(key)
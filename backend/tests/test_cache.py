@@ -0,0 +1,80 @@
+import pytest
+from app import cache
+from app.utils.cache import MemoryBackend, RedisBackend
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cached(request, app, fake_redis):
+    backend = MemoryBackend() if request.param == "memory" else RedisBackend(fake_redis)
+    cache.init_app(app, backend=backend)
+    yield backend
+    cache.init_app(app)
+
+
+@pytest.fixture
+def quip(client, login):
+    headers = login("author1")
+    return client.post("/api/v1/quips", json={"content": "hello"}, headers=headers).get_json()["data"]["id"]
+
+
+def _get(client, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    return response.headers["X-Cache"], response.get_json()["data"]
+
+
+def test_upvote_invalidates_quip(client, login, cached, quip):
+    assert _get(client, f"/api/v1/quips/{quip}")[0] == "MISS"
+    assert _get(client, f"/api/v1/quips/{quip}")[0] == "HIT"
+
+    client.post(f"/api/v1/quips/{quip}/up", headers=login("fan_one"))
+    state, data = _get(client, f"/api/v1/quips/{quip}")
+    assert state == "MISS" and data["quip_ups_count"] == 1
+
+
+def test_repost_invalidates_reposts_and_quip(client, login, cached, quip):
+    fan = login("fan_one")
+    assert _get(client, "/api/v1/users/fan_one/reposts")[1] == []
+    assert _get(client, "/api/v1/users/fan_one/reposts")[0] == "HIT"
+
+    client.post(f"/api/v1/quips/{quip}/repost", headers=fan)
+    state, data = _get(client, "/api/v1/users/fan_one/reposts")
+    assert state == "MISS" and [item["id"] for item in data] == [quip]
+    assert _get(client, f"/api/v1/quips/{quip}")[1]["reposts_count"] == 1
+
+    client.delete(f"/api/v1/quips/{quip}/repost", headers=fan)
+    assert _get(client, "/api/v1/users/fan_one/reposts")[1] == []
+
+
+def test_comment_invalidates_thread_and_replies(client, login, cached, quip):
+    fan = login("fan_one")
+    assert _get(client, f"/api/v1/quips/{quip}/comments")[1] == []
+    assert _get(client, f"/api/v1/quips/{quip}/comments")[0] == "HIT"
+
+    root = client.post(f"/api/v1/quips/{quip}/comments", json={"content": "first"}, headers=fan).get_json()["data"]["id"]
+    state, data = _get(client, f"/api/v1/quips/{quip}/comments")
+    assert state == "MISS" and [node["id"] for node in data] == [root]
+    assert _get(client, f"/api/v1/quips/{quip}")[1]["comments_count"] == 1
+
+    _get(client, f"/api/v1/quips/{quip}/comments")
+    client.post(f"/api/v1/quips/{quip}/comments", json={"content": "reply", "parent_id": root}, headers=fan)
+    state, data = _get(client, f"/api/v1/quips/{quip}/comments")
+    assert state == "MISS" and len(data[0]["replies"]) == 1
+
+
+def test_new_quip_invalidates_feed(client, login, cached, quip):
+    _get(client, "/api/v1/quips?sort=new")
+    assert _get(client, "/api/v1/quips?sort=new")[0] == "HIT"
+    client.post("/api/v1/quips", json={"content": "again"}, headers=login("author1"))
+    state, data = _get(client, "/api/v1/quips?sort=new")
+    assert state == "MISS" and len(data) == 2
+
+
+def test_memory_backend_evicts_oldest_and_drops_tag_index():
+    backend = MemoryBackend(max_entries=2)
+    backend.set("a", b"1", 30, ["t"])
+    backend.set("b", b"2", 30, ["t"])
+    backend.set("c", b"3", 30, ["u"])
+    assert backend.get("a") is None and backend.get("c") == b"3"
+    assert backend.invalidate(["t"]) == 1
+    assert backend.get("b") is None
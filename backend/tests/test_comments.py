@@ -0,0 +1,62 @@
+import pytest
+
+
+def _thread(client, headers, quip_id, depth):
+    """A single chain of ``depth + 1`` comments; returns their ids from the root down."""
+    ids, parent_id = [], None
+    for level in range(depth + 1):
+        response = client.post(f"/api/v1/quips/{quip_id}/comments",
+                               json={"content": f"level {level}", "parent_id": parent_id}, headers=headers)
+        parent_id = response.get_json()["data"]["id"]
+        ids.append(parent_id)
+    return ids
+
+
+@pytest.fixture
+def quip(client, login):
+    headers = login("author1")
+    quip_id = client.post("/api/v1/quips", json={"content": "hello"}, headers=headers).get_json()["data"]["id"]
+    return quip_id, headers
+
+
+def test_thread_stops_at_max_depth_and_flags_deeper_replies(client, quip):
+    quip_id, headers = quip
+    ids = _thread(client, headers, quip_id, depth=4)
+
+    data = client.get(f"/api/v1/quips/{quip_id}/comments?max_depth=2").get_json()["data"]
+    assert [node["id"] for node in data] == [ids[0]]
+    deepest = data[0]["replies"][0]["replies"][0]
+    assert deepest["id"] == ids[2]
+    assert deepest["replies"] == [] and deepest["has_more_replies"] is True
+    assert data[0]["has_more_replies"] is False
+
+    replies = client.get(f"/api/v1/quips/comments/{ids[2]}/replies?max_depth=0").get_json()["data"]
+    assert [node["id"] for node in replies] == [ids[3]]
+    assert replies[0]["has_more_replies"] is True
+
+
+def test_leaf_has_no_more_replies(client, quip):
+    quip_id, headers = quip
+    ids = _thread(client, headers, quip_id, depth=1)
+    data = client.get(f"/api/v1/quips/{quip_id}/comments?max_depth=3").get_json()["data"]
+    leaf = data[0]["replies"][0]
+    assert leaf["id"] == ids[1] and leaf["has_more_replies"] is False
+
+
+@pytest.mark.parametrize("query", ["max_depth=11", "max_depth=-1", "limit=0", "limit=101", "limit=abc"])
+def test_thread_arguments_out_of_range(client, quip, query):
+    quip_id, _ = quip
+    assert client.get(f"/api/v1/quips/{quip_id}/comments?{query}").status_code == 400
+
+
+def test_replies_to_unknown_comment(client, quip):
+    assert client.get("/api/v1/quips/comments/999/replies").status_code == 404
+
+
+def test_reply_to_a_comment_on_another_quip_is_rejected(client, quip):
+    quip_id, headers = quip
+    other_id = client.post("/api/v1/quips", json={"content": "other"}, headers=headers).get_json()["data"]["id"]
+    parent_id = _thread(client, headers, other_id, depth=0)[0]
+    response = client.post(f"/api/v1/quips/{quip_id}/comments",
+                           json={"content": "stray", "parent_id": parent_id}, headers=headers)
+    assert response.status_code == 400
@@ -0,0 +1,66 @@
+import pytest
+
+
+@pytest.fixture
+def quip(client, login):
+    headers = login("author1")
+    return client.post("/api/v1/quips", json={"content": "hello"}, headers=headers).get_json()["data"]["id"]
+
+
+@pytest.mark.parametrize("action, first, again, message", [
+    ("up", "POST", "POST", "Already upvoted"),
+    ("up", "DELETE", "DELETE", "Not upvoted"),
+    ("repost", "POST", "POST", "Already reposted"),
+    ("repost", "DELETE", "DELETE", "Not reposted"),
+])
+def test_repeated_engagement_is_a_conflict(client, login, quip, action, first, again, message):
+    fan = login("fan_one")
+    if first == "POST":
+        assert client.open(f"/api/v1/quips/{quip}/{action}", method=first, headers=fan).status_code == 201
+    response = client.open(f"/api/v1/quips/{quip}/{action}", method=again, headers=fan)
+    assert response.status_code == 409
+    assert response.get_json()["message"] == message
+
+
+@pytest.mark.parametrize("method", ["POST", "DELETE"])
+@pytest.mark.parametrize("action", ["up", "repost"])
+def test_engagement_on_missing_quip(client, login, method, action):
+    response = client.open(f"/api/v1/quips/999/{action}", method=method, headers=login("fan_one"))
+    assert response.status_code == 404
+
+
+def test_comment_upvote_conflicts(client, login, quip):
+    fan = login("fan_one")
+    comment = client.post(f"/api/v1/quips/{quip}/comments", json={"content": "hi"}, headers=fan).get_json()["data"]["id"]
+    assert client.delete(f"/api/v1/quips/comments/{comment}/up", headers=fan).status_code == 409
+    assert client.post(f"/api/v1/quips/comments/{comment}/up", headers=fan).status_code == 201
+    assert client.post(f"/api/v1/quips/comments/{comment}/up", headers=fan).status_code == 409
+    assert client.post("/api/v1/quips/comments/999/up", headers=fan).status_code == 404
+    assert client.delete("/api/v1/quips/comments/999/up", headers=fan).status_code == 404
+
+
+def test_comment_on_missing_quip(client, login):
+    response = client.post("/api/v1/quips/999/comments", json={"content": "hi"}, headers=login("fan_one"))
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize("field, value, message", [
+    ("username", "taken_name", "Username already exists"),
+    ("email", "taken_name@example.com", "Email already exists"),
+])
+def test_duplicate_registration(client, login, field, value, message):
+    login("taken_name")
+    payload = {"username": "other_name", "email": "other_name@example.com", "password": "secret123", field: value}
+    response = client.post("/api/v1/auth/register", json=payload)
+    assert response.status_code == 409
+    assert response.get_json()["message"] == message
+
+
+def test_follow_conflicts(client, login):
+    fan = login("fan_one")
+    login("author1")
+    assert client.post("/api/v1/users/author1/follow", headers=fan).status_code == 201
+    assert client.post("/api/v1/users/author1/follow", headers=fan).status_code == 409
+    assert client.delete("/api/v1/users/author1/follow", headers=fan).status_code == 200
+    assert client.delete("/api/v1/users/author1/follow", headers=fan).status_code == 409
+    assert client.post("/api/v1/users/nobody_here/follow", headers=fan).status_code == 404
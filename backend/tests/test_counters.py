@@ -0,0 +1,40 @@
+from app import db
+from app.models import Quip, User
+from app.services.counter_service import CounterService
+
+
+def test_engagement_updates_quip_and_author_counters(client, login):
+    author, fan = login("author1"), login("fan_one")
+    quip_id = client.post("/api/v1/quips", json={"content": "hello"}, headers=author).get_json()["data"]["id"]
+
+    assert client.post(f"/api/v1/quips/{quip_id}/up", headers=fan).status_code == 201
+    assert client.post(f"/api/v1/quips/{quip_id}/repost", headers=fan).status_code == 201
+    assert client.post(f"/api/v1/quips/{quip_id}/comments", json={"content": "nice"}, headers=fan).status_code == 201
+
+    quip = db.session.get(Quip, quip_id)
+    assert (quip.quip_ups_count, quip.reposts_count, quip.comments_count) == (1, 1, 1)
+    author_row = User.query.filter_by(username="author1").one()
+    assert (author_row.quips_count, author_row.quip_ups_received_count, author_row.reposts_received_count) == (1, 1, 1)
+
+    client.delete(f"/api/v1/quips/{quip_id}/up", headers=fan)
+    db.session.expire_all()
+    assert db.session.get(Quip, quip_id).quip_ups_count == 0
+    assert User.query.filter_by(username="author1").one().quip_ups_received_count == 0
+
+
+def test_reconcile_reports_and_repairs_drift(client, login):
+    author, fan = login("author1"), login("fan_one")
+    quip_id = client.post("/api/v1/quips", json={"content": "hello"}, headers=author).get_json()["data"]["id"]
+    client.post(f"/api/v1/quips/{quip_id}/up", headers=fan)
+    Quip.query.filter_by(id=quip_id).update({Quip.quip_ups_count: 7})
+    db.session.commit()
+
+    report = CounterService.reconcile(dry_run=True)
+    assert report["quips"]["drifted"] == 1
+    db.session.expire_all()
+    assert db.session.get(Quip, quip_id).quip_ups_count == 7
+
+    CounterService.reconcile()
+    db.session.expire_all()
+    assert db.session.get(Quip, quip_id).quip_ups_count == 1
+    assert CounterService.reconcile(dry_run=True)["quips"]["drifted"] == 0
@@ -0,0 +1,65 @@
+import pytest
+from app import rate_limiter
+from app.utils.rate_limit import Limit, MemoryBackend, RedisBackend
+
+
+@pytest.fixture(params=["memory", "redis"])
+def limited(request, app, fake_redis):
+    # Hooks can only be added before the app serves its first request.
+    app.config.update(RATE_LIMIT_ENABLED=True, RATE_LIMITS={
+        "quips.create_quip": "2/minute",
+        "quips.get_viewer_state": "unlimited",
+        "quips": "3/minute",
+    })
+    rate_limiter.init_app(app, backend=MemoryBackend() if request.param == "memory" else RedisBackend(fake_redis))
+    return app
+
+
+def _create(client, headers):
+    return client.post("/api/v1/quips", json={"content": "hello"}, headers=headers)
+
+
+def test_limit_is_enforced_with_retry_after(client, limited, login):
+    author = login("author1")
+    first = _create(client, author)
+    assert first.status_code == 201
+    assert first.headers["RateLimit-Limit"] == "2"
+    assert first.headers["RateLimit-Remaining"] == "1"
+    assert first.headers["RateLimit-Policy"] == "2;w=60"
+    assert "Retry-After" not in first.headers
+
+    assert _create(client, author).status_code == 201
+    limited_response = _create(client, author)
+    assert limited_response.status_code == 429
+    assert limited_response.headers["RateLimit-Remaining"] == "0"
+    assert 1 <= int(limited_response.headers["Retry-After"]) <= 30
+    assert limited_response.get_json()["error_code"] == "RATE_LIMITED"
+
+
+def test_buckets_are_per_caller_and_per_scope(client, limited, login):
+    author, other = login("author1"), login("author2")
+    for _ in range(2):
+        _create(client, author)
+    assert _create(client, author).status_code == 429
+    assert _create(client, other).status_code == 201
+
+    # The blueprint bucket is separate from the endpoint bucket that ran out.
+    quip_id = _create(client, other).get_json()["data"]["id"]
+    assert client.post(f"/api/v1/quips/{quip_id}/up", headers=author).status_code == 201
+
+
+def test_unlimited_endpoint_and_reads_are_exempt(client, limited, login):
+    author = login("author1")
+    for _ in range(5):
+        response = client.post("/api/v1/quips/viewer-state", json={"quip_ids": [1]}, headers=author)
+        assert response.status_code == 200
+        assert "RateLimit-Limit" not in response.headers
+        assert client.get("/api/v1/quips").status_code == 200
+
+
+def test_limit_parsing():
+    limit = Limit.parse("10/minute")
+    assert (limit.capacity, limit.period, limit.policy) == (10, 60, "10;w=60")
+    assert limit.wait(0.5) == 3
+    with pytest.raises(ValueError):
+        Limit.parse("ten per minute")
@@ -0,0 +1,37 @@
+import pytest
+
+
+@pytest.fixture
+def author(login):
+    return login("author1")
+
+
+def _search(client, q):
+    response = client.get("/api/v1/quips/search", query_string={"q": q})
+    assert response.status_code == 200
+    return response.get_json()["data"]
+
+
+def test_snippet_escapes_content_and_marks_terms(client, author):
+    client.post("/api/v1/quips", json={"content": "<script>alert(1)</script> vibecheck & more"}, headers=author)
+
+    [item] = _search(client, "vibecheck")
+    assert item["snippet"] == "&lt;script&gt;alert(1)&lt;/script&gt; <mark>vibecheck</mark> &amp; more"
+
+
+def test_terms_are_anded_and_matched_in_definition(client, author):
+    client.post("/api/v1/quips", json={"content": "rizz", "definition": "charisma in flirting"}, headers=author)
+    client.post("/api/v1/quips", json={"content": "charisma alone"}, headers=author)
+
+    assert [item["content"] for item in _search(client, "charisma flirting")] == ["rizz"]
+    assert len(_search(client, "charisma")) == 2
+
+
+@pytest.mark.parametrize("q", ['"unbalanced', "NEAR(a b)", "col:term", "a OR", "*"])
+def test_query_syntax_is_taken_literally(client, author, q):
+    client.post("/api/v1/quips", json={"content": "plain words"}, headers=author)
+    assert _search(client, q) == []
+
+
+def test_empty_query_is_rejected(client):
+    assert client.get("/api/v1/quips/search?q=%20").status_code == 400
@@ -0,0 +1,35 @@
+import orjson
+import pytest
+from app.serializers import QuipSerializer
+from app.utils.query_stats import assert_constant_queries
+
+PAGE_SIZES = (1, 20)
+
+
+@pytest.fixture(params=["fragments", "dicts"])
+def encoding(app, request):
+    if request.param == "dicts":
+        app.extensions.pop("quip_fragments", None)
+    return request.param
+
+
+def test_serialize_many_query_count_does_not_grow_with_page_size(encoding, make_quips):
+    quip_ids = make_quips(max(PAGE_SIZES))
+    assert_constant_queries(lambda n: QuipSerializer.serialize_many(quip_ids[:n]), PAGE_SIZES)
+
+
+def test_feed_query_count_does_not_grow_with_page_size(client, make_quips):
+    def fetch(n):
+        response = client.get("/api/v1/quips?sort=new")
+        assert response.status_code == 200
+        assert len(response.get_json()["data"]) == n
+
+    assert_constant_queries(fetch, PAGE_SIZES, setup=make_quips)
+
+
+def test_serialized_quip_carries_author_and_counters(encoding, make_quips):
+    (item,) = QuipSerializer.serialize_many(make_quips(1))
+    if encoding == "fragments":
+        item = orjson.loads(orjson.dumps(item))
+    assert item["username"] == "author0"
+    assert (item["quip_ups_count"], item["comments_count"], item["reposts_count"]) == (0, 0, 0)
@@ -0,0 +1,102 @@
+import pytest
+from app import db
+from app.models import TimelineEntry
+from app.services.timeline_service import TimelineService
+
+
+@pytest.fixture
+def users(login):
+    return {name: login(name) for name in ("reader", "author1", "reposter1", "reposter2")}
+
+
+def _timeline(client, headers):
+    response = client.get("/api/v1/timeline", headers=headers)
+    assert response.status_code == 200
+    return [(item["id"], (item["reposted_by"] or {}).get("username")) for item in response.get_json()["data"]]
+
+
+def _post(client, headers, content="hello"):
+    return client.post("/api/v1/quips", json={"content": content}, headers=headers).get_json()["data"]["id"]
+
+
+def test_fan_out_on_post_and_repost(client, users):
+    client.post("/api/v1/users/author1/follow", headers=users["reader"])
+    client.post("/api/v1/users/reposter1/follow", headers=users["reader"])
+    own = _post(client, users["reader"], "mine")
+    quip = _post(client, users["author1"])
+    other = _post(client, users["reposter2"], "unfollowed")
+    client.post(f"/api/v1/quips/{other}/repost", headers=users["reposter1"])
+
+    assert _timeline(client, users["reader"]) == [(other, "reposter1"), (quip, None), (own, None)]
+
+
+def test_follow_backfills_and_unfollow_removes(client, users):
+    quip = _post(client, users["author1"])
+    client.post("/api/v1/users/author1/follow", headers=users["reader"])
+    assert _timeline(client, users["reader"]) == [(quip, None)]
+
+    client.delete("/api/v1/users/author1/follow", headers=users["reader"])
+    assert _timeline(client, users["reader"]) == []
+
+
+def test_retracted_repost_falls_back_to_another_reposter(client, users):
+    quip = _post(client, users["author1"])
+    for reposter in ("reposter1", "reposter2"):
+        client.post(f"/api/v1/users/{reposter}/follow", headers=users["reader"])
+        client.post(f"/api/v1/quips/{quip}/repost", headers=users[reposter])
+    assert _timeline(client, users["reader"]) == [(quip, "reposter1")]
+
+    client.delete(f"/api/v1/quips/{quip}/repost", headers=users["reposter1"])
+    assert _timeline(client, users["reader"]) == [(quip, "reposter2")]
+
+    client.delete("/api/v1/users/reposter2/follow", headers=users["reader"])
+    assert _timeline(client, users["reader"]) == []
+
+
+def test_unfollowing_the_author_keeps_a_followed_repost(client, users):
+    client.post("/api/v1/users/author1/follow", headers=users["reader"])
+    client.post("/api/v1/users/reposter1/follow", headers=users["reader"])
+    quip = _post(client, users["author1"])
+    client.post(f"/api/v1/quips/{quip}/repost", headers=users["reposter1"])
+    assert _timeline(client, users["reader"]) == [(quip, None)]
+
+    client.delete("/api/v1/users/author1/follow", headers=users["reader"])
+    assert _timeline(client, users["reader"]) == [(quip, "reposter1")]
+
+
+def test_own_repost_survives_unfollow(client, users):
+    client.post("/api/v1/users/author1/follow", headers=users["reader"])
+    quip = _post(client, users["author1"])
+    client.post(f"/api/v1/quips/{quip}/repost", headers=users["reader"])
+
+    client.delete("/api/v1/users/author1/follow", headers=users["reader"])
+    assert _timeline(client, users["reader"]) == [(quip, "reader")]
+
+
+def test_deleted_quip_leaves_every_timeline(client, users):
+    client.post("/api/v1/users/author1/follow", headers=users["reader"])
+    quip = _post(client, users["author1"])
+    client.delete(f"/api/v1/quips/{quip}", headers=users["author1"])
+    assert _timeline(client, users["reader"]) == []
+    assert TimelineEntry.query.count() == 0
+
+
+def test_large_accounts_are_pulled_at_read_time(app, client, users):
+    app.config["TIMELINE_FANOUT_MAX_FOLLOWERS"] = 0
+    client.post("/api/v1/users/author1/follow", headers=users["reader"])
+    quip = _post(client, users["author1"])
+
+    assert TimelineEntry.query.filter_by(quip_id=quip).count() == 1  # the author's own timeline only
+    assert _timeline(client, users["reader"]) == [(quip, None)]
+
+
+def test_trim_keeps_the_newest_entries(client, users):
+    client.post("/api/v1/users/author1/follow", headers=users["reader"])
+    quips = [_post(client, users["author1"], f"quip {i}") for i in range(5)]
+
+    # reader and author1 each hold five entries.
+    assert TimelineService.trim(max_entries=3) == 4
+    assert [quip_id for quip_id, _ in _timeline(client, users["reader"])] == quips[:1:-1]
+    assert TimelineService.trim(max_entries=3) == 0
+    db.session.expire_all()
+    assert TimelineEntry.query.count() == 6
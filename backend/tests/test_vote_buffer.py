@@ -0,0 +1,73 @@
+import pytest
+from app import db
+from app.models import Quip, QuipUp, User, VoteIntent
+from app.services.vote_buffer_service import VoteBufferService
+
+
+@pytest.fixture
+def buffered(app, client, login):
+    # A flusher interval longer than the test keeps the background thread out of it.
+    app.config.update(VOTE_BUFFER_ENABLED=True, VOTE_BUFFER_GRACE=0, VOTE_BUFFER_FLUSH_INTERVAL=3600)
+    author = login("author1")
+    quip_id = client.post("/api/v1/quips", json={"content": "hello"}, headers=author).get_json()["data"]["id"]
+    return quip_id
+
+
+def _ups(quip_id):
+    db.session.expire_all()
+    return db.session.get(Quip, quip_id).quip_ups_count, QuipUp.query.filter_by(quip_id=quip_id).count()
+
+
+def test_votes_are_accepted_and_applied_on_flush(client, login, buffered):
+    fan = login("fan_one")
+    assert client.post(f"/api/v1/quips/{buffered}/up", headers=fan).status_code == 202
+    assert _ups(buffered) == (0, 0)
+
+    assert VoteBufferService.drain() == 1
+    assert _ups(buffered) == (1, 1)
+    assert User.query.filter_by(username="author1").one().quip_ups_received_count == 1
+    assert VoteIntent.query.count() == 0
+
+
+def test_last_intent_per_user_wins(client, login, buffered):
+    fan, other = login("fan_one"), login("fan_two")
+    for method in ("POST", "DELETE", "POST", "POST"):
+        client.open(f"/api/v1/quips/{buffered}/up", method=method, headers=fan)
+    client.post(f"/api/v1/quips/{buffered}/up", headers=other)
+    client.delete(f"/api/v1/quips/{buffered}/up", headers=other)
+
+    assert VoteBufferService.drain() == 6
+    assert _ups(buffered) == (1, 1)
+
+
+def test_repeating_the_current_state_keeps_counters_exact(client, login, buffered):
+    fan = login("fan_one")
+    client.post(f"/api/v1/quips/{buffered}/up", headers=fan)
+    VoteBufferService.drain()
+    client.post(f"/api/v1/quips/{buffered}/up", headers=fan)
+    VoteBufferService.drain()
+    assert _ups(buffered) == (1, 1)
+
+    client.delete(f"/api/v1/quips/{buffered}/up", headers=fan)
+    client.delete(f"/api/v1/quips/{buffered}/up", headers=fan)
+    VoteBufferService.drain()
+    assert _ups(buffered) == (0, 0)
+
+
+def test_intents_inside_the_grace_period_wait(app, client, login, buffered):
+    app.config["VOTE_BUFFER_GRACE"] = 60
+    fan = login("fan_one")
+    client.post(f"/api/v1/quips/{buffered}/up", headers=fan)
+
+    assert VoteBufferService.flush() == 0
+    user_id = User.query.filter_by(username="fan_one").one().id
+    assert VoteBufferService.pending(user_id, [buffered]) == {buffered: True}
+
+    client.delete(f"/api/v1/quips/{buffered}/up", headers=fan)
+    assert VoteBufferService.pending(user_id, [buffered]) == {buffered: False}
+    assert _ups(buffered) == (0, 0)
+
+
+def test_vote_on_missing_quip(client, login, buffered):
+    assert client.post("/api/v1/quips/999/up", headers=login("fan_one")).status_code == 404
+    assert VoteIntent.query.count() == 0